@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+# Keep CPU-bound password hashing in its own bounded thread pool under ASGI.
+os.environ.setdefault('PASSWORD_HASHING_OFFLOAD', 'true')
+# Serve campaign and inbox reads on the event loop instead of in threads.
+os.environ.setdefault('ASYNC_READ_VIEWS', 'true')
 
 application = get_asgi_application()
@@ -0,0 +1,140 @@
+"""
+Native async read views for DRF viewsets.
+
+DRF views are synchronous, so under ASGI Django runs each one through
+``sync_to_async``, on a thread from a bounded pool: an ASGI deployment
+serves no more concurrent requests than a threaded WSGI one. For the
+read-heavy routes, ``async_read_view()`` builds a URL view that serves GET
+and HEAD with the viewset's ``a<action>`` coroutine method (``alist``,
+``aretrieve``) on the event loop, and passes every other method to the
+normal DRF view.
+
+The async path follows ``APIView.dispatch`` step by step, with the same
+permission classes, exception handling, renderers and content negotiation,
+so responses are identical. Only authentication differs: the configured
+authenticators are awaited through their ``aauthenticate()`` methods
+(session authentication through ``request.auser()``), which read the cache
+and, on a miss, the async ORM. Permission checks and rendering are
+CPU-only and run inline.
+
+The routes are installed when ``ASYNC_READ_VIEWS`` is on, which
+``api/asgi.py`` does; under WSGI the sync views avoid an event loop per
+request. ``benchmarks/bench_async_views.py`` compares the two deployments.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.http import Http404, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.request import ForcedAuthentication
+from rest_framework.response import Response
+
+ASYNC_METHODS = ('GET', 'HEAD')
+
+
+async def aauthenticate(request):
+    """Authenticate a DRF ``Request`` like ``Request._authenticate()``, without threads."""
+    for authenticator in request.authenticators:
+        try:
+            user_auth_tuple = await _aauthenticate_with(authenticator, request)
+        except exceptions.APIException:
+            request._not_authenticated()
+            raise
+
+        if user_auth_tuple is not None:
+            request._authenticator = authenticator
+            request.user, request.auth = user_auth_tuple
+            return
+
+    request._not_authenticated()
+
+
+async def _aauthenticate_with(authenticator, request):
+    if hasattr(authenticator, 'aauthenticate'):
+        return await authenticator.aauthenticate(request)
+    if isinstance(authenticator, ForcedAuthentication):
+        # The test client's force_authenticate(); no I/O.
+        return authenticator.authenticate(request)
+    if isinstance(authenticator, SessionAuthentication):
+        auser = getattr(request._request, 'auser', None)
+        user = await auser() if auser is not None else None
+        if not user or not user.is_active:
+            return None
+        authenticator.enforce_csrf(request)
+        return user, None
+    raise ImproperlyConfigured(
+        f'{type(authenticator).__name__} has no aauthenticate() and cannot serve async views.'
+    )
+
+
+def async_read_view(viewset, actions, **initkwargs):
+    """
+    Return a URL view for one viewset route that serves reads natively async.
+
+    ``actions`` is the route's method-to-action map, as for
+    ``viewset.as_view()``; GET and HEAD call the viewset's ``a<action>``
+    coroutine method instead of ``<action>``.
+    """
+    fallback = sync_to_async(viewset.as_view(dict(actions), **initkwargs))
+
+    async def view(request, *args, **kwargs):
+        if request.method not in ASYNC_METHODS:
+            return await fallback(request, *args, **kwargs)
+
+        self = viewset(**initkwargs)
+        self.action_map = {'head': actions['get'], **actions}
+        for method, action in self.action_map.items():
+            setattr(self, method, getattr(self, action))
+        self.action = self.action_map[request.method.lower()]
+        self.request = request
+        return await adispatch(self, getattr(self, f'a{self.action}'), request, *args, **kwargs)
+
+    view.cls = viewset
+    view.initkwargs = initkwargs
+    view.actions = actions
+    return csrf_exempt(view)
+
+
+async def adispatch(self, handler, request, *args, **kwargs):
+    """``APIView.dispatch()`` with async authentication and an async handler."""
+    self.args = args
+    self.kwargs = kwargs
+    request = self.initialize_request(request, *args, **kwargs)
+    self.request = request
+    self.headers = self.default_response_headers
+
+    try:
+        await aauthenticate(request)
+        self.initial(request, *args, **kwargs)
+        response = await handler(request, *args, **kwargs)
+    except Exception as exc:
+        response = self.handle_exception(exc)
+
+    self.response = self.finalize_response(request, response, *args, **kwargs)
+    if not isinstance(self.response, Response):
+        # e.g. a StreamingHttpResponse, which Django serves as it is.
+        return self.response
+    self.response.render()
+    # Django renders anything with a render() method itself, through sync_to_async.
+    plain = HttpResponse(self.response.content, status=self.response.status_code)
+    for header, value in self.response.items():
+        plain[header] = value
+    # As on a DRF response, for the test client and middleware.
+    plain.data = self.response.data
+    return plain
+
+
+async def aget_object(view):
+    """``GenericAPIView.get_object()`` through the async ORM."""
+    queryset = view.filter_queryset(view.get_queryset())
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    filter_kwargs = {view.lookup_field: view.kwargs[lookup_url_kwarg]}
+    try:
+        obj = await queryset.aget(**filter_kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+    except (TypeError, ValueError, ValidationError):
+        raise Http404
+    view.check_object_permissions(view.request, obj)
+    return obj
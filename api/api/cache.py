@@ -0,0 +1,268 @@
+"""
+Two-tier cache with stampede protection.
+
+``TwoTierCache.get_or_set(key, compute, timeout)`` looks in a small
+in-process LRU first, then in the shared Django cache, and only calls
+``compute`` when both miss or the value is due for refresh. Three
+mechanisms keep an expiring hot key from triggering a recompute stampede:
+
+* Single flight per process: threads (or, with ``aget_or_set``, tasks)
+  missing the same key queue on one lock, and only the first one computes.
+* A distributed lock across processes (``cache.add`` on the shared
+  backend): only its holder recomputes. Others serve the stale value,
+  which the shared cache keeps for ``CACHE_STALE_SECONDS`` past expiry,
+  or wait briefly for the holder's result.
+* Probabilistic early refresh (the "XFetch" rule): a reader recomputes
+  ahead of expiry with a probability that rises as expiry nears and with
+  the time the last computation took, so one reader refreshes a hot key
+  before it expires for everyone.
+
+Keys can live in a namespace whose version stamp sits in the shared cache;
+``invalidate(namespace)`` moves the stamp, so every process stops using the
+old entries at once, local copies included.
+"""
+import asyncio
+import math
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# ``delta`` is how long the value took to compute, in seconds.
+CacheEntry = namedtuple('CacheEntry', ['value', 'expires_at', 'delta'])
+
+
+def is_process_local(alias='default'):
+    """Return whether writes to cache ``alias`` stay invisible to other processes."""
+    return isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+class TwoTierCache:
+    """An in-process LRU in front of a shared Django cache, with stampede protection."""
+
+    # Seconds between checks while another process holds the lock.
+    poll_interval = 0.05
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+        self._lock = threading.Lock()
+        self._local = OrderedDict()
+        self._flights = {}
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    # Local tier
+
+    def _local_get(self, key):
+        with self._lock:
+            item = self._local.get(key)
+            if item is None:
+                return None
+            entry, local_until = item
+            if time.time() >= local_until:
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return entry
+
+    def _local_set(self, key, entry):
+        local_until = min(time.time() + settings.CACHE_LOCAL_TIMEOUT, entry.expires_at)
+        with self._lock:
+            self._local[key] = (entry, local_until)
+            self._local.move_to_end(key)
+            while len(self._local) > settings.CACHE_LOCAL_MAX_ENTRIES:
+                self._local.popitem(last=False)
+
+    def clear_local(self):
+        """Drop this process's copies (the shared tier is left alone)."""
+        with self._lock:
+            self._local.clear()
+
+    # Namespaces
+
+    def _version_key(self, namespace):
+        return f'{namespace}:version'
+
+    def namespace_version(self, namespace):
+        """Return the namespace's version stamp, initialising it if it is missing."""
+        key = self._version_key(namespace)
+        version = self.shared.get(key)
+        if version is None:
+            self.shared.add(key, uuid.uuid4().hex, timeout=None)
+            version = self.shared.get(key)
+        return version
+
+    def invalidate(self, namespace):
+        """Retire every entry in ``namespace`` on every process."""
+        self.shared.set(self._version_key(namespace), uuid.uuid4().hex, timeout=None)
+
+    def _full_key(self, key, namespace):
+        if namespace is None:
+            return key
+        return f'{namespace}:{self.namespace_version(namespace)}:{key}'
+
+    # Reads
+
+    @staticmethod
+    def _due(entry, beta):
+        # XFetch: refresh early with probability growing as expiry approaches.
+        # 1 - random() is in (0, 1], so the logarithm is defined and <= 0.
+        return time.time() - entry.delta * beta * math.log(1.0 - random.random()) >= entry.expires_at
+
+    def _lookup(self, key, beta):
+        """Return ``(entry, due)`` for ``key`` from the local tier, then the shared one."""
+        beta = settings.CACHE_EARLY_REFRESH_BETA if beta is None else beta
+        entry = self._local_get(key)
+        if entry is None:
+            entry = self.shared.get(key)
+            if entry is not None:
+                self._local_set(key, entry)
+        return entry, entry is None or self._due(entry, beta)
+
+    def get_or_set(self, key, compute, timeout, namespace=None, beta=None):
+        """Return the cached value for ``key``, calling ``compute()`` to (re)build it."""
+        key = self._full_key(key, namespace)
+        entry, due = self._lookup(key, beta)
+        if not due:
+            return entry.value
+        return self._refresh(key, compute, timeout, stale=entry)
+
+    async def aget_or_set(self, key, acompute, timeout, namespace=None, beta=None):
+        """
+        ``get_or_set()`` for async views, with ``acompute`` a coroutine function.
+
+        The cache tiers are read directly rather than through ``sync_to_async``:
+        Django's backends have no native async API, and an in-memory or
+        single-key network read is cheaper than the hop to the sync thread.
+        """
+        key = self._full_key(key, namespace)
+        entry, due = self._lookup(key, beta)
+        if not due:
+            return entry.value
+        return await self._arefresh(key, acompute, timeout, stale=entry)
+
+    def delete(self, key, namespace=None):
+        key = self._full_key(key, namespace)
+        self.shared.delete(key)
+        with self._lock:
+            self._local.pop(key, None)
+
+    # Recomputation
+
+    @contextmanager
+    def _flight(self, key, new_lock):
+        # Per-key locks, shared by the waiters and dropped with the last one.
+        with self._lock:
+            lock, waiters = self._flights.get(key, (None, 0))
+            lock = lock or new_lock()
+            self._flights[key] = (lock, waiters + 1)
+        try:
+            yield lock
+        finally:
+            with self._lock:
+                lock, waiters = self._flights[key]
+                if waiters == 1:
+                    del self._flights[key]
+                else:
+                    self._flights[key] = (lock, waiters - 1)
+
+    def _fresh(self, key, stale):
+        """Return a shared entry newer than ``stale`` that has not expired, if any."""
+        entry = self.shared.get(key)
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        if stale is not None and entry.expires_at <= stale.expires_at:
+            return None
+        self._local_set(key, entry)
+        return entry
+
+    def _acquire(self, key):
+        """Take the cross-process recompute lock for ``key``; return its token or None."""
+        token = uuid.uuid4().hex
+        if self.shared.add(f'{key}:lock', token, timeout=settings.CACHE_LOCK_TIMEOUT):
+            return token
+        return None
+
+    def _release(self, key, token):
+        if self.shared.get(f'{key}:lock') == token:
+            self.shared.delete(f'{key}:lock')
+
+    def _store(self, key, value, delta, timeout):
+        entry = CacheEntry(value, time.time() + timeout, delta)
+        self.shared.set(key, entry, timeout=timeout + settings.CACHE_STALE_SECONDS)
+        self._local_set(key, entry)
+        return value
+
+    def _compute(self, key, compute, timeout):
+        started = time.monotonic()
+        value = compute()
+        return self._store(key, value, time.monotonic() - started, timeout)
+
+    def _refresh(self, key, compute, timeout, stale):
+        with self._flight(key, threading.Lock) as lock, lock:
+            # A thread ahead of us in the queue may have refreshed it already.
+            entry = self._fresh(key, stale)
+            if entry is not None:
+                return entry.value
+
+            token = self._acquire(key)
+            if token is not None:
+                try:
+                    return self._compute(key, compute, timeout)
+                finally:
+                    self._release(key, token)
+
+            # Another process is recomputing: serve what we have, or wait for it.
+            if stale is not None:
+                return stale.value
+            deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                entry = self._fresh(key, None)
+                if entry is not None:
+                    return entry.value
+            # The lock holder died or is too slow; compute it ourselves.
+            return self._compute(key, compute, timeout)
+
+    async def _acompute(self, key, acompute, timeout):
+        started = time.monotonic()
+        value = await acompute()
+        return self._store(key, value, time.monotonic() - started, timeout)
+
+    async def _arefresh(self, key, acompute, timeout, stale):
+        # asyncio locks belong to one event loop, so each loop has its own flight.
+        flight = (id(asyncio.get_running_loop()), key)
+        with self._flight(flight, asyncio.Lock) as lock:
+            async with lock:
+                entry = self._fresh(key, stale)
+                if entry is not None:
+                    return entry.value
+
+                token = self._acquire(key)
+                if token is not None:
+                    try:
+                        return await self._acompute(key, acompute, timeout)
+                    finally:
+                        self._release(key, token)
+
+                if stale is not None:
+                    return stale.value
+                deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(self.poll_interval)
+                    entry = self._fresh(key, None)
+                    if entry is not None:
+                        return entry.value
+                return await self._acompute(key, acompute, timeout)
+
+
+two_tier_cache = TwoTierCache()
@@ -0,0 +1,249 @@
+"""
+Negotiated Brotli/gzip response compression.
+
+``CompressionMiddleware`` compresses API responses with the encoding the
+client prefers in ``Accept-Encoding``: Brotli (``br``) when the ``brotli``
+package is installed, else gzip. A response is left as it is when:
+
+* its path is outside ``COMPRESSION_PATH_PREFIXES``. Pages that echo secrets
+  next to user input (the admin's CSRF tokens) are open to BREACH when
+  compressed; the API authenticates with bearer tokens;
+* it is shorter than ``COMPRESSION_MIN_SIZE``, where headers outweigh the
+  saving;
+* its media type is already compressed (``COMPRESSION_SKIP_TYPES``), or it
+  already has a ``Content-Encoding``;
+* compressing does not make it smaller.
+
+Streaming responses, sync or async, are compressed chunk by chunk. Each
+chunk is flushed as soon as it is compressed, so a Server-Sent Events
+client still receives every event, and every heartbeat, when it is sent.
+
+Every compressed response is recorded in ``compression_stats``, per
+endpoint (the URL name) and encoding: bytes before and after, and seconds
+spent compressing. The same totals are exported to Prometheus as the
+``api_compression_*`` counters (see api/metrics.py).
+"""
+import importlib.util
+import logging
+import re
+import threading
+import time
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+from .metrics import endpoint_name
+
+logger = logging.getLogger(__name__)
+
+if importlib.util.find_spec('brotli') is not None:
+    import brotli
+else:
+    brotli = None
+
+_encoding_re = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*$')
+
+
+class GzipCompressor:
+    name = 'gzip'
+
+    def __init__(self):
+        # wbits 31: a gzip header and trailer around the deflate stream.
+        self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    name = 'br'
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def available_compressors():
+    """Return the supported compressors, most preferred first."""
+    return [BrotliCompressor, GzipCompressor] if brotli is not None else [GzipCompressor]
+
+
+def negotiate(accept_encoding):
+    """Return the compressor class to use for ``accept_encoding``, or None."""
+    qualities = {}
+    for item in accept_encoding.split(','):
+        match = _encoding_re.match(item)
+        if match:
+            try:
+                qualities[match[1].lower()] = float(match[2]) if match[2] else 1.0
+            except ValueError:
+                continue
+    best, best_quality = None, 0.0
+    for compressor in available_compressors():
+        quality = qualities.get(compressor.name, qualities.get('*', 0.0))
+        # Ties go to the earlier (preferred) compressor.
+        if quality > best_quality:
+            best, best_quality = compressor, quality
+    return best
+
+
+class CompressionStats:
+    """Thread-safe running totals of compression per endpoint and encoding."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, endpoint, encoding, raw_bytes, compressed_bytes, seconds):
+        with self._lock:
+            totals = self._totals.setdefault((endpoint, encoding), [0, 0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += raw_bytes
+            totals[2] += compressed_bytes
+            totals[3] += seconds
+        metrics.COMPRESSION_INPUT.labels(endpoint, encoding).inc(raw_bytes)
+        metrics.COMPRESSION_OUTPUT.labels(endpoint, encoding).inc(compressed_bytes)
+        metrics.COMPRESSION_SECONDS.labels(endpoint, encoding).inc(seconds)
+        logger.debug(
+            'compressed %s with %s: %d -> %d bytes in %.2f ms',
+            endpoint, encoding, raw_bytes, compressed_bytes, seconds * 1000,
+        )
+
+    def snapshot(self):
+        """Return one dict per endpoint and encoding, largest compression time first."""
+        with self._lock:
+            items = [(key, list(totals)) for key, totals in self._totals.items()]
+        return sorted(
+            (
+                {
+                    'endpoint': endpoint, 'encoding': encoding, 'responses': responses,
+                    'raw_bytes': raw, 'compressed_bytes': compressed,
+                    'ratio': raw / compressed if compressed else None, 'seconds': seconds,
+                }
+                for (endpoint, encoding), (responses, raw, compressed, seconds) in items
+            ),
+            key=lambda row: row['seconds'], reverse=True,
+        )
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+
+
+compression_stats = CompressionStats()
+
+
+class CompressionMiddleware:
+    """Compress API responses with Brotli or gzip, as negotiated."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        # Compression is CPU-only, so it runs inline rather than on a thread.
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if not request.path.startswith(settings.COMPRESSION_PATH_PREFIXES):
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type.startswith(settings.COMPRESSION_SKIP_TYPES):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        # The response depends on Accept-Encoding from here on, compressed or not.
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressor_class = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if compressor_class is None:
+            return response
+
+        endpoint = endpoint_name(request)
+        if response.streaming:
+            self.compress_stream(response, compressor_class, endpoint)
+        else:
+            started = time.perf_counter()
+            compressor = compressor_class()
+            compressed = compressor.compress(response.content) + compressor.finish()
+            seconds = time.perf_counter() - started
+            if len(compressed) >= len(response.content):
+                return response
+            compression_stats.record(endpoint, compressor.name, len(response.content), len(compressed), seconds)
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The compressed body is a different representation: a strong ETag
+        # no longer matches it byte for byte.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = compressor_class.name
+        return response
+
+    def compress_stream(self, response, compressor_class, endpoint):
+        compressor = compressor_class()
+        totals = [0, 0, 0.0]
+
+        content = response.streaming_content
+
+        def compress(chunk, final=False):
+            started = time.perf_counter()
+            data = compressor.compress(chunk) + (compressor.finish() if final else compressor.flush())
+            totals[0] += len(chunk)
+            totals[1] += len(data)
+            totals[2] += time.perf_counter() - started
+            return data
+
+        def record():
+            compression_stats.record(endpoint, compressor.name, *totals)
+
+        if response.is_async:
+            async def compressed_content():
+                try:
+                    async for chunk in content:
+                        if data := compress(chunk):
+                            yield data
+                    yield compress(b'', final=True)
+                finally:
+                    record()
+        else:
+            def compressed_content():
+                try:
+                    for chunk in content:
+                        if data := compress(chunk):
+                            yield data
+                    yield compress(b'', final=True)
+                finally:
+                    record()
+
+        response.streaming_content = compressed_content()
+        del response['Content-Length']
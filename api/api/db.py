@@ -0,0 +1,156 @@
+"""
+Database connection profiles, selected by environment variables.
+
+``DB_PROFILE=sqlite`` (the default) uses a SQLite file tuned for concurrent
+use. The PRAGMAs below are applied to every new connection from the
+``connection_created`` signal:
+
+* ``journal_mode=WAL``: readers no longer block the writer (or vice versa);
+* ``busy_timeout``: a writer waits for the lock instead of failing at once
+  with "database is locked";
+* ``synchronous=NORMAL``: safe with WAL, and only syncs at checkpoints;
+* ``mmap_size``: reads go through memory-mapped I/O.
+
+Write transactions also start with ``BEGIN IMMEDIATE``, which takes the
+write lock up front. A deferred transaction that reads first and then
+writes cannot wait for the lock, so it fails even with a busy timeout.
+
+``DB_PROFILE=postgresql`` uses persistent connections with health checks
+(``DB_CONN_MAX_AGE``), or Django's native connection pool when
+``DB_POOL=True``. The pool needs psycopg 3 with ``psycopg_pool``, both
+installed by requirements.txt (``psycopg[binary,pool]``), and Django does not
+allow it together with persistent connections.
+
+``DB_REPLICAS`` lists read replicas (SQLite files, or PostgreSQL hosts)
+that get the primary's settings otherwise; ``api.routers`` decides which
+reads they serve.
+
+Every connection, whatever the profile, also gets the execute wrappers that
+count queries for the request metrics (``api.metrics``) and log statements
+slower than ``DB_SLOW_QUERY_MS`` (``api.slow_queries``).
+
+``benchmarks/bench_db_profiles.py`` compares the profiles under
+concurrent reads and writes.
+"""
+import importlib.util
+
+from decouple import Csv, config
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def sqlite_pragmas():
+    """Return the PRAGMAs applied to SQLite connections, from the environment."""
+    if not config('SQLITE_TUNED', default=True, cast=bool):
+        return {}
+    return {
+        'journal_mode': 'WAL',
+        'busy_timeout': config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int),
+        'synchronous': 'NORMAL',
+        'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
+        # Negative values are KiB: a 64 MiB page cache per connection.
+        'cache_size': config('SQLITE_CACHE_SIZE', default=-64000, cast=int),
+        'temp_store': 'MEMORY',
+    }
+
+
+def slow_query_ms():
+    """Statements slower than this are logged with their plan (api.slow_queries); 0 disables."""
+    return config('DB_SLOW_QUERY_MS', default=100, cast=float)
+
+
+def sqlite_config(base_dir):
+    """Settings for the SQLite profile."""
+    pragmas = sqlite_pragmas()
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': config('DB_NAME', default=str(base_dir / 'db.sqlite3')),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'} if pragmas else {},
+        # Read by configure_sqlite(); Django ignores unknown top-level keys.
+        'PRAGMAS': pragmas,
+        'SLOW_QUERY_MS': slow_query_ms(),
+    }
+
+
+def postgresql_config():
+    """Settings for the PostgreSQL profile."""
+    options = {}
+    conn_max_age = config('DB_CONN_MAX_AGE', default=60, cast=int)
+    if config('DB_POOL', default=False, cast=bool):
+        if importlib.util.find_spec('psycopg_pool') is None:
+            raise ImproperlyConfigured('DB_POOL=True needs psycopg 3 with psycopg_pool installed.')
+        options['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
+        # Pooled connections go back to the pool at the end of each request.
+        conn_max_age = 0
+    statement_timeout = config('DB_STATEMENT_TIMEOUT_MS', default=0, cast=int)
+    if statement_timeout:
+        options['options'] = f'-c statement_timeout={statement_timeout}'
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': config('DB_NAME', default='collabmarket'),
+        'USER': config('DB_USER', default='collabmarket'),
+        'PASSWORD': config('DB_PASSWORD', default=''),
+        'HOST': config('DB_HOST', default='localhost'),
+        'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': conn_max_age,
+        'CONN_HEALTH_CHECKS': conn_max_age != 0,
+        'OPTIONS': options,
+        'SLOW_QUERY_MS': slow_query_ms(),
+    }
+
+
+def database_config(base_dir):
+    """Return the ``DATABASES['default']`` entry for ``DB_PROFILE``."""
+    profile = config('DB_PROFILE', default='sqlite')
+    if profile == 'sqlite':
+        return sqlite_config(base_dir)
+    if profile == 'postgresql':
+        return postgresql_config()
+    raise ImproperlyConfigured(f"Unknown DB_PROFILE {profile!r}; use 'sqlite' or 'postgresql'.")
+
+
+def replica_configs(primary):
+    """Return ``{alias: settings}`` for each replica in ``DB_REPLICAS``."""
+    replicas = {}
+    for number, location in enumerate(config('DB_REPLICAS', default='', cast=Csv()), 1):
+        field = 'NAME' if primary['ENGINE'] == 'django.db.backends.sqlite3' else 'HOST'
+        replicas[f'replica_{number}'] = {
+            **primary,
+            field: location,
+            # Tests read the replica through the primary's connection.
+            'TEST': {'MIRROR': 'default'},
+        }
+    return replicas
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply the profile's PRAGMAs to each new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if not pragmas:
+        return
+    # On the raw connection: setup is not a query for budgets or the debug log.
+    for name, value in pragmas.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def instrument_queries(sender, connection, **kwargs):
+    """Count each connection's queries for the request metrics, and log slow ones."""
+    # Imported here: this module is loaded by the settings, before Django is set up.
+    from .metrics import record_query
+    from .slow_queries import log_slow_queries
+
+    for wrapper in (record_query, log_slow_queries):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
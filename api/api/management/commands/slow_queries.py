@@ -0,0 +1,78 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.slow_queries import read_entries, top_queries
+
+
+class Command(BaseCommand):
+    """
+    Report the slowest query fingerprints from the slow-query log.
+
+    Entries in SLOW_QUERY_LOG_PATH are grouped by fingerprint, so one
+    statement run with different values is one line. For each group the
+    report shows how often it ran, its total, mean and max time, the
+    endpoints that ran it, the parameters of its slowest run and its
+    latest plan.
+    """
+
+    help = 'Print the top slow-query fingerprints with their endpoints and plans.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Number of fingerprints to report (default: 20).',
+        )
+        parser.add_argument(
+            '--order-by',
+            choices=['total_ms', 'count', 'max_ms'],
+            default='total_ms',
+            help='Rank fingerprints by total time, run count or slowest run (default: total_ms).',
+        )
+        parser.add_argument(
+            '--hours',
+            type=float,
+            default=None,
+            help='Only include queries logged within this many hours.',
+        )
+        parser.add_argument(
+            '--path',
+            default=None,
+            help='Log file to read (default: SLOW_QUERY_LOG_PATH).',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the report as JSON.',
+        )
+
+    def handle(self, *args, **options):
+        if options['top'] < 1:
+            raise CommandError('--top must be at least 1.')
+        since = timezone.now() - timedelta(hours=options['hours']) if options['hours'] is not None else None
+
+        groups = top_queries(read_entries(options['path'], since), options['top'], options['order_by'])
+        if options['json']:
+            self.stdout.write(json.dumps(groups, indent=2, default=str))
+            return
+        if not groups:
+            self.stdout.write('No slow queries logged.')
+            return
+
+        for rank, group in enumerate(groups, 1):
+            views = ', '.join(f'{view} ({count})' for view, count in group['views'].most_common(3))
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{rank}. {group['fingerprint']}  {group['count']} run(s), total {group['total_ms']:.0f} ms, "
+                f"mean {group['mean_ms']:.0f} ms, max {group['max_ms']:.0f} ms"
+            ))
+            self.stdout.write(f"   SQL: {group['sql']}")
+            self.stdout.write(f'   Endpoints: {views}')
+            slowest = group['slowest']
+            self.stdout.write(f"   Slowest run: {slowest['at']} with params {slowest['params']}")
+            plan = group['plan'] or slowest.get('plan_error') or 'not explained'
+            for line in plan.splitlines():
+                self.stdout.write(f'   | {line}')
@@ -0,0 +1,213 @@
+"""
+Per-endpoint request metrics, exposed to Prometheus on ``/metrics``.
+
+``MetricsMiddleware`` records, for every request, labelled by endpoint (the
+URL name, e.g. ``campaign-list``) and method:
+
+* ``api_request_duration_seconds``: latency, with buckets at the targets in
+  docs/features.md (200, 300, 400 and 500 ms);
+* ``api_requests_total``: requests, also labelled by status code;
+* ``api_request_db_queries`` and ``api_request_db_seconds``: the queries
+  the request ran on any database, and their total time;
+* ``api_request_serializer_seconds``: time spent in DRF serializers,
+  validating (``is_valid()``) and representing (``.data``);
+* ``api_response_size_bytes``: the body as sent, after compression.
+  Streaming responses are not measured.
+
+Queries are counted by an execute wrapper that api/db.py adds to every
+connection when it is created, so queries run on ``sync_to_async`` threads
+are attributed to the async request that awaited them. Serializer
+time comes from wrapping ``BaseSerializer.data`` and ``is_valid()`` once,
+when the middleware is loaded.
+
+Under gunicorn every worker keeps its own counters. Set
+``PROMETHEUS_MULTIPROC_DIR`` to an empty, writable directory before the
+server starts. Workers then write their samples there, and ``/metrics``
+aggregates across workers whichever worker answers. Clear the directory on
+each deploy.
+
+``/metrics`` only answers requests carrying ``Authorization: Bearer
+<METRICS_TOKEN>``, and answers 404 while ``METRICS_TOKEN`` is unset. Client
+addresses are not trusted: behind a reverse proxy on the same host every
+request comes from the loopback address.
+"""
+import hmac
+import os
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = tuple(256 * 4 ** power for power in range(8))  # 256 B to 4 MiB
+
+REQUEST_DURATION = Histogram(
+    'api_request_duration_seconds', 'Request latency.', ['endpoint', 'method'], buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter('api_requests', 'Requests served.', ['endpoint', 'method', 'status'])
+DB_QUERIES = Histogram(
+    'api_request_db_queries', 'Database queries per request.', ['endpoint', 'method'], buckets=QUERY_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    'api_request_db_seconds', 'Database time per request.', ['endpoint', 'method'], buckets=LATENCY_BUCKETS,
+)
+SERIALIZER_SECONDS = Histogram(
+    'api_request_serializer_seconds', 'Serializer time per request.', ['endpoint', 'method'],
+    buckets=LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    'api_response_size_bytes', 'Response body size.', ['endpoint', 'method'], buckets=SIZE_BUCKETS,
+)
+COMPRESSION_INPUT = Counter(
+    'api_compression_input_bytes', 'Bytes before compression.', ['endpoint', 'encoding'],
+)
+COMPRESSION_OUTPUT = Counter(
+    'api_compression_output_bytes', 'Bytes after compression.', ['endpoint', 'encoding'],
+)
+COMPRESSION_SECONDS = Counter(
+    'api_compression_seconds', 'Time spent compressing.', ['endpoint', 'encoding'],
+)
+
+SLOW_QUERIES_DROPPED = Counter(
+    'api_slow_queries_dropped', 'Slow-query log entries dropped because the log queue was full.',
+)
+
+KNOWN_METHODS = ('GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+
+class RequestMetrics:
+    """What one request has spent so far."""
+
+    __slots__ = ('request', 'queries', 'db_seconds', 'serializer_seconds')
+
+    def __init__(self, request):
+        self.request = request
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def endpoint_name(request):
+    """Name the endpoint that served ``request``, for metric labels."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match.route
+
+
+def current_endpoint():
+    """Return the endpoint of the request being served, or None outside requests."""
+    metrics = _current.get()
+    return endpoint_name(metrics.request) if metrics is not None else None
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper adding the query's count and time to the current request."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_seconds += time.perf_counter() - started
+
+
+def _timed(function):
+    def wrapper(*args, **kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return function(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            metrics.serializer_seconds += time.perf_counter() - started
+
+    wrapper.timed = True
+    return wrapper
+
+
+def install_serializer_timing():
+    """Time ``BaseSerializer.data`` and ``is_valid()``; safe to call repeatedly."""
+    from rest_framework.serializers import BaseSerializer
+
+    if getattr(BaseSerializer.is_valid, 'timed', False):
+        return
+    # Serializer.data and ListSerializer.data both build on BaseSerializer.data,
+    # and nested serializers use to_representation(), so time is counted once.
+    BaseSerializer.data = property(_timed(BaseSerializer.data.fget))
+    BaseSerializer.is_valid = _timed(BaseSerializer.is_valid)
+
+
+class MetricsMiddleware:
+    """Record latency, queries, serializer time, size and status per endpoint."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        install_serializer_timing()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, started = RequestMetrics(request), time.perf_counter()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.observe(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        metrics, started = RequestMetrics(request), time.perf_counter()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.observe(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    def observe(self, request, response, metrics, seconds):
+        endpoint = endpoint_name(request)
+        method = request.method if request.method in KNOWN_METHODS else 'other'
+        REQUEST_DURATION.labels(endpoint, method).observe(seconds)
+        REQUESTS.labels(endpoint, method, str(response.status_code)).inc()
+        DB_QUERIES.labels(endpoint, method).observe(metrics.queries)
+        DB_SECONDS.labels(endpoint, method).observe(metrics.db_seconds)
+        SERIALIZER_SECONDS.labels(endpoint, method).observe(metrics.serializer_seconds)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(endpoint, method).observe(len(response.content))
+
+
+def metrics_view(request):
+    """Serve the metrics in the Prometheus text format to holders of ``METRICS_TOKEN``."""
+    if not settings.METRICS_TOKEN:
+        raise Http404
+    scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        response = HttpResponse(status=401)
+        response['WWW-Authenticate'] = 'Bearer'
+        return response
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
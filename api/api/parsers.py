@@ -0,0 +1,52 @@
+"""
+Parsers: JSON through orjson, and MessagePack.
+
+``ORJSONParser`` decodes request bodies with orjson instead of the standard
+library. A body orjson rejects is parsed again by DRF's ``JSONParser``, so
+malformed JSON gets the same error as before, as do ``NaN`` and
+``Infinity`` unless ``STRICT_JSON`` is turned off. Integers wider than 64
+bits decode to floats; no field here accepts them anyway.
+
+``MessagePackParser`` accepts ``Content-Type: application/msgpack`` bodies
+carrying the same fields as JSON ones: strings for dates and decimals.
+MessagePack timestamps decode to UTC datetimes.
+"""
+import io
+
+import msgpack
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from .renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """``JSONParser`` decoding with orjson."""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        body = stream.read()
+        try:
+            # orjson reads UTF-8 bytes directly; other charsets are decoded first.
+            utf8 = encoding.lower().replace('_', '-') in ('utf-8', 'utf8')
+            return orjson.loads(body if utf8 else body.decode(encoding))
+        except (orjson.JSONDecodeError, UnicodeDecodeError):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+
+
+class MessagePackParser(BaseParser):
+    """Parse MessagePack request bodies."""
+
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            # Timestamp extension values decode to aware UTC datetimes.
+            return msgpack.unpackb(stream.read(), raw=False, timestamp=3)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
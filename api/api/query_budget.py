@@ -0,0 +1,92 @@
+"""
+Query budgets: cap the number of SQL queries a block of code may run.
+
+``query_budget`` records every query executed on a connection (through an
+execute wrapper, so it works with ``DEBUG = False``) and fails when the
+count goes over the limit. It works as a context manager or a decorator::
+
+    with query_budget(3):
+        client.get('/api/v1/campaigns/')
+
+    @query_budget(5, label='campaign list')
+    def list(self, request, *args, **kwargs):
+        ...
+
+In tests an overrun raises ``QueryBudgetExceeded`` (an ``AssertionError``)
+listing the queries; outside tests pass ``strict=False`` to only log it.
+Budgets should not depend on how many rows are involved, which is what
+``QueryBudgetTestMixin.assertQueryBudget`` checks by running a request at
+several table sizes.
+"""
+import logging
+from contextlib import ContextDecorator
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block runs more queries than its budget allows."""
+
+
+class query_budget(ContextDecorator):
+    """Record the queries run on ``using`` and enforce ``max_queries``."""
+
+    def __init__(self, max_queries, using=DEFAULT_DB_ALIAS, label=None, strict=True):
+        self.max_queries = max_queries
+        self.using = using
+        self.label = label
+        self.strict = strict
+        self.queries = []
+
+    def __len__(self):
+        return len(self.queries)
+
+    def _record(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self.queries = []
+        self._wrapper = connections[self.using].execute_wrapper(self._record)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._wrapper.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None or len(self.queries) <= self.max_queries:
+            return False
+
+        message = (
+            f"{self.label or 'Block'} ran {len(self.queries)} queries, "
+            f"over its budget of {self.max_queries}:\n"
+            + '\n'.join(f'{index}. {sql}' for index, sql in enumerate(self.queries, 1))
+        )
+        if self.strict:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+        return False
+
+
+class QueryBudgetTestMixin:
+    """Test case helpers for pinning per-endpoint query budgets."""
+
+    # Table sizes every budget is checked at; the count must not grow with rows.
+    budget_row_counts = (1, 100)
+
+    def assertQueryBudget(self, max_queries, request, make_rows, label=None):
+        """
+        Check ``request(target)`` stays within ``max_queries`` at every row count.
+
+        ``make_rows(count)`` tops the fixture up to ``count`` rows (outside
+        the budget) and returns the object the request should target, which
+        is passed to ``request(target)``; that performs the call and returns
+        the response.
+        """
+        for count in self.budget_row_counts:
+            target = make_rows(count)
+            with self.subTest(rows=count):
+                with query_budget(max_queries, label=f'{label or "Request"} with {count} row(s)'):
+                    response = request(target)
+                self.assertLess(response.status_code, 400, getattr(response, 'data', response))
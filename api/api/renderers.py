@@ -0,0 +1,81 @@
+"""
+Renderers: JSON through orjson, and MessagePack.
+
+DRF's ``JSONRenderer`` encodes through the standard library's ``json``
+module, which calls back into Python for every date, datetime, decimal and
+lazy translation string. ``ORJSONRenderer`` encodes with orjson, which
+handles datetimes, dates, times and UUIDs natively; anything else goes to
+DRF's own ``JSONEncoder.default()``. So raw decimals still become numbers
+and lazy strings become text, exactly as before. Serializer fields already
+emit decimals (budget, proposed_price, engagement_rate) as strings.
+
+The output decodes to the same value as DRF's: compact UTF-8
+(``UNICODE_JSON``), ``Z`` for UTC, and U+2028/U+2029 escaped. Float
+formatting can differ in spelling only (``1e16`` for ``1e+16``). NaN and
+infinities become ``null`` where DRF (``STRICT_JSON``) raises. Renders
+orjson cannot do fall back to DRF: an ``indent`` in the accepted media type,
+``COMPACT_JSON``/``UNICODE_JSON`` turned off, or integers wider than 64 bits.
+
+``benchmarks/bench_renderers.py`` measures both renderers on campaign
+payloads.
+
+``MessagePackRenderer`` serves clients that send ``Accept:
+application/msgpack`` (or ``?format=msgpack``) the same envelope as compact
+binary. Values are the ones the JSON renderer produces: dates and datetimes
+as the same ISO 8601 strings, and decimals as exact strings, as serializers
+already emit them. JSON stays first in ``DEFAULT_RENDERER_CLASSES``, so
+clients that do not ask for MessagePack are unaffected.
+"""
+from decimal import Decimal
+
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Line and paragraph separators are valid JSON but not valid JavaScript.
+JS_UNSAFE = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class ORJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` with the same output, encoded by orjson."""
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            # e.g. an integer wider than 64 bits, which the json module can encode.
+            return super().render(data, accepted_media_type, renderer_context)
+        for unsafe, escaped in JS_UNSAFE:
+            ret = ret.replace(unsafe, escaped)
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Render the response data as MessagePack."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    @staticmethod
+    def default(obj):
+        if isinstance(obj, Decimal):
+            # A float would lose exactness; serializers use strings too.
+            return str(obj)
+        return JSONEncoder().default(obj)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.default)
@@ -0,0 +1,181 @@
+"""
+Read-replica routing with read-your-writes stickiness.
+
+``PrimaryReplicaRouter`` sends every write to the primary (``default``)
+and, during safe-method requests, reads to one of the
+``DATABASE_REPLICAS``, chosen once per request so that all of a request's
+reads (a list and its count, a parent and its prefetches) see the same
+replica. Reads use the primary everywhere else:
+
+* outside HTTP requests (management commands, workers, shell);
+* during unsafe-method requests (POST, PUT, PATCH, DELETE), so a view never
+  validates against stale rows;
+* inside ``transaction.atomic()``, where a read may precede a write;
+* inside ``use_primary()``, for code that caches what it reads beyond the
+  request (user and template caches, the token blacklist filter, the live
+  campaign listing);
+* for ``REPLICA_STICKY_SECONDS`` after a client's write, so a client never
+  reads data older than its own changes while the replicas catch up.
+
+``ReplicaRoutingMiddleware`` makes the per-request decision. Clients are
+identified by the user id of their bearer token (read without verifying the
+signature: authentication verifies it, and the id only picks a pin) or by
+their session cookie,
+and a write pins that client to the primary through the shared cache, so
+the pin reaches every worker. Only paths under ``REPLICA_READ_PATH_PREFIXES``
+(the API) read from replicas; the admin always uses the primary.
+"""
+import hashlib
+import random
+
+import jwt
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# The replica the current request reads from, or None for the primary.
+_replica = ContextVar('replica', default=None)
+
+
+class use_primary(ContextDecorator):
+    """Read from the primary inside this block, whatever the request."""
+
+    def __enter__(self):
+        self._token = _replica.set(None)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _replica.reset(self._token)
+        return False
+
+
+class PrimaryReplicaRouter:
+    """Route writes to the primary and eligible reads to the request's replica."""
+
+    def __init__(self, primary=DEFAULT_DB_ALIAS, replicas=None):
+        self.primary = primary
+        self.replicas = list(settings.DATABASE_REPLICAS if replicas is None else replicas)
+        self.pool = {primary, *self.replicas}
+
+    def db_for_read(self, model, **hints):
+        replica = _replica.get()
+        if replica not in self.replicas or connections[self.primary].in_atomic_block:
+            return self.primary
+        return replica
+
+    def db_for_write(self, model, **hints):
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._state.db in self.pool and obj2._state.db in self.pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive their schema (and data) from the primary.
+        if db in self.replicas:
+            return False
+        return None
+
+
+def _pin_key(client):
+    return f'db:primary-pin:{client}'
+
+
+def _session_client(session_key):
+    return 'session:' + hashlib.sha256(session_key.encode()).hexdigest()[:32]
+
+
+def client_key(request):
+    """Identify the client behind ``request`` without touching the database."""
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    scheme, _, raw_token = header.partition(' ')
+    if scheme in jwt_settings.AUTH_HEADER_TYPES and raw_token:
+        try:
+            claims = jwt.decode(raw_token, options={'verify_signature': False})
+        except jwt.InvalidTokenError:
+            return None
+        user_id = claims.get(jwt_settings.USER_ID_CLAIM)
+        return f'user:{user_id}' if user_id is not None else None
+    session = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session:
+        return _session_client(session)
+    return None
+
+
+def pin_to_primary(client):
+    """Serve ``client``'s reads from the primary for ``REPLICA_STICKY_SECONDS``."""
+    cache.set(_pin_key(client), True, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned(client):
+    return bool(cache.get(_pin_key(client)))
+
+
+class ReplicaRoutingMiddleware:
+    """Pick a replica for safe requests from clients that have not just written."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        if request.method in SAFE_METHODS:
+            token = _replica.set(self.choose_replica(request))
+            try:
+                return self.get_response(request)
+            finally:
+                _replica.reset(token)
+
+        response = self.get_response(request)
+        self.pin_writer(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        if request.method in SAFE_METHODS:
+            token = _replica.set(self.choose_replica(request))
+            try:
+                return await self.get_response(request)
+            finally:
+                _replica.reset(token)
+
+        response = await self.get_response(request)
+        self.pin_writer(request, response)
+        return response
+
+    def choose_replica(self, request):
+        """Return the replica ``request`` reads from, or None for the primary."""
+        if not request.path.startswith(settings.REPLICA_READ_PATH_PREFIXES):
+            return None
+        client = client_key(request)
+        if client is not None and is_pinned(client):
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def pin_writer(self, request, response):
+        client = client_key(request)
+        if client is not None:
+            pin_to_primary(client)
+        session = response.cookies.get(settings.SESSION_COOKIE_NAME)
+        if session is not None and session.value:
+            # A session started by this write (e.g. a login) is pinned too.
+            pin_to_primary(_session_client(session.value))
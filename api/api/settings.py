@@ -10,9 +10,14 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
+from decouple import config
+
+from .db import database_config, replica_configs
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,11 +52,16 @@ INSTALLED_APPS = [
     'authentication',
     'campaigns',
     'applications',
+    'events',
+    'api',  # management commands (slow_queries)
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'api.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'api.routers.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -80,17 +90,47 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api.wsgi.application'
 
+# Serve the read-heavy API routes with native async views (api/async_views.py);
+# api/asgi.py turns this on, the WSGI entry point keeps the sync views.
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default=False, cast=bool)
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# DB_PROFILE selects a tuned SQLite (default) or PostgreSQL profile; see api/db.py.
 
 DATABASES = {
+    'default': database_config(BASE_DIR),
+}
+DATABASES.update(replica_configs(DATABASES['default']))
+
+# Read replicas serve safe API requests; see api/routers.py
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['api.routers.PrimaryReplicaRouter']
+REPLICA_READ_PATH_PREFIXES = ('/api/',)
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=5, cast=int)  # primary-only reads after a write
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory is per-process; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (Redis, Memcached) in production so invalidations reach every worker.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='collabmarket'),
     }
 }
 
+# Two-tier cache (api/cache.py): an in-process LRU in front of CACHES['default']
+CACHE_LOCAL_MAX_ENTRIES = 512
+CACHE_LOCAL_TIMEOUT = config('CACHE_LOCAL_TIMEOUT', default=5, cast=int)  # seconds a worker trusts its own copy
+CACHE_STALE_SECONDS = 60  # expired values kept to serve while one worker recomputes
+CACHE_LOCK_TIMEOUT = 10  # recompute lock lifetime, and the longest a miss waits for it
+CACHE_EARLY_REFRESH_BETA = 1.0  # > 1 refreshes earlier, 0 disables early refresh
+LIVE_CAMPAIGNS_CACHE_TIMEOUT = config('LIVE_CAMPAIGNS_CACHE_TIMEOUT', default=30, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -111,6 +151,41 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# The first hasher of the selected profile hashes new passwords; the others
+# only verify existing hashes, which are upgraded on the next successful login.
+
+PASSWORD_HASHER_PROFILES = {
+    'argon2': [
+        'authentication.hashers.TunedArgon2PasswordHasher',
+        'authentication.hashers.OffloadedPBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+    ],
+    'pbkdf2': [
+        'authentication.hashers.OffloadedPBKDF2PasswordHasher',
+        'authentication.hashers.TunedArgon2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+    ],
+}
+PASSWORD_HASHER_PROFILE = config('PASSWORD_HASHER_PROFILE', default='argon2')
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+
+# Argon2id costs (memory_cost in KiB); defaults follow the OWASP baseline of
+# 19 MiB, 2 iterations and a single lane, which keeps a login well under 300 ms.
+PASSWORD_HASHER_ARGON2 = {
+    'time_cost': config('ARGON2_TIME_COST', default=2, cast=int),
+    'memory_cost': config('ARGON2_MEMORY_COST', default=19456, cast=int),
+    'parallelism': config('ARGON2_PARALLELISM', default=1, cast=int),
+}
+
+# Run hashing in a dedicated, bounded thread pool (enabled by api/asgi.py)
+PASSWORD_HASHING_OFFLOAD = config('PASSWORD_HASHING_OFFLOAD', default=False, cast=bool)
+PASSWORD_HASHING_THREADS = config('PASSWORD_HASHING_THREADS', default=os.cpu_count() or 1, cast=int)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -148,17 +223,31 @@ CORS_ALLOWED_ORIGINS = [
 ]
 CORS_ALLOW_CREDENTIALS = True
 
+# Stateless mode answers permission checks from the token's role claim and
+# only checks the user's token version in the cache. Without a shared cache
+# (e.g. the default LocMemCache) the version is read from the database instead.
+JWT_STATELESS_AUTH = config('JWT_STATELESS_AUTH', default=False, cast=bool)
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.StatelessJWTAuthentication'
+        if JWT_STATELESS_AUTH else
+        'authentication.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',  # For tests
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.ORJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.ORJSONParser',
+        'api.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
 }
@@ -178,7 +267,76 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_OBTAIN_SERIALIZER': 'authentication.serializers.TokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.serializers.TokenRefreshSerializer',
+}
+
+# Bloom filter in front of the refresh token blacklist (authentication.blacklist)
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = 0.001
+TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS = config('TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS', default=300, cast=int)
+
+# Seconds an authenticated user is served from the cache before it is reloaded
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)
+
+# Rows deleted per transaction by the GDPR deletion worker (process_gdpr_jobs)
+GDPR_DELETION_BATCH_SIZE = config('GDPR_DELETION_BATCH_SIZE', default=500, cast=int)
+GDPR_JOB_LEASE_SECONDS = 900  # a job whose worker stops renewing this is picked up by another
+
+# GDPR data export archives; deliberately outside MEDIA_ROOT (served only to their owner)
+GDPR_EXPORT_ROOT = config('GDPR_EXPORT_ROOT', default=str(BASE_DIR / 'private' / 'exports'))
+
+# Application catalog search (applications.search)
+APPLICATION_SEARCH_CANDIDATES = 200  # rows fetched from the index before re-ranking
+APPLICATION_SEARCH_MIN_SIMILARITY = 0.3  # share of query trigrams a match must contain
+APPLICATION_SEARCH_PAGE_SIZE = 20
+APPLICATION_PAGE_SIZE = 50  # keyset page size for plain catalog listings
+APPLICATION_IMPORT_BATCH_SIZE = 500  # NDJSON lines validated and inserted together
+APPLICATION_IMPORT_MAX_LINES = 10000
+TEMPLATE_CACHE_MAX_AGE = config('TEMPLATE_CACHE_MAX_AGE', default=60, cast=int)  # seconds before a worker reloads its templates anyway
+
+# Event outbox (events app); run `manage.py dispatch_events` to publish
+EVENT_BROKER = {
+    'BACKEND': config('EVENT_BROKER_BACKEND', default='events.brokers.SQLiteBroker'),
+    'OPTIONS': {'path': config('EVENT_BROKER_PATH', default=str(BASE_DIR / 'var' / 'events.sqlite3'))},
+}
+EVENT_OUTBOX_BATCH_SIZE = config('EVENT_OUTBOX_BATCH_SIZE', default=100, cast=int)
+EVENT_OUTBOX_MAX_ATTEMPTS = config('EVENT_OUTBOX_MAX_ATTEMPTS', default=10, cast=int)  # then dead-lettered
+EVENT_OUTBOX_LEASE_SECONDS = 60  # a claimed batch is retried by another dispatcher after this
+EVENT_PUBLISH_SLO_SECONDS = 5  # commit-to-publish target for outbox events
+
+# Server-Sent Events of campaign transitions (campaigns.stream); CachePubSub
+# shares the log through CACHES['default'], MemoryPubSub keeps it per process
+CAMPAIGN_STREAM = {
+    'BACKEND': config('CAMPAIGN_STREAM_BACKEND', default='campaigns.stream.CachePubSub'),
+    'OPTIONS': {'backlog': 500},  # events kept for Last-Event-ID resumption
 }
+CAMPAIGN_STREAM_POLL_SECONDS = 0.5  # how often each process checks the log for other nodes' events
+CAMPAIGN_STREAM_HEARTBEAT_SECONDS = 15
+CAMPAIGN_STREAM_RETRY_MS = 5000  # client reconnect delay; also the WSGI polling interval
+CAMPAIGN_STREAM_QUEUE_SIZE = 100  # events buffered per connection before it is dropped
+
+# Response compression (api/compression.py); Brotli needs the brotli package
+COMPRESSION_PATH_PREFIXES = ('/api/',)  # never the admin: BREACH exposes compressed CSRF tokens
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)  # bytes
+COMPRESSION_SKIP_TYPES = (
+    'image/', 'video/', 'audio/', 'font/woff', 'application/zip', 'application/gzip',
+    'application/x-gzip', 'application/x-brotli', 'application/pdf', 'application/octet-stream',
+)
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 4  # 0-11; above 5 costs far more CPU than it saves bytes on JSON
+
+# Prometheus metrics (api/metrics.py); set PROMETHEUS_MULTIPROC_DIR under gunicorn
+METRICS_TOKEN = config('METRICS_TOKEN', default='')  # bearer token scrapers send; /metrics is off while empty
+
+# Slow-query log (api/slow_queries.py); the threshold is DB_SLOW_QUERY_MS, per connection
+SLOW_QUERY_LOG_PATH = config('SLOW_QUERY_LOG_PATH', default=str(BASE_DIR / 'var' / 'slow_queries.jsonl'))
+SLOW_QUERY_QUEUE_SIZE = 1000  # entries waiting to be written; more are dropped and counted
+SLOW_QUERY_EXPLAIN_INTERVAL = 60  # seconds between two EXPLAINs of the same fingerprint
+# Statements on these tables are logged without their parameters
+SLOW_QUERY_REDACTED_TABLES = (
+    'authentication_user', 'django_session', 'token_blacklist_outstandingtoken',
+    'token_blacklist_blacklistedtoken',
+)
 
 # Email Configuration (for password reset)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development
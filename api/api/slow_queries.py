@@ -0,0 +1,276 @@
+"""
+Slow-query log with query plans.
+
+``log_slow_queries`` is an execute wrapper that api/db.py adds to every
+connection whose settings have a ``SLOW_QUERY_MS`` threshold
+(``DB_SLOW_QUERY_MS``, 100 ms by default; 0 turns it off). A statement that
+takes longer is recorded with:
+
+* the endpoint of the request that ran it (``None`` outside requests);
+* its fingerprint: the SQL with literals and parameters replaced by ``?``
+  and ``IN``/``VALUES`` lists collapsed, so runs with different values
+  group together;
+* its parameters, each shortened to ``PARAM_MAX_LENGTH`` characters.
+  Statements on ``SLOW_QUERY_REDACTED_TABLES`` (users, sessions, tokens)
+  have every parameter replaced by ``<redacted>``, and the literals in
+  their plans by ``?``, so password hashes, emails and tokens never reach
+  the log;
+* its plan, from the backend's ``EXPLAIN`` (``EXPLAIN QUERY PLAN`` on
+  SQLite). Only ``SELECT`` statements are explained; EXPLAIN without
+  ANALYZE does not run them. Each fingerprint is explained at most once
+  per ``SLOW_QUERY_EXPLAIN_INTERVAL`` seconds, so a database that is
+  already slow is not also sent an EXPLAIN for every statement.
+
+The request thread only times the statement and hands it over.
+Normalising, explaining and writing happen on a background thread, on that
+thread's own connection, so a slow query does not also wait for its plan.
+The hand-over queue holds at most ``SLOW_QUERY_QUEUE_SIZE`` entries; when
+every query is slow, further entries are dropped and counted in
+``api_slow_queries_dropped_total`` rather than piling up in memory.
+
+Entries are appended as JSON lines to ``SLOW_QUERY_LOG_PATH`` and logged as
+warnings. ``manage.py slow_queries`` aggregates them by fingerprint into a
+top-N report.
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .metrics import SLOW_QUERIES_DROPPED, current_endpoint
+
+logger = logging.getLogger(__name__)
+
+PARAM_MAX_LENGTH = 200
+PARAM_MAX_ROWS = 10  # of an executemany() batch
+REDACTED = '<redacted>'
+
+_NORMALIZERS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),  # string literals
+    (re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b'), '?'),  # numbers, but not inside identifiers
+    (re.compile(r'%s|%\(\w+\)s|\?'), '?'),  # placeholders
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),  # IN (?, ?, ...) and VALUES rows
+    (re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+'), '(...)'),  # multi-row VALUES
+    (re.compile(r'\s+'), ' '),
+]
+
+# True on the explain thread, so EXPLAIN statements are not logged themselves.
+_explaining = ContextVar('slow_query_explaining', default=False)
+
+
+def normalize(sql):
+    """Return ``sql`` with its values replaced, for grouping similar statements."""
+    for pattern, replacement in _NORMALIZERS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()[:12]
+
+
+def _shorten(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= PARAM_MAX_LENGTH else text[:PARAM_MAX_LENGTH] + '...'
+
+
+def is_redacted(sql):
+    """Return whether ``sql`` touches one of ``SLOW_QUERY_REDACTED_TABLES``."""
+    return any(
+        re.search(rf'\b{re.escape(table)}\b', sql, re.IGNORECASE)
+        for table in settings.SLOW_QUERY_REDACTED_TABLES
+    )
+
+
+def loggable_params(params, many, redact=False):
+    """Return a JSON-safe, shortened (or, with ``redact``, masked) copy of a statement's parameters."""
+    if params is None:
+        return None
+    clean = (lambda value: REDACTED) if redact else _shorten
+    if many:
+        return [loggable_params(row, False, redact) for row in list(params)[:PARAM_MAX_ROWS]]
+    if isinstance(params, dict):
+        return {key: clean(value) for key, value in params.items()}
+    return [clean(value) for value in params]
+
+
+def explain(alias, sql, params):
+    """Return the plan of a SELECT statement on ``alias``, as text."""
+    connection = connections[alias]
+    token = _explaining.set(True)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            rows = cursor.fetchall()
+    finally:
+        _explaining.reset(token)
+        # This thread's own connection; the request's is untouched.
+        connection.close()
+    return '\n'.join(' '.join(str(column) for column in row) for row in rows)
+
+
+class SlowQueryLog:
+    """Records slow statements from a background thread."""
+
+    def __init__(self):
+        self._queue = None
+        self._lock = threading.Lock()
+        self._explained_at = {}  # fingerprint -> time.monotonic() of its last EXPLAIN
+
+    def submit(self, **entry):
+        """Queue ``entry`` for recording; drop it if the queue is full."""
+        with self._lock:
+            if self._queue is None:
+                self._queue = queue.Queue(maxsize=settings.SLOW_QUERY_QUEUE_SIZE)
+                threading.Thread(target=self._work, name='slow-query-log', daemon=True).start()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            SLOW_QUERIES_DROPPED.inc()
+
+    def flush(self, timeout=None):
+        """Wait until the entries submitted so far have been written."""
+        if self._queue is None:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError('slow-query log not flushed')
+                self._queue.all_tasks_done.wait(remaining)
+
+    def _work(self):
+        while True:
+            entry = self._queue.get()
+            try:
+                self._record(entry)
+            except Exception:
+                logger.exception('Could not record a slow query')
+            finally:
+                self._queue.task_done()
+
+    def _should_explain(self, entry_fingerprint):
+        now = time.monotonic()
+        interval = settings.SLOW_QUERY_EXPLAIN_INTERVAL
+        last = self._explained_at.get(entry_fingerprint)
+        if last is not None and now - last < interval:
+            return False
+        if len(self._explained_at) >= 1024:
+            self._explained_at = {key: at for key, at in self._explained_at.items() if now - at < interval}
+        self._explained_at[entry_fingerprint] = now
+        return True
+
+    def _record(self, entry):
+        sql, params = entry.pop('sql'), entry.pop('params')
+        redact = is_redacted(sql)
+        entry['sql'] = normalize(sql)
+        entry['fingerprint'] = fingerprint(entry['sql'])
+        entry['params'] = loggable_params(params, entry['many'], redact)
+        entry['plan'] = None
+        if (
+            not entry['many'] and sql.lstrip().upper().startswith(('SELECT', 'WITH'))
+            and self._should_explain(entry['fingerprint'])
+        ):
+            try:
+                plan = explain(entry['alias'], sql, params)
+                # Some backends (PostgreSQL) print parameter values in the plan.
+                entry['plan'] = _NORMALIZERS[0][0].sub('?', plan) if redact else plan
+            except Exception as exc:
+                entry['plan_error'] = str(exc)
+        logger.warning('Slow query (%.0f ms) in %s: %s', entry['ms'], entry['view'], entry['sql'])
+        self.write(entry)
+
+    def write(self, entry):
+        path = settings.SLOW_QUERY_LOG_PATH
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        line = (json.dumps(entry, default=str) + '\n').encode()
+        # One write() per entry on an O_APPEND file, so processes do not interleave.
+        descriptor = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+        try:
+            os.write(descriptor, line)
+        finally:
+            os.close(descriptor)
+
+
+slow_query_log = SlowQueryLog()
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    """Execute wrapper recording statements slower than the connection's ``SLOW_QUERY_MS``."""
+    threshold = context['connection'].settings_dict.get('SLOW_QUERY_MS')
+    if not threshold or _explaining.get():
+        return execute(sql, params, many, context)
+    if many and not isinstance(params, (list, tuple)):
+        # executemany() may be given a generator, which the log reads again.
+        params = list(params)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        ms = (time.perf_counter() - started) * 1000
+        if ms >= threshold:
+            slow_query_log.submit(
+                at=timezone.now().isoformat(), alias=context['connection'].alias, view=current_endpoint(),
+                ms=round(ms, 3), many=many, sql=sql, params=params,
+            )
+
+
+def read_entries(path=None, since=None):
+    """Yield the logged entries, skipping those before ``since`` and torn lines."""
+    try:
+        log = open(path or settings.SLOW_QUERY_LOG_PATH)
+    except FileNotFoundError:
+        return
+    with log:
+        for line in log:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if since is None or parse_datetime(entry['at']) >= since:
+                yield entry
+
+
+def top_queries(entries, top=20, order_by='total_ms'):
+    """
+    Aggregate ``entries`` by fingerprint and return the ``top`` groups.
+
+    Groups are ordered by ``order_by``: ``total_ms``, ``count`` or ``max_ms``.
+    Each keeps its slowest entry, whose parameters show a concrete run, and
+    the latest plan logged for the fingerprint (EXPLAIN is rate-limited, so
+    the slowest run may not have one).
+    """
+    groups = {}
+    for entry in entries:
+        group = groups.get(entry['fingerprint'])
+        if group is None:
+            group = groups[entry['fingerprint']] = {
+                'fingerprint': entry['fingerprint'], 'sql': entry['sql'], 'count': 0,
+                'total_ms': 0.0, 'max_ms': 0.0, 'views': Counter(), 'slowest': entry, 'plan': None,
+            }
+        group['count'] += 1
+        group['total_ms'] += entry['ms']
+        group['views'][entry['view']] += 1
+        if entry.get('plan'):
+            group['plan'] = entry['plan']
+        if entry['ms'] >= group['max_ms']:
+            group['max_ms'] = entry['ms']
+            group['slowest'] = entry
+    for group in groups.values():
+        group['mean_ms'] = group['total_ms'] / group['count']
+    return sorted(groups.values(), key=lambda group: group[order_by], reverse=True)[:top]
+
@@ -0,0 +1,662 @@
+import asyncio
+import datetime
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+import zlib
+from decimal import Decimal
+
+import brotli
+import jwt
+import msgpack
+from asgiref.sync import async_to_sync
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from prometheus_client import REGISTRY
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from campaigns import cache as live_cache
+from events.models import OutboxEvent
+
+from .cache import CacheEntry, TwoTierCache
+from .compression import CompressionMiddleware, compression_stats, negotiate
+from .db import database_config
+from .metrics import metrics_view
+from .slow_queries import SlowQueryLog, normalize, read_entries, slow_query_log, top_queries
+from .parsers import MessagePackParser, ORJSONParser
+from .renderers import MessagePackRenderer, ORJSONRenderer
+from .routers import PrimaryReplicaRouter, ReplicaRoutingMiddleware, client_key, use_primary
+
+
+class DatabaseProfileTest(SimpleTestCase):
+    """Test the environment-driven database profiles."""
+    
+    def test_sqlite_profile(self):
+        """Test that the default profile is a tuned SQLite file."""
+        with mock.patch.dict(os.environ, {}, clear=True):
+            config = database_config(Path('/srv/app'))
+        self.assertEqual(config['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(config['NAME'], '/srv/app/db.sqlite3')
+        self.assertEqual(config['OPTIONS'], {'transaction_mode': 'IMMEDIATE'})
+        self.assertEqual(config['PRAGMAS']['journal_mode'], 'WAL')
+        self.assertEqual(config['PRAGMAS']['synchronous'], 'NORMAL')
+    
+    def test_untuned_sqlite_profile(self):
+        """Test that SQLITE_TUNED=False gives stock SQLite settings."""
+        with mock.patch.dict(os.environ, {'SQLITE_TUNED': 'False'}, clear=True):
+            config = database_config(Path('/srv/app'))
+        self.assertEqual(config['PRAGMAS'], {})
+        self.assertEqual(config['OPTIONS'], {})
+    
+    def test_postgresql_profile(self):
+        """Test persistent connections, and that the pool replaces them."""
+        env = {'DB_PROFILE': 'postgresql', 'DB_HOST': 'db', 'DB_CONN_MAX_AGE': '300'}
+        with mock.patch.dict(os.environ, env, clear=True):
+            config = database_config(Path('/srv/app'))
+        self.assertEqual(config['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(config['HOST'], 'db')
+        self.assertEqual(config['CONN_MAX_AGE'], 300)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        
+        with mock.patch.dict(os.environ, {**env, 'DB_POOL': 'True', 'DB_POOL_MAX_SIZE': '20'}, clear=True):
+            with mock.patch('importlib.util.find_spec', return_value=object()):
+                config = database_config(Path('/srv/app'))
+            self.assertEqual(config['CONN_MAX_AGE'], 0)
+            self.assertEqual(config['OPTIONS']['pool']['max_size'], 20)
+            
+            with mock.patch('importlib.util.find_spec', return_value=None):
+                with self.assertRaises(ImproperlyConfigured):
+                    database_config(Path('/srv/app'))
+    
+    def test_unknown_profile(self):
+        """Test that a typo in DB_PROFILE fails loudly."""
+        with mock.patch.dict(os.environ, {'DB_PROFILE': 'mysql'}, clear=True):
+            with self.assertRaises(ImproperlyConfigured):
+                database_config(Path('/srv/app'))
+
+
+class SQLitePragmaTest(TestCase):
+    """Test that new SQLite connections get the profile's PRAGMAs."""
+    
+    def test_pragmas_applied(self):
+        """Test the busy timeout and synchronous mode on the live connection."""
+        pragmas = connection.settings_dict.get('PRAGMAS')
+        if connection.vendor != 'sqlite' or not pragmas:
+            self.skipTest('tuned SQLite profile only')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], pragmas['busy_timeout'])
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+
+class ReplicaRoutingTest(unittest.TestCase):
+    """
+    Test replica routing against two SQLite files standing in for primary and replica.
+    
+    A plain unittest case: the two aliases are added at run time, outside the
+    test database setup that Django's test cases guard.
+    """
+    
+    aliases = ('router_primary', 'router_replica')
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        databases = {DEFAULT_DB_ALIAS: dict(connections.settings[DEFAULT_DB_ALIAS])}
+        for alias in cls.aliases:
+            databases[alias] = {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(cls.directory.name, f'{alias}.sqlite3'),
+            }
+        databases = connections.configure_settings(databases)
+        for alias in cls.aliases:
+            connections.settings[alias] = databases[alias]
+            with connections[alias].schema_editor() as editor:
+                editor.create_model(OutboxEvent)
+    
+    @classmethod
+    def tearDownClass(cls):
+        for alias in cls.aliases:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+        cls.directory.cleanup()
+        super().tearDownClass()
+    
+    def setUp(self):
+        router = PrimaryReplicaRouter(primary='router_primary', replicas=['router_replica'])
+        override = override_settings(DATABASE_ROUTERS=[router], DATABASE_REPLICAS=['router_replica'])
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(cache.clear)
+        self.addCleanup(OutboxEvent.objects.using('router_primary').all().delete)
+        self.addCleanup(OutboxEvent.objects.using('router_replica').all().delete)
+        self.factory = RequestFactory()
+        # Written to the primary only: the replica has not caught up yet.
+        OutboxEvent.objects.create(event_type='test.routed', dedup_key='routed')
+    
+    def _request(self, method, path='/api/v1/campaigns/', user_id=None, view=None):
+        """Run a request through the middleware; return whether the view saw the new row."""
+        headers = {}
+        if user_id is not None:
+            token = AccessToken()
+            token['user_id'] = user_id
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        request = getattr(self.factory, method)(path, **headers)
+        view = view or (lambda request: OutboxEvent.objects.filter(dedup_key='routed').exists())
+        middleware = ReplicaRoutingMiddleware(lambda request: HttpResponse(str(view(request))))
+        return middleware(request).content == b'True'
+    
+    def test_writes_and_unscoped_reads_use_primary(self):
+        """Test that the write went to the primary and reads outside requests follow it."""
+        self.assertTrue(OutboxEvent.objects.using('router_primary').filter(dedup_key='routed').exists())
+        self.assertFalse(OutboxEvent.objects.using('router_replica').exists())
+        self.assertTrue(OutboxEvent.objects.filter(dedup_key='routed').exists())
+    
+    def test_safe_api_reads_use_replica(self):
+        """Test that GET requests read the (stale) replica, and unsafe or admin requests do not."""
+        self.assertFalse(self._request('get', user_id=1))
+        self.assertTrue(self._request('post', user_id=None))
+        self.assertTrue(self._request('get', path='/admin/'))
+        
+        OutboxEvent.objects.using('router_replica').create(event_type='test.routed', dedup_key='routed')
+        self.assertTrue(self._request('get', user_id=1))
+    
+    def test_read_your_writes(self):
+        """Test that a client's reads stick to the primary after its write, and others' do not."""
+        self._request('post', user_id=7)
+        self.assertTrue(self._request('get', user_id=7))
+        self.assertFalse(self._request('get', user_id=8))
+        
+        cache.clear()  # the sticky window expires
+        self.assertFalse(self._request('get', user_id=7))
+    
+    def test_use_primary_and_transactions_override_replica(self):
+        """Test the explicit primary block and reads inside atomic blocks."""
+        def primary_view(request):
+            with use_primary():
+                return OutboxEvent.objects.filter(dedup_key='routed').exists()
+        
+        def atomic_view(request):
+            with transaction.atomic(using='router_primary'):
+                return OutboxEvent.objects.filter(dedup_key='routed').exists()
+        
+        self.assertTrue(self._request('get', view=primary_view))
+        self.assertTrue(self._request('get', view=atomic_view))
+    
+    def test_one_replica_per_request(self):
+        """Test that every read of a request goes to the replica chosen for it."""
+        router = PrimaryReplicaRouter(primary='router_primary', replicas=['replica_a', 'replica_b'])
+        chosen = set()
+        
+        def view(request):
+            aliases = {router.db_for_read(OutboxEvent) for _ in range(20)}
+            chosen.update(aliases)
+            return len(aliases) == 1
+        
+        with override_settings(DATABASE_REPLICAS=['replica_a', 'replica_b']):
+            for _ in range(20):
+                self.assertTrue(self._request('get', user_id=1, view=view))
+        self.assertLessEqual(chosen, {'replica_a', 'replica_b'})
+    
+    def test_client_key_does_not_verify_signature(self):
+        """Test that the pin is keyed on the user id claim without verifying the token."""
+        forged = jwt.encode({'user_id': 42}, 'not-the-signing-key', algorithm='HS256')
+        request = RequestFactory().get('/api/v1/campaigns/', HTTP_AUTHORIZATION=f'Bearer {forged}')
+        
+        with mock.patch('rest_framework_simplejwt.backends.TokenBackend.decode') as decode:
+            self.assertEqual(client_key(request), 'user:42')
+        decode.assert_not_called()
+        self.assertIsNone(client_key(RequestFactory().get('/', HTTP_AUTHORIZATION='Bearer garbage')))
+    
+    def test_cached_listings_are_built_from_primary(self):
+        """Test that the shared campaign listing is never built from a lagging replica."""
+        self.addCleanup(live_cache.invalidate)
+        
+        def read():
+            return OutboxEvent.objects.filter(dedup_key='routed').exists()
+        
+        async def aread():
+            return await OutboxEvent.objects.filter(dedup_key='routed').aexists()
+        
+        def listing_view(request):
+            return live_cache.get_listing({'category': 'sync'}, read)
+        
+        def async_listing_view(request):
+            return async_to_sync(live_cache.aget_listing)({'category': 'async'}, aread)
+        
+        self.assertTrue(self._request('get', view=listing_view))
+        self.assertTrue(self._request('get', view=async_listing_view))
+
+
+@override_settings(
+    CACHE_LOCAL_MAX_ENTRIES=2, CACHE_LOCAL_TIMEOUT=60, CACHE_STALE_SECONDS=60,
+    CACHE_LOCK_TIMEOUT=2, CACHE_EARLY_REFRESH_BETA=1.0,
+)
+class TwoTierCacheTest(SimpleTestCase):
+    """Test the two-tier cache and its stampede protection."""
+    
+    def setUp(self):
+        cache.clear()
+        self.cache = TwoTierCache()
+        self.calls = 0
+    
+    def compute(self, value='fresh', delay=0):
+        def compute():
+            self.calls += 1
+            time.sleep(delay)
+            return value
+        return compute
+    
+    def test_local_tier_serves_without_shared_cache(self):
+        """Test that a warm key is served from process memory."""
+        self.assertEqual(self.cache.get_or_set('key', self.compute(), 30), 'fresh')
+        with mock.patch.object(cache, 'get', side_effect=AssertionError('shared cache read')):
+            self.assertEqual(self.cache.get_or_set('key', self.compute('other'), 30), 'fresh')
+        self.assertEqual(self.calls, 1)
+    
+    def test_shared_tier_fills_other_processes(self):
+        """Test that a second process reuses the value without computing it."""
+        self.cache.get_or_set('key', self.compute(), 30)
+        other = TwoTierCache()
+        self.assertEqual(other.get_or_set('key', self.compute('other'), 30), 'fresh')
+        self.assertEqual(self.calls, 1)
+    
+    def test_local_tier_is_bounded(self):
+        """Test that the least recently used local entries are evicted."""
+        for key in ('a', 'b', 'c'):
+            self.cache.get_or_set(key, self.compute(key), 30)
+        self.assertEqual(list(self.cache._local), ['b', 'c'])
+    
+    def test_namespace_invalidation(self):
+        """Test that invalidating a namespace retires local copies too."""
+        self.cache.get_or_set('key', self.compute('old'), 30, namespace='ns')
+        self.cache.invalidate('ns')
+        self.assertEqual(self.cache.get_or_set('key', self.compute('new'), 30, namespace='ns'), 'new')
+    
+    def test_single_flight(self):
+        """Test that concurrent misses in one process compute once."""
+        results = []
+        
+        def read():
+            results.append(self.cache.get_or_set('key', self.compute(delay=0.2), 30))
+        
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['fresh'] * 8)
+        self.assertEqual(self.calls, 1)
+    
+    def test_locked_key_serves_stale_value(self):
+        """Test that another process's recompute lock makes readers serve the stale value."""
+        cache.set('key', CacheEntry('stale', time.time() - 1, 0.01), 60)
+        cache.add('key:lock', 'other-process', 10)
+        self.assertEqual(self.cache.get_or_set('key', self.compute(), 30), 'stale')
+        self.assertEqual(self.calls, 0)
+    
+    def test_locked_miss_waits_for_holder(self):
+        """Test that a miss waits for the lock holder's value instead of computing."""
+        cache.add('key:lock', 'other-process', 10)
+        timer = threading.Timer(0.1, lambda: cache.set('key', CacheEntry('theirs', time.time() + 30, 0.01), 90))
+        timer.start()
+        self.assertEqual(self.cache.get_or_set('key', self.compute(), 30), 'theirs')
+        timer.join()
+        self.assertEqual(self.calls, 0)
+    
+    def test_lock_released_after_compute(self):
+        """Test that the recompute lock is released, even when compute fails."""
+        with self.assertRaises(ZeroDivisionError):
+            self.cache.get_or_set('key', lambda: 1 / 0, 30)
+        self.assertIsNone(cache.get('key:lock'))
+    
+    def test_early_refresh(self):
+        """Test that a value near expiry is recomputed before it expires."""
+        cache.set('key', CacheEntry('old', time.time() + 0.5, 1.0), 60)
+        # -log(1 - 0.9) is 2.3: 2.3 seconds of recompute time ahead of a 0.5 second expiry.
+        with mock.patch('api.cache.random.random', return_value=0.9):
+            self.assertEqual(self.cache.get_or_set('key', self.compute(), 30), 'fresh')
+        self.assertEqual(self.calls, 1)
+        
+        cache.set('key', CacheEntry('old', time.time() + 0.5, 1.0), 60)
+        self.cache.clear_local()
+        with mock.patch('api.cache.random.random', return_value=0.9):
+            self.assertEqual(self.cache.get_or_set('key', self.compute(), 30, beta=0), 'old')
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    """Test that the orjson renderer and parser match DRF's JSON ones."""
+    
+    payload = {
+        'status': 'success',
+        'data': [{
+            'id': 1,
+            'budget': Decimal('1500.50'),
+            'deadline': datetime.date(2030, 1, 31),
+            'created_at': datetime.datetime(2030, 1, 1, 9, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'naive': datetime.datetime(2030, 1, 1, 9, 30),
+            'offset': datetime.datetime(2030, 1, 1, 9, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=5, minutes=30))),
+            'starts': datetime.time(9, 30, 0, 250),
+            'label': gettext_lazy('Live'),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'tags': ('a', 'é', 'line\u2028break'),
+            'stats': {1: 0.5, 2: None},
+        }],
+        'errors': None,
+    }
+    
+    def test_same_output_as_drf(self):
+        """Test that the rendered bytes match DRF's JSONRenderer."""
+        self.assertEqual(ORJSONRenderer().render(self.payload), JSONRenderer().render(self.payload))
+    
+    def test_falls_back_to_drf(self):
+        """Test that indented output and integers beyond 64 bits are rendered by DRF."""
+        for data, media_type in [(self.payload, 'application/json; indent=2'), ({'big': 2 ** 70}, None)]:
+            self.assertEqual(
+                ORJSONRenderer().render(data, media_type), JSONRenderer().render(data, media_type),
+            )
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+    
+    def test_parse(self):
+        """Test parsing UTF-8 and other charsets."""
+        parser = ORJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO('{"title": "Café", "budget": "10.00"}'.encode())), {
+            'title': 'Café', 'budget': '10.00',
+        })
+        self.assertEqual(
+            parser.parse(io.BytesIO('["Café"]'.encode('latin-1')), parser_context={'encoding': 'latin-1'}),
+            ['Café'],
+        )
+    
+    def test_parse_falls_back_to_drf(self):
+        """Test that bodies orjson rejects get DRF's handling."""
+        parser = ORJSONParser()
+        with self.assertRaisesMessage(ParseError, 'JSON parse error'):
+            parser.parse(io.BytesIO(b'{"title": '))
+        with self.assertRaisesMessage(ParseError, 'Out of range float values'):
+            parser.parse(io.BytesIO(b'[NaN]'))
+
+
+class MessagePackRendererTest(SimpleTestCase):
+    """Test MessagePack rendering and parsing."""
+    
+    def test_values_match_json(self):
+        """Test that dates and lazy strings render as in JSON, and decimals as exact strings."""
+        payload = ORJSONRendererTest.payload
+        decoded = msgpack.unpackb(MessagePackRenderer().render(payload), strict_map_key=False)
+        expected = json.loads(ORJSONRenderer().render(payload))
+        self.assertEqual(decoded['data'][0]['budget'], '1500.50')
+        decoded['data'][0]['budget'] = expected['data'][0]['budget'] = None
+        # MessagePack keeps integer map keys that JSON turns into strings.
+        decoded['data'][0]['stats'] = {str(key): value for key, value in decoded['data'][0]['stats'].items()}
+        self.assertEqual(decoded, expected)
+    
+    def test_parse(self):
+        """Test parsing a body, and rejecting malformed ones."""
+        parser = MessagePackParser()
+        body = msgpack.packb({'budget': '10.00', 'at': datetime.datetime(2030, 1, 1, tzinfo=datetime.timezone.utc)}, datetime=True)
+        self.assertEqual(parser.parse(io.BytesIO(body)), {
+            'budget': '10.00', 'at': datetime.datetime(2030, 1, 1, tzinfo=datetime.timezone.utc),
+        })
+        with self.assertRaisesMessage(ParseError, 'MessagePack parse error'):
+            parser.parse(io.BytesIO(body[:-3]))
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTest(SimpleTestCase):
+    """Test negotiated response compression."""
+    
+    body = b'{"description":"' + b'Create an engaging reel showcasing our vegan skincare line. ' * 20 + b'"}'
+    
+    def setUp(self):
+        compression_stats.reset()
+    
+    def get(self, response, accept_encoding='gzip, br', path='/api/v1/campaigns/'):
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+    
+    def test_negotiation(self):
+        """Test that q-values are honoured and Brotli wins ties."""
+        self.assertEqual(negotiate('gzip, br').name, 'br')
+        self.assertEqual(negotiate('gzip;q=1.0, br;q=0.5').name, 'gzip')
+        self.assertEqual(negotiate('br;q=0, *').name, 'gzip')
+        self.assertIsNone(negotiate('identity'))
+        self.assertIsNone(negotiate(''))
+    
+    def test_compresses_large_responses(self):
+        """Test that a large response is compressed, with headers to match."""
+        response = self.get(HttpResponse(self.body, content_type='application/json', headers={'ETag': '"v1"'}))
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['ETag'], 'W/"v1"')
+        
+        response = self.get(HttpResponse(self.body, content_type='application/json'), accept_encoding='gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        [row] = [row for row in compression_stats.snapshot() if row['encoding'] == 'gzip']
+        self.assertEqual(row['raw_bytes'], len(self.body))
+        self.assertGreater(row['ratio'], 5)
+    
+    def test_leaves_other_responses_alone(self):
+        """Test the size threshold, compressed media types, other paths and non-accepting clients."""
+        for response, kwargs in [
+            (HttpResponse(b'{}', content_type='application/json'), {}),
+            (HttpResponse(self.body, content_type='image/png'), {}),
+            (HttpResponse(self.body, content_type='text/html'), {'path': '/admin/'}),
+            (HttpResponse(self.body, content_type='application/json'), {'accept_encoding': 'identity'}),
+        ]:
+            response = self.get(response, **kwargs)
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertIn(response.content, (b'{}', self.body))
+        self.assertEqual(compression_stats.snapshot(), [])
+    
+    def test_streams_are_compressed_incrementally(self):
+        """Test that each streamed chunk can be decoded as soon as it arrives."""
+        events = [b'event: campaign.live\ndata: {"id":%d}\n\n' % number for number in range(3)]
+        response = self.get(StreamingHttpResponse(iter(events), content_type='text/event-stream'), 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        decompressor = zlib.decompressobj(31)
+        chunks = iter(response.streaming_content)
+        for event in events:
+            self.assertEqual(decompressor.decompress(next(chunks)), event)
+        b''.join(chunks)
+        self.assertEqual(compression_stats.snapshot()[0]['raw_bytes'], sum(map(len, events)))
+    
+    def test_async_streams(self):
+        """Test compressing an async streaming response."""
+        async def events():
+            for number in range(3):
+                await asyncio.sleep(0)
+                yield f'data: {number}\n\n'
+        
+        async def read():
+            response = self.get(StreamingHttpResponse(events(), content_type='text/event-stream'), 'br')
+            return b''.join([chunk async for chunk in response.streaming_content])
+        
+        self.assertEqual(brotli.decompress(async_to_sync(read)()), b'data: 0\n\ndata: 1\n\ndata: 2\n\n')
+
+
+class MetricsTest(TestCase):
+    """Test the per-endpoint request metrics and the /metrics endpoint."""
+    
+    labels = {'endpoint': 'campaign-list', 'method': 'GET'}
+    
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, {**self.labels, **labels}) or 0
+    
+    def test_request_is_recorded(self):
+        """Test that latency, status, queries, serializer time and size are recorded per endpoint."""
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(email='brand@test.com', password='x', role='BRAND'))
+        names = [
+            ('api_requests_total', {'status': '200'}), ('api_request_duration_seconds_count', {}),
+            ('api_request_db_queries_sum', {}), ('api_request_serializer_seconds_count', {}),
+            ('api_response_size_bytes_sum', {}),
+        ]
+        before = {name: self.sample(name, **labels) for name, labels in names}
+        
+        response = client.get('/api/v1/campaigns/')
+        
+        after = {name: self.sample(name, **labels) for name, labels in names}
+        self.assertEqual(after['api_requests_total'] - before['api_requests_total'], 1)
+        self.assertEqual(after['api_request_duration_seconds_count'] - before['api_request_duration_seconds_count'], 1)
+        self.assertEqual(after['api_request_db_queries_sum'] - before['api_request_db_queries_sum'], 1)
+        self.assertEqual(after['api_request_serializer_seconds_count'] - before['api_request_serializer_seconds_count'], 1)
+        self.assertEqual(after['api_response_size_bytes_sum'] - before['api_response_size_bytes_sum'], len(response.content))
+    
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_endpoint(self):
+        """Test that /metrics serves the Prometheus text format to holders of the token only."""
+        self.client.get('/api/v1/campaigns/')
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'api_requests_total{endpoint="campaign-list",method="GET",status="401"}', response.content)
+        
+        # Behind a local reverse proxy, public requests come from the loopback address.
+        request = RequestFactory().get('/metrics', REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(metrics_view(request).status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+    
+    def test_metrics_endpoint_off_without_token(self):
+        """Test that /metrics is not served until a token is configured."""
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+
+class SlowQueryLogTest(TestCase):
+    """Test the slow-query log and its report."""
+    
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'slow.jsonl')
+        override = override_settings(SLOW_QUERY_LOG_PATH=self.path)
+        override.enable()
+        self.addCleanup(override.disable)
+        # Fingerprints explained by earlier tests would not be explained again.
+        explained = mock.patch.object(slow_query_log, '_explained_at', {})
+        explained.start()
+        self.addCleanup(explained.stop)
+    
+    def test_normalize(self):
+        """Test that values are replaced so similar statements share a fingerprint."""
+        self.assertEqual(
+            normalize('SELECT "t1"."id" FROM "t1"  WHERE "t1"."id" IN (%s, %s, %s) AND "name" = \'x\' LIMIT 21'),
+            'SELECT "t1"."id" FROM "t1" WHERE "t1"."id" IN (...) AND "name" = ? LIMIT ?',
+        )
+        self.assertEqual(
+            normalize('INSERT INTO "t" ("a", "b") VALUES (%s, %s), (%s, %s)'),
+            'INSERT INTO "t" ("a", "b") VALUES (...)',
+        )
+    
+    def test_slow_queries_are_logged_with_view_and_plan(self):
+        """Test that statements over the threshold are logged with their endpoint, params and plan."""
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(email='brand@test.com', password='x', role='BRAND'))
+        with self.assertLogs('api.slow_queries', 'WARNING'):
+            with mock.patch.dict(connection.settings_dict, {'SLOW_QUERY_MS': 0.000001}):
+                client.get('/api/v1/campaigns/')
+            slow_query_log.flush()
+        
+        [entry] = [entry for entry in read_entries() if entry['view'] == 'campaign-list']
+        self.assertIn('FROM "campaigns_campaign"', entry['sql'])
+        self.assertEqual(len(entry['fingerprint']), 12)
+        self.assertIsInstance(entry['params'], list)
+        self.assertTrue(entry['plan'], entry.get('plan_error'))
+    
+    def test_auth_tables_are_redacted(self):
+        """Test that parameters of statements on user and token tables never reach the log."""
+        with self.assertLogs('api.slow_queries', 'WARNING'):
+            with mock.patch.dict(connection.settings_dict, {'SLOW_QUERY_MS': 0.000001}):
+                get_user_model().objects.create_user(email='secret@test.com', password='hunter2-secret')
+                get_user_model().objects.filter(email='secret@test.com').exists()
+            slow_query_log.flush()
+        
+        entries = [entry for entry in read_entries() if 'authentication_user' in entry['sql']]
+        self.assertTrue(entries)
+        self.assertTrue(all(set(entry['params']) == {'<redacted>'} for entry in entries))
+        log = open(self.path).read()
+        self.assertNotIn('secret@test.com', log)
+        self.assertNotIn('pbkdf2', log)
+        self.assertNotIn('argon2', log)
+    
+    @override_settings(SLOW_QUERY_EXPLAIN_INTERVAL=60)
+    def test_explain_is_rate_limited_per_fingerprint(self):
+        """Test that a fingerprint is explained once per interval, however often it is slow."""
+        with self.assertLogs('api.slow_queries', 'WARNING'):
+            with mock.patch.dict(connection.settings_dict, {'SLOW_QUERY_MS': 0.000001}):
+                for number in range(3):
+                    list(OutboxEvent.objects.filter(dedup_key=f'rate-{number}'))
+            slow_query_log.flush()
+        
+        entries = [entry for entry in read_entries() if 'events_outboxevent' in entry['sql']]
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(sum(1 for entry in entries if entry['plan']), 1)
+    
+    def test_full_queue_drops_entries(self):
+        """Test that entries beyond the queue size are dropped and counted, not buffered."""
+        log = SlowQueryLog()
+        release = threading.Event()
+        log._record = lambda entry: release.wait(5)
+        dropped = REGISTRY.get_sample_value('api_slow_queries_dropped_total') or 0
+        
+        with override_settings(SLOW_QUERY_QUEUE_SIZE=2):
+            for _ in range(10):
+                log.submit(sql='SELECT 1', params=None)
+        
+        # One entry in the worker, two queued, the rest dropped.
+        self.assertGreaterEqual(REGISTRY.get_sample_value('api_slow_queries_dropped_total') - dropped, 7)
+        release.set()
+        log.flush(timeout=5)
+    
+    def test_fast_queries_are_not_logged(self):
+        """Test that statements under the threshold are not logged."""
+        with mock.patch.dict(connection.settings_dict, {'SLOW_QUERY_MS': 60000}):
+            get_user_model().objects.count()
+        slow_query_log.flush()
+        self.assertEqual(list(read_entries()), [])
+    
+    def test_report(self):
+        """Test that the report aggregates by fingerprint and ranks the groups."""
+        entries = [
+            {'at': '2030-01-01T00:00:00+00:00', 'fingerprint': 'a', 'sql': 'SELECT a', 'ms': ms,
+             'view': 'campaign-list', 'params': [ms], 'plan': 'SCAN a'}
+            for ms in (150, 250)
+        ] + [{'at': '2030-01-01T00:00:00+00:00', 'fingerprint': 'b', 'sql': 'SELECT b', 'ms': 300,
+              'view': None, 'params': [], 'plan': None}]
+        with open(self.path, 'w') as log:
+            log.write(''.join(json.dumps(entry) + '\n' for entry in entries) + '{"torn')
+        
+        groups = top_queries(read_entries())
+        self.assertEqual([(group['fingerprint'], group['count']) for group in groups], [('a', 2), ('b', 1)])
+        self.assertEqual(groups[0]['slowest']['params'], [250])
+        self.assertEqual(top_queries(read_entries(), top=1, order_by='max_ms')[0]['fingerprint'], 'b')
+        
+        out = io.StringIO()
+        call_command('slow_queries', '--top', '1', stdout=out)
+        self.assertIn('1. a  2 run(s), total 400 ms', out.getvalue())
+        self.assertIn('| SCAN a', out.getvalue())
+
@@ -19,8 +19,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/v1/auth/', include('authentication.urls')),
     path('api/v1/', include('campaigns.urls')),
     path('api/v1/', include('applications.urls')),
@@ -14,7 +14,7 @@ class TemplateAdmin(admin.ModelAdmin):
             'fields': ('name', 'template_id', 'description', 'is_available')
         }),
         ('Configuration', {
-            'fields': ('default_parameters', 'required_parameters')
+            'fields': ('default_parameters', 'required_parameters', 'parameters_schema')
         }),
         ('Metadata', {
             'fields': ('created_at', 'updated_at')
@@ -27,11 +27,11 @@ class ApplicationAdmin(admin.ModelAdmin):
     """Admin interface for Applications."""
     list_display = ('name', 'application_id', 'owner', 'visibility', 'template', 'created_at')
     list_filter = ('visibility', 'created_at', 'template')
-    search_fields = ('name', 'application_id', 'description', 'owner')
-    readonly_fields = ('application_id', 'created_at', 'updated_at')
+    search_fields = ('name', 'application_id', 'legacy_application_id', 'description', 'owner')
+    readonly_fields = ('application_id', 'legacy_application_id', 'created_at', 'updated_at')
     fieldsets = (
         ('Basic Information', {
-            'fields': ('name', 'application_id', 'description', 'owner')
+            'fields': ('name', 'application_id', 'legacy_application_id', 'description', 'owner')
         }),
         ('Configuration', {
             'fields': ('template', 'visibility', 'parameters')
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ApplicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'applications'
+
+    def ready(self):
+        from . import signals
+
+        post_migrate.connect(signals.ensure_search_index, sender=self)
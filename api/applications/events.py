@@ -0,0 +1,37 @@
+"""
+Domain events emitted by the applications app.
+
+Events go through the transactional outbox (``events.outbox``): call these
+helpers inside the transaction that writes the applications, and the
+``dispatch_events`` worker publishes them once it commits.
+"""
+from django.db import DEFAULT_DB_ALIAS
+
+from events.outbox import enqueue_many
+
+APPLICATION_CREATED = 'creator.application.created'
+
+
+def application_created_data(application):
+    """Return the payload of the creator.application.created event."""
+    template = application.get_template()
+    return {
+        'application_id': application.application_id,
+        'application_name': application.name,
+        'creator_email': application.creator.email,
+        'owner': application.owner,
+        'visibility': application.visibility,
+        'template_id': template.template_id if template else None,
+        'created_at': application.created_at.isoformat(),
+    }
+
+
+def publish_applications_created(applications, using=DEFAULT_DB_ALIAS):
+    """Record one creator.application.created event per application, in a single insert."""
+    enqueue_many(
+        [
+            (APPLICATION_CREATED, application_created_data(application), f'{APPLICATION_CREATED}:{application.application_id}')
+            for application in applications
+        ],
+        using=using,
+    )
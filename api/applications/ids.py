@@ -0,0 +1,98 @@
+"""
+Time-ordered application identifiers.
+
+IDs look like ``app_01j9x3k6d7q8r2s4t5v6w7x8y9`` and follow the ULID layout
+under the ``app_`` prefix: a 48-bit millisecond timestamp followed by 80
+random bits, written as 26 lower-case Crockford base32 characters. The
+alphabet is in ASCII order, so sorting IDs as strings sorts them by creation
+time, and new rows always land at the right-hand edge of the unique index.
+
+Within a process the generator is monotonic: IDs minted in the same
+millisecond (or after the clock steps back) reuse the last timestamp and
+increment the random part, so they stay strictly increasing. Across
+processes uniqueness rests on the 80 random bits drawn at each new
+millisecond; two workers would have to draw the same value in the same
+millisecond to collide.
+"""
+import secrets
+import threading
+import time
+
+PREFIX = 'app_'
+
+# Crockford's base32, lower-cased; ascending in ASCII as well.
+ALPHABET = '0123456789abcdefghjkmnpqrstvwxyz'
+
+TIMESTAMP_LENGTH = 10
+RANDOM_LENGTH = 16
+RANDOM_BITS = 80
+MAX_RANDOM = (1 << RANDOM_BITS) - 1
+
+ID_LENGTH = len(PREFIX) + TIMESTAMP_LENGTH + RANDOM_LENGTH
+
+
+def _encode(value, length):
+    chars = []
+    for _ in range(length):
+        value, remainder = divmod(value, 32)
+        chars.append(ALPHABET[remainder])
+    return ''.join(reversed(chars))
+
+
+def _decode(text):
+    value = 0
+    for char in text:
+        value = value * 32 + ALPHABET.index(char)
+    return value
+
+
+def format_id(timestamp_ms, randomness):
+    """Return the application ID for a millisecond timestamp and random part."""
+    return PREFIX + _encode(timestamp_ms, TIMESTAMP_LENGTH) + _encode(randomness, RANDOM_LENGTH)
+
+
+def is_sortable_id(value):
+    """Return whether ``value`` is a time-ordered ID (rather than a legacy one)."""
+    body = value[len(PREFIX):]
+    return (
+        value.startswith(PREFIX)
+        and len(value) == ID_LENGTH
+        and all(char in ALPHABET for char in body)
+    )
+
+
+def id_timestamp_ms(value):
+    """Return the millisecond timestamp embedded in a time-ordered ID."""
+    if not is_sortable_id(value):
+        raise ValueError(f'{value!r} is not a time-ordered application ID.')
+    return _decode(value[len(PREFIX):len(PREFIX) + TIMESTAMP_LENGTH])
+
+
+class MonotonicIdGenerator:
+    """Mint strictly increasing IDs; safe to share between threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def generate(self, timestamp_ms=None):
+        """Return a new ID for ``timestamp_ms`` (default: now), after every earlier one."""
+        if timestamp_ms is None:
+            timestamp_ms = time.time_ns() // 1_000_000
+        with self._lock:
+            if timestamp_ms > self._last_ms:
+                randomness = secrets.randbits(RANDOM_BITS)
+            else:
+                timestamp_ms = self._last_ms
+                randomness = self._last_random + 1
+                if randomness > MAX_RANDOM:
+                    # Random part exhausted within one millisecond; borrow the next.
+                    timestamp_ms += 1
+                    randomness = secrets.randbits(RANDOM_BITS)
+            self._last_ms = timestamp_ms
+            self._last_random = randomness
+        return format_id(timestamp_ms, randomness)
+
+
+generator = MonotonicIdGenerator()
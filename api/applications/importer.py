@@ -0,0 +1,157 @@
+"""
+Bulk import of applications from NDJSON (one JSON object per line).
+
+Lines are read incrementally and handled in batches of
+``APPLICATION_IMPORT_BATCH_SIZE``. Each line is validated on its own, with
+the same rules as ``POST /api/v1/applications/``; templates come from the
+template cache, and the names of a whole batch are checked against the
+table in one query. The valid rows of a batch are then written in one
+transaction: a single ``bulk_create``, their search-index entries and
+their creator.application.created events (``bulk_create`` sends no
+signals, so both are done here explicitly).
+
+Invalid lines are reported with their line number and do not stop the
+import; the other lines are still created.
+"""
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .events import publish_applications_created
+from .models import Application
+from .search import get_search_backend
+from .serializers import ApplicationImportSerializer
+
+DUPLICATE_NAME = 'An application with this name already exists.'
+
+
+class ImportResult:
+    """Created applications and per-line errors of an import."""
+
+    def __init__(self):
+        self.created = []
+        self.errors = []
+
+    def add_created(self, line, application):
+        self.created.append({
+            'line': line,
+            'id': application.pk,
+            'application_id': application.application_id,
+            'name': application.name,
+        })
+
+    def add_error(self, line, errors):
+        self.errors.append({'line': line, 'errors': errors})
+
+
+def read_lines(stream):
+    """Yield ``(line_number, line)`` for the non-blank lines of a binary stream."""
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            yield number, line
+
+
+def import_applications(lines, creator, context=None, batch_size=None, max_lines=None):
+    """Import ``(line_number, line)`` pairs as applications of ``creator``."""
+    batch_size = batch_size or settings.APPLICATION_IMPORT_BATCH_SIZE
+    max_lines = max_lines or settings.APPLICATION_IMPORT_MAX_LINES
+    result = ImportResult()
+    # Names claimed by earlier lines of this import.
+    seen_names = set()
+
+    batch = []
+    for count, (number, line) in enumerate(lines, 1):
+        if count > max_lines:
+            result.add_error(number, {'non_field_errors': [
+                f'Imports are limited to {max_lines} lines; this line and the rest were skipped.'
+            ]})
+            break
+        batch.append((number, line))
+        if len(batch) >= batch_size:
+            _import_batch(batch, creator, context, seen_names, result)
+            batch = []
+    if batch:
+        _import_batch(batch, creator, context, seen_names, result)
+    return result
+
+
+def _parse(number, line, creator, context, seen_names, result):
+    """Return the validated, unsaved application for one line, or None."""
+    try:
+        data = json.loads(line)
+    except ValueError as e:
+        result.add_error(number, {'non_field_errors': [f'Invalid JSON: {e}']})
+        return None
+    if not isinstance(data, dict):
+        result.add_error(number, {'non_field_errors': ['Each line must be a JSON object.']})
+        return None
+
+    serializer = ApplicationImportSerializer(data=data, context=context)
+    if not serializer.is_valid():
+        result.add_error(number, serializer.errors)
+        return None
+
+    application = Application(creator=creator, **serializer.validated_data)
+    try:
+        # Foreign keys are already resolved and uniqueness is checked per batch.
+        application.full_clean(exclude=['creator', 'template'], validate_unique=False, validate_constraints=False)
+    except ValidationError as e:
+        result.add_error(number, e.message_dict)
+        return None
+
+    if application.name in seen_names:
+        result.add_error(number, {'name': ['Duplicate name within this import.']})
+        return None
+    seen_names.add(application.name)
+    return application
+
+
+def _import_batch(batch, creator, context, seen_names, result):
+    rows = []
+    for number, line in batch:
+        application = _parse(number, line, creator, context, seen_names, result)
+        if application is not None:
+            rows.append((number, application))
+
+    taken = set(
+        Application.objects.filter(name__in=[application.name for _, application in rows])
+        .values_list('name', flat=True)
+    )
+    for number, application in rows:
+        if application.name in taken:
+            result.add_error(number, {'name': [DUPLICATE_NAME]})
+    rows = [(number, application) for number, application in rows if application.name not in taken]
+    if not rows:
+        return
+
+    applications = [application for _, application in rows]
+    try:
+        with transaction.atomic():
+            Application.objects.bulk_create(applications)
+            get_search_backend().index_many(applications)
+            publish_applications_created(applications)
+    except IntegrityError:
+        # Someone else took a name since the check; fall back to row by row.
+        _import_rows(rows, result)
+        return
+
+    for number, application in rows:
+        result.add_created(number, application)
+
+
+def _import_rows(rows, result):
+    for number, application in rows:
+        application.pk = None
+        application._state.adding = True
+        try:
+            with transaction.atomic():
+                application.save()
+                publish_applications_created([application])
+        except ValidationError as e:
+            result.add_error(number, e.message_dict)
+        except IntegrityError:
+            result.add_error(number, {'name': [DUPLICATE_NAME]})
+        else:
+            result.add_created(number, application)
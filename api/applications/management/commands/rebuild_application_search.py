@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from applications.models import Application
+from applications.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the application search index from the applications table.
+
+    The index is maintained on every save and delete, so this is only needed
+    after writes that bypass model signals (e.g. ``queryset.update()`` or raw
+    SQL) or to recover a damaged index.
+    """
+
+    help = 'Rebuild the application catalog search index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database alias to rebuild the index on (default: "default").',
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options['database'])
+        backend.rebuild(Application)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt the application search index ({type(backend).__name__}).'
+        ))
@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from applications.ids import MonotonicIdGenerator, is_sortable_id
+from applications.models import Application
+
+
+class Command(BaseCommand):
+    """
+    Replace legacy random application IDs with time-ordered ones.
+
+    Each legacy ID is rewritten from the application's ``created_at``, in
+    primary-key (insertion) order, so the reissued IDs sort like the rows
+    did and keyset pagination works across old and new applications. The old
+    value is kept in ``legacy_application_id`` for clients that stored it.
+    Rows are read in primary-key keyset batches of ``--batch-size`` and each
+    batch is updated in its own transaction, so memory use does not grow
+    with the table; the command can be rerun safely and skips applications
+    that already have a time-ordered ID.
+    """
+
+    help = 'Reissue legacy application IDs as time-ordered (ULID-style) IDs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Applications updated per transaction (default: 500).',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many IDs would be reissued without changing them.',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database alias to migrate (default: "default").',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        database = options['database']
+        generator = MonotonicIdGenerator()
+        reissued = 0
+        for batch in self.legacy_batches(database, batch_size):
+            reissued += len(batch)
+            if options['dry_run'] or not batch:
+                continue
+            for app in batch:
+                app.legacy_application_id = app.application_id
+                app.application_id = generator.generate(int(app.created_at.timestamp() * 1000))
+            with transaction.atomic(using=database):
+                Application.objects.using(database).bulk_update(batch, ['application_id', 'legacy_application_id'])
+
+        if options['dry_run']:
+            self.stdout.write(f'{reissued} application ID(s) would be reissued.')
+            return
+        self.stdout.write(self.style.SUCCESS(f'Reissued {reissued} application ID(s).'))
+
+    def legacy_batches(self, database, batch_size):
+        """Yield the legacy-ID applications of each ``batch_size`` rows, in primary-key order."""
+        applications = (
+            Application.objects.using(database)
+            .order_by('pk')
+            .only('pk', 'application_id', 'created_at')
+        )
+        last_pk = None
+        while True:
+            page = applications if last_pk is None else applications.filter(pk__gt=last_pk)
+            rows = list(page[:batch_size])
+            if not rows:
+                return
+            last_pk = rows[-1].pk
+            yield [app for app in rows if not is_sortable_id(app.application_id)]
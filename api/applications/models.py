@@ -1,16 +1,19 @@
+import copy
+
 from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
-import secrets
-import string
+
+from jsonschema.exceptions import SchemaError
+
+from . import ids
+from .schemas import batch_parameter_errors, check_schema, parameter_errors
 
 
 def generate_application_id():
-    """Generate a unique application ID with format app_XXXXXX."""
-    chars = string.ascii_lowercase + string.digits
-    random_part = ''.join(secrets.choice(chars) for _ in range(6))
-    return f'app_{random_part}'
+    """Generate a time-ordered application ID (app_ followed by a ULID)."""
+    return ids.generator.generate()
 
 
 class Template(models.Model):
@@ -48,6 +51,12 @@ class Template(models.Model):
         blank=True,
         help_text=_('List of required parameter names')
     )
+    parameters_schema = models.JSONField(
+        _('parameters schema'),
+        default=dict,
+        blank=True,
+        help_text=_('JSON Schema the application parameters must satisfy')
+    )
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -61,21 +70,25 @@ class Template(models.Model):
     def __str__(self):
         return f"{self.name} ({self.template_id})"
     
-    def validate_parameters(self, parameters):
-        """Validate that all required parameters are provided."""
-        if not parameters:
-            parameters = {}
-        
-        missing_params = [
-            param for param in self.required_parameters
-            if param not in parameters
-        ]
+    def clean(self):
+        """Check that the parameters schema is itself a valid JSON Schema."""
+        super().clean()
         
-        if missing_params:
-            raise ValidationError(
-                f"Missing required parameters: {', '.join(missing_params)}"
-            )
+        try:
+            check_schema(self.parameters_schema or {})
+        except SchemaError as e:
+            raise ValidationError({'parameters_schema': f'Invalid JSON Schema: {e.message}'})
+    
+    def validate_parameters(self, parameters):
+        """Validate parameters against the required list and the parameters schema."""
+        errors = parameter_errors(self, parameters)
+        if errors:
+            raise ValidationError(errors)
         return True
+    
+    def validate_parameter_sets(self, parameter_sets):
+        """Validate many parameter sets at once; return one list of errors per set."""
+        return batch_parameter_errors(self, parameter_sets)
 
 
 class Application(models.Model):
@@ -94,6 +107,14 @@ class Application(models.Model):
         default=generate_application_id,
         help_text=_('Unique application identifier')
     )
+    legacy_application_id = models.CharField(
+        _('legacy application ID'),
+        max_length=50,
+        blank=True,
+        default='',
+        db_index=True,
+        help_text=_('Identifier issued before time-ordered IDs, kept for lookups')
+    )
     name = models.CharField(
         _('name'),
         max_length=200,
@@ -166,6 +187,7 @@ class Application(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['creator', '-created_at']),
+            models.Index(fields=['creator', '-application_id']),
             models.Index(fields=['visibility']),
             models.Index(fields=['template']),
         ]
@@ -173,16 +195,34 @@ class Application(models.Model):
     def __str__(self):
         return f"{self.name} ({self.application_id})"
     
+    def get_template(self):
+        """
+        Return the template, taken from the template cache unless already loaded.
+        
+        The cached instance is shared by every request of the process, so this
+        application gets its own copy.
+        """
+        if self.template_id is None:
+            return None
+        if not self._meta.get_field('template').is_cached(self):
+            from .template_cache import template_cache
+            
+            cached = template_cache.get_by_pk(self.template_id)
+            if cached is not None:
+                self.template = copy.copy(cached)
+        return self.template
+    
     def clean(self):
         """Validate application constraints."""
         super().clean()
         
         # If template is provided, validate that required parameters are complete
-        if self.template:
+        template = self.get_template()
+        if template:
             try:
-                self.template.validate_parameters(self.parameters)
+                template.validate_parameters(self.parameters)
             except ValidationError as e:
-                raise ValidationError({'parameters': e.message})
+                raise ValidationError({'parameters': e.messages})
         
         # Validate integrations if provided
         if self.git_integration:
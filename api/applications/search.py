@@ -0,0 +1,232 @@
+"""
+Ranked, typo-tolerant search over the application catalog.
+
+Matching is trigram based, which gives substring/prefix matches and
+tolerates typos: a misspelt word still shares most of its three-letter
+sequences with the intended one. The index used depends on the database:
+
+* SQLite: an FTS5 table with the ``trigram`` tokenizer, kept in sync on
+  every save and delete of an ``Application``. FTS5 returns the best
+  candidates by bm25 among the rows the caller may see, which are then
+  re-ranked by trigram similarity.
+* PostgreSQL: ``pg_trgm`` GIN indexes on the searched columns, queried with
+  the word-similarity operator and ranked by ``word_similarity``.
+* Anything else: plain ``icontains`` filtering, unranked.
+
+The index is created (and filled, if empty) after ``migrate``; run
+``python manage.py rebuild_application_search`` to rebuild it by hand.
+"""
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest
+
+SEARCH_FIELDS = ('name', 'owner', 'description')
+
+# Relative importance of a match in each field.
+FIELD_WEIGHTS = {'name': 1.0, 'owner': 0.8, 'description': 0.6}
+
+FTS_TABLE = 'applications_application_search'
+
+
+def trigrams(text):
+    """Return the set of lower-cased three-character sequences in ``text``."""
+    text = ' '.join(text.lower().split())
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+def similarity(query_trigrams, text):
+    """Return the fraction of ``query_trigrams`` that also occur in ``text``."""
+    if not query_trigrams:
+        return 0.0
+    return len(query_trigrams & trigrams(text)) / len(query_trigrams)
+
+
+def _order_by_ids(queryset, ids):
+    if not ids:
+        return queryset.none()
+    ranking = Case(*[When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)])
+    return queryset.filter(pk__in=ids).annotate(search_rank=ranking).order_by('search_rank')
+
+
+class FallbackSearchBackend:
+    """Unindexed substring search for databases without trigram support."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def ensure_index(self):
+        pass
+
+    def rebuild(self, model):
+        pass
+
+    def is_empty(self):
+        return False
+
+    def index(self, instance):
+        pass
+
+    def index_many(self, instances):
+        """Index freshly inserted rows, e.g. after ``bulk_create`` (which sends no signals)."""
+        for instance in instances:
+            self.index(instance)
+
+    def remove(self, pk):
+        pass
+
+    def search(self, queryset, query):
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__icontains': query})
+        return queryset.filter(condition)
+
+
+class SQLiteSearchBackend(FallbackSearchBackend):
+    """FTS5 trigram index, maintained row by row alongside the table."""
+
+    def ensure_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5({', '.join(SEARCH_FIELDS)}, tokenize='trigram')"
+            )
+
+    def rebuild(self, model):
+        self.ensure_index()
+        columns = ', '.join(SEARCH_FIELDS)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, {columns}) '
+                f'SELECT id, {columns} FROM {model._meta.db_table}'
+            )
+
+    def is_empty(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'SELECT 1 FROM {FTS_TABLE} LIMIT 1')
+            return cursor.fetchone() is None
+
+    def index(self, instance):
+        columns = ', '.join(SEARCH_FIELDS)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [instance.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES (%s, %s, %s, %s)',
+                [instance.pk, *(getattr(instance, field) for field in SEARCH_FIELDS)]
+            )
+
+    def index_many(self, instances):
+        columns = ', '.join(SEARCH_FIELDS)
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES (%s, %s, %s, %s)',
+                [[instance.pk, *(getattr(instance, field) for field in SEARCH_FIELDS)] for instance in instances]
+            )
+
+    def remove(self, pk):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [pk])
+
+    def search(self, queryset, query):
+        query_trigrams = trigrams(query)
+        if not query_trigrams:
+            # Too short for the trigram index; match prefixes directly.
+            return queryset.filter(Q(name__istartswith=query) | Q(owner__istartswith=query))
+
+        # Any shared trigram makes a candidate; bm25 puts rows sharing the
+        # most (and rarest) trigrams first. Only rows of ``queryset`` compete
+        # for the candidate limit, so rows the caller may not see cannot
+        # crowd out the ones it may.
+        match = ' OR '.join('"{}"'.format(gram.replace('"', '""')) for gram in sorted(query_trigrams))
+        visible_sql, visible_params = (
+            queryset.order_by().values('pk').query.get_compiler(connection=self.connection).as_sql()
+        )
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, {', '.join(SEARCH_FIELDS)} FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid IN ({visible_sql}) "
+                f"ORDER BY bm25({FTS_TABLE}, 10.0, 5.0, 1.0) LIMIT %s",
+                [match, *visible_params, settings.APPLICATION_SEARCH_CANDIDATES]
+            )
+            candidates = cursor.fetchall()
+
+        threshold = settings.APPLICATION_SEARCH_MIN_SIMILARITY
+        scored = []
+        for position, (pk, *values) in enumerate(candidates):
+            score = max(
+                similarity(query_trigrams, value or '') * FIELD_WEIGHTS[field]
+                for field, value in zip(SEARCH_FIELDS, values)
+            )
+            if score >= threshold:
+                scored.append((-score, position, pk))
+        return _order_by_ids(queryset, [pk for _, _, pk in sorted(scored)])
+
+
+class PostgreSQLSearchBackend(FallbackSearchBackend):
+    """``pg_trgm`` GIN indexes; PostgreSQL keeps them current itself."""
+
+    def ensure_index(self):
+        table = 'applications_application'
+        with self.connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            for field in SEARCH_FIELDS:
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {table}_{field}_trgm '
+                    f'ON {table} USING gin ({field} gin_trgm_ops)'
+                )
+
+    def rebuild(self, model):
+        self.ensure_index()
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        # The %> operator is what the GIN indexes can answer.
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(TrigramWordSimilar(F(field), Value(query)))
+        rank = Greatest(*[
+            TrigramWordSimilarity(query, field) * Value(FIELD_WEIGHTS[field])
+            for field in SEARCH_FIELDS
+        ])
+        return (
+            queryset.filter(condition)
+            .annotate(search_rank=rank)
+            .filter(search_rank__gte=settings.APPLICATION_SEARCH_MIN_SIMILARITY)
+            .order_by('-search_rank', '-created_at')
+        )
+
+
+def _has_fts5(connection):
+    # The trigram tokenizer arrived in SQLite 3.34.
+    if connection.Database.sqlite_version_info < (3, 34, 0):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+# Backend class per database alias; the capability check costs a query.
+_backend_classes = {}
+
+
+def get_search_backend(using='default'):
+    """Return the search backend for the database alias ``using``."""
+    connection = connections[using]
+    backend_class = _backend_classes.get(using)
+    if backend_class is None:
+        if connection.vendor == 'sqlite' and _has_fts5(connection):
+            backend_class = SQLiteSearchBackend
+        elif connection.vendor == 'postgresql':
+            backend_class = PostgreSQLSearchBackend
+        else:
+            backend_class = FallbackSearchBackend
+        _backend_classes[using] = backend_class
+    return backend_class(connection)
+
+
+def search_applications(queryset, query):
+    """Filter ``queryset`` to applications matching ``query``, best match first."""
+    return get_search_backend(queryset.db).search(queryset, query.strip())
@@ -1,5 +1,9 @@
+import copy
+
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 from .models import Template, Application
+from .template_cache import template_cache
 
 
 class TemplateSerializer(serializers.ModelSerializer):
@@ -15,17 +19,40 @@ class TemplateSerializer(serializers.ModelSerializer):
             'is_available',
             'default_parameters',
             'required_parameters',
+            'parameters_schema',
             'created_at',
             'updated_at',
         ]
         read_only_fields = ['created_at', 'updated_at']
 
 
+class CachedTemplateField(serializers.PrimaryKeyRelatedField):
+    """Template reference resolved from the process-local template cache."""
+    
+    def __init__(self, **kwargs):
+        kwargs.setdefault('queryset', Template.objects.all())
+        super().__init__(**kwargs)
+    
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        template = template_cache.get_by_pk(pk)
+        if template is None:
+            self.fail('does_not_exist', pk_value=data)
+        # The cached instance is shared; the application being saved gets a copy.
+        return copy.copy(template)
+
+
 class ApplicationSerializer(serializers.ModelSerializer):
     """Serializer for Application model."""
     
     creator = serializers.PrimaryKeyRelatedField(read_only=True)
-    template_details = TemplateSerializer(source='template', read_only=True)
+    template = CachedTemplateField(required=False, allow_null=True)
+    template_details = serializers.SerializerMethodField()
     
     class Meta:
         model = Application
@@ -46,6 +73,15 @@ class ApplicationSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
         read_only_fields = ['application_id', 'creator', 'created_at', 'updated_at']
+        extra_kwargs = {
+            # Uniqueness is checked once, in validate_name.
+            'name': {'validators': []},
+        }
+    
+    def get_template_details(self, obj):
+        """Render the application's template from the template cache."""
+        template = obj.get_template()
+        return TemplateSerializer(template).data if template else None
     
     def validate_name(self, value):
         """Validate that the application name is unique."""
@@ -75,9 +111,9 @@ class ApplicationSerializer(serializers.ModelSerializer):
         if template:
             try:
                 template.validate_parameters(parameters)
-            except Exception as e:
+            except DjangoValidationError as e:
                 raise serializers.ValidationError({
-                    'parameters': str(e)
+                    'parameters': e.messages
                 })
         
         return data
@@ -103,13 +139,12 @@ class ApplicationCreateSerializer(ApplicationSerializer):
     def validate_template_id(self, value):
         """Validate and retrieve template by template_id."""
         if value:
-            try:
-                template = Template.objects.get(template_id=value, is_available=True)
-                return template
-            except Template.DoesNotExist:
+            template = template_cache.get(value)
+            if template is None:
                 raise serializers.ValidationError(
                     f"Template '{value}' not found or not available."
                 )
+            return copy.copy(template)
         return None
     
     def validate(self, data):
@@ -122,10 +157,17 @@ class ApplicationCreateSerializer(ApplicationSerializer):
         return super().validate(data)
 
 
+class ApplicationImportSerializer(ApplicationCreateSerializer):
+    """One line of a bulk import; name uniqueness is checked for the whole batch."""
+    
+    def validate_name(self, value):
+        return value
+
+
 class ApplicationListSerializer(serializers.ModelSerializer):
     """Simplified serializer for listing applications."""
     
-    template_name = serializers.CharField(source='template.name', read_only=True)
+    template_name = serializers.SerializerMethodField()
     creator_email = serializers.CharField(source='creator.email', read_only=True)
     
     class Meta:
@@ -141,3 +183,8 @@ class ApplicationListSerializer(serializers.ModelSerializer):
             'creator_email',
             'created_at',
         ]
+    
+    def get_template_name(self, obj):
+        """Read the template name from the template cache."""
+        template = obj.get_template()
+        return template.name if template else None
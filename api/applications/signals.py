@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Application, Template
+from .schemas import forget_validators
+from .search import get_search_backend
+from .template_cache import bump_version
+
+
+@receiver(post_save, sender=Application)
+def index_application(sender, instance, raw=False, using='default', **kwargs):
+    """Keep the search index in step with the row, inside the same transaction."""
+    if raw:
+        return
+    get_search_backend(using).index(instance)
+
+
+@receiver(post_delete, sender=Application)
+def unindex_application(sender, instance, using='default', **kwargs):
+    get_search_backend(using).remove(instance.pk)
+
+
+def ensure_search_index(sender, using='default', **kwargs):
+    """Create the search index after migrate, filling it if it is empty."""
+    backend = get_search_backend(using)
+    backend.ensure_index()
+    if backend.is_empty() and Application.objects.using(using).exists():
+        backend.rebuild(Application)
+
+
+@receiver(post_save, sender=Template)
+@receiver(post_delete, sender=Template)
+def invalidate_template_cache(sender, instance, **kwargs):
+    """Make every process reload templates, now and again once the change commits."""
+    forget_validators(instance.pk)
+    bump_version()
+    # A worker may reload between the first bump and the commit, caching the old row.
+    transaction.on_commit(bump_version)
@@ -0,0 +1,104 @@
+"""
+Process-local cache of ``Template`` rows.
+
+Templates are few, small and rarely edited, but almost every applications
+request reads one. Each process keeps all of them in memory, indexed by
+``template_id`` and by primary key, and reloads the whole set (one query)
+only when the version stamp in the shared cache changes. Saving or deleting
+a template bumps the stamp, so every worker picks up the change on its next
+lookup; in the steady state a lookup costs one shared-cache read and no
+database query.
+
+The stamp only reaches other workers through a shared cache. So that a
+process-local backend (the default ``LocMemCache``) cannot keep an edited or
+disabled template alive in other workers forever, each process also reloads
+once its copy is ``TEMPLATE_CACHE_MAX_AGE`` seconds old.
+
+Cached instances are shared between requests and must be treated as
+read-only; ``Application.get_template()`` hands out copies.
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api.routers import use_primary
+
+from .models import Template
+
+VERSION_KEY = 'applications:templates:version'
+
+
+def current_version():
+    """Return the shared template version, initialising it if it is missing."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    """Make every process reload its templates on the next lookup."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+class TemplateCache:
+    """All templates of this process, refreshed when the shared version moves or they age out."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = 0.0
+        self._by_pk = {}
+        self._by_template_id = {}
+        self._ordered = []
+
+    def _is_current(self, version):
+        return version == self._version and time.monotonic() - self._loaded_at < settings.TEMPLATE_CACHE_MAX_AGE
+
+    @use_primary()
+    def _refresh(self):
+        version = current_version()
+        if self._is_current(version):
+            return
+        with self._lock:
+            if self._is_current(version):
+                return
+            templates = list(Template.objects.order_by('name', 'pk'))
+            self._by_pk = {template.pk: template for template in templates}
+            self._by_template_id = {template.template_id: template for template in templates}
+            self._ordered = templates
+            self._loaded_at = time.monotonic()
+            # Set last, so a concurrent reader never pairs the new version with old maps.
+            self._version = version
+
+    def get(self, template_id, available_only=True):
+        """Return the template with ``template_id``, or None."""
+        self._refresh()
+        template = self._by_template_id.get(template_id)
+        if template is None or (available_only and not template.is_available):
+            return None
+        return template
+
+    def get_by_pk(self, pk, available_only=False):
+        """Return the template with primary key ``pk``, or None."""
+        self._refresh()
+        template = self._by_pk.get(pk)
+        if template is None or (available_only and not template.is_available):
+            return None
+        return template
+
+    def available(self):
+        """Return the available templates, ordered by name."""
+        self._refresh()
+        return [template for template in self._ordered if template.is_available]
+
+    def clear(self):
+        """Drop this process's copy; the next lookup reloads it."""
+        self._version = None
+
+
+template_cache = TemplateCache()
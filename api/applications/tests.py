@@ -1,9 +1,19 @@
-from django.test import TestCase
+import json
+from io import StringIO
+
+import msgpack
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from api.query_budget import QueryBudgetTestMixin, query_budget
+from events.models import OutboxEvent
+
 from .models import Template, Application
+from . import ids, schemas
+from .template_cache import TemplateCache, bump_version, template_cache
 
 User = get_user_model()
 
@@ -217,6 +227,24 @@ class ApplicationAPITest(APITestCase):
         self.assertEqual(response.data['status'], 'success')
         self.assertEqual(len(response.data['data']), 1)
     
+    def test_create_and_list_applications_msgpack(self):
+        """Test the application endpoints with MessagePack bodies and responses."""
+        self.client.force_authenticate(user=self.creator)
+        data = {
+            'name': 'Customer Portal', 'description': 'Portal for customers',
+            'owner': 'team-customer', 'visibility': 'INTERNAL',
+        }
+        
+        response = self.client.post(
+            '/api/v1/applications/', msgpack.packb(data),
+            content_type='application/msgpack', HTTP_ACCEPT='application/msgpack',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(msgpack.unpackb(response.content)['data']['name'], 'Customer Portal')
+        
+        response = self.client.get('/api/v1/applications/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), self.client.get('/api/v1/applications/').json())
+    
     def test_update_application(self):
         """Test updating application."""
         app = Application.objects.create(
@@ -273,3 +301,571 @@ class ApplicationAPITest(APITestCase):
         
         response = self.client.post('/api/v1/applications/', data, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ApplicationSearchTest(APITestCase):
+    """Test cases for the catalog search (``?q=``)."""
+    
+    def setUp(self):
+        """Set up a small catalog."""
+        self.client = APIClient()
+        self.creator = User.objects.create_user(
+            email='creator@test.com',
+            password='testpass123',
+            role='CREATOR'
+        )
+        self.brand = User.objects.create_user(
+            email='brand@test.com',
+            password='testpass123',
+            role='BRAND'
+        )
+        self.analytics = Application.objects.create(
+            name='Analytics Dashboard',
+            description='Charts for campaign performance',
+            owner='team-insights',
+            visibility='PUBLIC',
+            creator=self.creator,
+        )
+        self.portal = Application.objects.create(
+            name='Customer Portal',
+            description='Self-service portal with usage analytics',
+            owner='team-customer',
+            visibility='INTERNAL',
+            creator=self.creator,
+        )
+        Application.objects.create(
+            name='Analytics Sandbox',
+            description='Private experiments',
+            owner='team-insights',
+            visibility='PRIVATE',
+            creator=self.creator,
+        )
+        self.client.force_authenticate(user=self.brand)
+    
+    def _search(self, query, **params):
+        response = self.client.get('/api/v1/applications/', {'q': query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['data']
+    
+    def test_prefix_search_ranks_name_matches_first(self):
+        """Test that a prefix finds name and description matches, name first."""
+        data = self._search('analyt')
+        
+        names = [result['name'] for result in data['results']]
+        self.assertEqual(names, ['Analytics Dashboard', 'Customer Portal'])
+        self.assertEqual(data['count'], 2)
+    
+    def test_search_tolerates_typos(self):
+        """Test that a misspelt query still finds the application."""
+        data = self._search('custmer portl')
+        
+        self.assertEqual([result['name'] for result in data['results']], ['Customer Portal'])
+    
+    def test_search_matches_owner(self):
+        """Test that the owner field is searched."""
+        data = self._search('insights')
+        
+        self.assertEqual([result['name'] for result in data['results']], ['Analytics Dashboard'])
+    
+    def test_search_is_paginated(self):
+        """Test that search results are paginated."""
+        data = self._search('analytics', page_size=1)
+        
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(len(data['results']), 1)
+        self.assertIsNotNone(data['next'])
+    
+    @override_settings(APPLICATION_SEARCH_CANDIDATES=5)
+    def test_candidates_are_limited_to_visible_rows(self):
+        """Test that other users' better matches do not push a creator's own out."""
+        other = User.objects.create_user(
+            email='other@test.com',
+            password='testpass123',
+            role='CREATOR'
+        )
+        for number in range(10):
+            Application.objects.create(
+                name=f'Analytics {number}',
+                description='analytics',
+                owner='analytics',
+                visibility='PUBLIC',
+                creator=other,
+            )
+        self.client.force_authenticate(user=self.creator)
+        
+        data = self._search('analytics')
+        
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(
+            {result['name'] for result in data['results']},
+            {'Analytics Dashboard', 'Customer Portal', 'Analytics Sandbox'}
+        )
+    
+    def test_index_follows_updates_and_deletes(self):
+        """Test that the index is maintained on save and delete."""
+        self.analytics.name = 'Reporting Dashboard'
+        self.analytics.save()
+        self.portal.delete()
+        
+        self.assertEqual(self._search('analytics')['count'], 0)
+        self.assertEqual(
+            [result['name'] for result in self._search('reporting')['results']],
+            ['Reporting Dashboard']
+        )
+    
+    def test_list_without_query_is_unchanged(self):
+        """Test that listings without ``q`` keep the plain response format."""
+        response = self.client.get('/api/v1/applications/')
+        
+        self.assertEqual(len(response.data['data']), 2)
+
+
+class ApplicationQueryBudgetTest(QueryBudgetTestMixin, APITestCase):
+    """Pin the query count of every applications endpoint at 1 and 100 rows."""
+    
+    def setUp(self):
+        """Set up a creator, a brand and a template."""
+        self.creator = User.objects.create_user(email='creator@test.com', password='testpass123', role='CREATOR')
+        self.brand = User.objects.create_user(email='brand@test.com', password='testpass123', role='BRAND')
+        self.template = Template.objects.create(
+            template_id='tpl-budget-01',
+            name='Budget Template',
+            description='Template',
+            required_parameters=['region'],
+        )
+    
+    def _make_applications(self, count):
+        """Top up to ``count`` applications and templates, leaving the template cache warm."""
+        existing = Application.objects.count()
+        for index in range(existing, count):
+            template = Template.objects.create(template_id=f'tpl-budget-{index + 2:03d}', name=f'Template {index}')
+            Application.objects.create(
+                name=f'Budget App {index}',
+                description='Budget application',
+                owner='team-budget',
+                visibility='PUBLIC',
+                template=template,
+                creator=self.creator,
+            )
+        # Budgets are for the steady state, after workers have loaded the templates.
+        template_cache.available()
+        return Application.objects.order_by('pk').first()
+    
+    def _fresh_application(self, count):
+        self._make_applications(count)
+        return Application.objects.create(
+            name=f'Fresh App {count}',
+            description='Fresh',
+            owner='team-budget',
+            creator=self.creator,
+        )
+    
+    def test_template_budgets(self):
+        """Test listing, retrieving and validating against templates."""
+        self.client.force_authenticate(user=self.creator)
+        self.assertQueryBudget(
+            0, lambda target: self.client.get('/api/v1/templates/'),
+            self._make_applications, label='template list'
+        )
+        self.assertQueryBudget(
+            0, lambda target: self.client.get(f'/api/v1/templates/{self.template.pk}/'),
+            self._make_applications, label='template retrieve'
+        )
+        self.assertQueryBudget(
+            0, lambda target: self.client.get(
+                f'/api/v1/templates/{self.template.pk}/validate_parameters/', {'region': 'eu'}
+            ),
+            self._make_applications, label='validate parameters'
+        )
+    
+    def test_application_list_budget(self):
+        """Test the catalog list for creators and other users, with and without search."""
+        for user in (self.creator, self.brand):
+            self.client.force_authenticate(user=user)
+            self.assertQueryBudget(
+                1, lambda target: self.client.get('/api/v1/applications/'),
+                self._make_applications, label=f'{user.role} application list'
+            )
+        self.assertQueryBudget(
+            3, lambda target: self.client.get('/api/v1/applications/', {'q': 'budget'}),
+            self._make_applications, label='catalog search'
+        )
+        self.assertQueryBudget(
+            1, lambda target: self.client.get('/api/v1/applications/', {'page_size': 10, 'after': target.application_id}),
+            self._make_applications, label='keyset page'
+        )
+    
+    def test_application_retrieve_budget(self):
+        """Test retrieving an application and its catalog view."""
+        self.client.force_authenticate(user=self.brand)
+        self.assertQueryBudget(
+            1, lambda application: self.client.get(f'/api/v1/applications/{application.pk}/'),
+            self._make_applications, label='retrieve'
+        )
+        self.assertQueryBudget(
+            1, lambda application: self.client.get(f'/api/v1/applications/{application.pk}/catalog_view/'),
+            self._make_applications, label='catalog view'
+        )
+    
+    def test_application_create_budget(self):
+        """Test creating an application from a template."""
+        self.client.force_authenticate(user=self.creator)
+        # Includes the outbox insert and the savepoint around insert + event
+        self.assertQueryBudget(
+            11, lambda count: self.client.post('/api/v1/applications/', {
+                'name': f'Created App {count}',
+                'description': 'Created',
+                'owner': 'team-budget',
+                'template_id': 'tpl-budget-01',
+                'parameters': {'region': 'eu'},
+            }, format='json'),
+            lambda count: self._make_applications(count) and count
+        )
+    
+    def test_application_update_budget(self):
+        """Test full and partial updates of an application."""
+        self.client.force_authenticate(user=self.creator)
+        self.assertQueryBudget(
+            8, lambda application: self.client.patch(
+                f'/api/v1/applications/{application.pk}/', {'description': 'Changed'}, format='json'
+            ),
+            self._make_applications, label='partial update'
+        )
+        self.assertQueryBudget(
+            9, lambda application: self.client.put(f'/api/v1/applications/{application.pk}/', {
+                'name': application.name,
+                'description': 'Replaced',
+                'owner': 'team-budget',
+                'visibility': 'INTERNAL',
+            }, format='json'),
+            self._make_applications, label='update'
+        )
+    
+    def test_application_destroy_budget(self):
+        """Test deleting an application."""
+        self.client.force_authenticate(user=self.creator)
+        self.assertQueryBudget(
+            3, lambda application: self.client.delete(f'/api/v1/applications/{application.pk}/'),
+            self._fresh_application
+        )
+
+
+class TemplateCacheTest(TestCase):
+    """Test the process-local template cache."""
+    
+    def setUp(self):
+        self.template = Template.objects.create(
+            template_id='tpl-cache-01',
+            name='Cached Template',
+            description='Template',
+        )
+        template_cache.available()
+    
+    def test_lookups_cost_no_queries_when_warm(self):
+        """Test that steady-state lookups by template_id and pk hit no database."""
+        with self.assertNumQueries(0):
+            self.assertEqual(template_cache.get('tpl-cache-01').pk, self.template.pk)
+            self.assertEqual(template_cache.get_by_pk(self.template.pk).template_id, 'tpl-cache-01')
+            self.assertIsNone(template_cache.get('tpl-missing'))
+    
+    def test_save_and_delete_reach_other_processes(self):
+        """Test that another worker's cache reloads after a template changes."""
+        other_worker = TemplateCache()
+        self.assertEqual(other_worker.get('tpl-cache-01').name, 'Cached Template')
+        
+        self.template.name = 'Renamed Template'
+        self.template.is_available = False
+        self.template.save()
+        
+        self.assertIsNone(other_worker.get('tpl-cache-01'))
+        self.assertEqual(other_worker.get_by_pk(self.template.pk).name, 'Renamed Template')
+        
+        self.template.delete()
+        self.assertIsNone(other_worker.get_by_pk(self.template.pk))
+    
+    def test_reload_after_max_age_without_version_bump(self):
+        """Test that a worker whose cache never sees the bump still reloads eventually."""
+        other_worker = TemplateCache()
+        other_worker.get('tpl-cache-01')
+        # Changed in another worker, whose version bump stays in its own cache.
+        Template.objects.filter(pk=self.template.pk).update(is_available=False)
+        
+        self.assertIsNotNone(other_worker.get('tpl-cache-01'))
+        with override_settings(TEMPLATE_CACHE_MAX_AGE=0):
+            self.assertIsNone(other_worker.get('tpl-cache-01'))
+    
+    def test_applications_get_their_own_template_copy(self):
+        """Test that changing an application's template leaves the cached one alone."""
+        creator = User.objects.create_user(email='creator@test.com', password='testpass123', role='CREATOR')
+        application = Application.objects.create(
+            name='Templated', description='Uses the cached template', owner='team',
+            template=self.template, creator=creator,
+        )
+        application = Application.objects.get(pk=application.pk)
+        
+        application.get_template().name = 'Changed by one request'
+        
+        self.assertEqual(template_cache.get_by_pk(self.template.pk).name, 'Cached Template')
+    
+    def test_reload_once_per_version(self):
+        """Test that a version bump costs exactly one reload query."""
+        bump_version()
+        
+        with self.assertNumQueries(1):
+            template_cache.get('tpl-cache-01')
+            template_cache.available()
+
+
+class TemplateParametersSchemaTest(APITestCase):
+    """Test JSON Schema validation of template parameters."""
+    
+    def setUp(self):
+        self.creator = User.objects.create_user(email='creator@test.com', password='testpass123', role='CREATOR')
+        self.template = Template.objects.create(
+            template_id='tpl-schema-01',
+            name='Schema Template',
+            description='Template',
+            required_parameters=['region'],
+            parameters_schema={
+                'type': 'object',
+                'properties': {
+                    'region': {'enum': ['eu', 'us']},
+                    'replicas': {'type': 'integer', 'minimum': 1},
+                },
+                'additionalProperties': False,
+            },
+        )
+    
+    def test_schema_and_required_parameters(self):
+        """Test that both the schema and the required list are enforced."""
+        self.assertTrue(self.template.validate_parameters({'region': 'eu', 'replicas': 2}))
+        
+        with self.assertRaises(ValidationError) as raised:
+            self.template.validate_parameters({'replicas': 0, 'debug': True})
+        messages = raised.exception.messages
+        self.assertEqual(messages[0], 'Missing required parameters: region')
+        self.assertTrue(any(message.startswith('replicas:') for message in messages))
+        self.assertTrue(any('debug' in message for message in messages))
+    
+    def test_validator_is_compiled_once_and_dropped_on_save(self):
+        """Test that the compiled validator is reused until the template changes."""
+        validator = schemas.get_validator(self.template)
+        self.assertIs(schemas.get_validator(self.template), validator)
+        
+        self.template.parameters_schema = {'properties': {'region': {'type': 'string'}}}
+        self.template.save()
+        
+        self.assertIsNot(schemas.get_validator(self.template), validator)
+        self.assertTrue(self.template.validate_parameters({'region': 'ap', 'replicas': 'many'}))
+    
+    def test_invalid_schema_rejected_by_clean(self):
+        """Test that a malformed schema fails template validation."""
+        self.template.parameters_schema = {'type': 'no-such-type'}
+        with self.assertRaises(ValidationError) as raised:
+            self.template.full_clean()
+        self.assertIn('parameters_schema', raised.exception.message_dict)
+    
+    def test_create_application_with_invalid_parameters(self):
+        """Test that the create endpoint reports schema errors per parameter."""
+        self.client.force_authenticate(user=self.creator)
+        response = self.client.post('/api/v1/applications/', {
+            'name': 'Schema App',
+            'description': 'App',
+            'owner': 'team-schema',
+            'template_id': 'tpl-schema-01',
+            'parameters': {'region': 'mars'},
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('region:', str(response.data))
+        self.assertFalse(Application.objects.exists())
+    
+    def test_validate_endpoint_single_and_batch(self):
+        """Test POST validation of one parameter set and of a batch."""
+        self.client.force_authenticate(user=self.creator)
+        url = f'/api/v1/templates/{self.template.pk}/validate_parameters/'
+        
+        response = self.client.post(url, {'parameters': {'region': 'us', 'replicas': 3}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['data']['valid'])
+        
+        response = self.client.post(url, {'parameter_sets': [
+            {'region': 'eu'},
+            {'region': 'eu', 'replicas': 'two'},
+            {},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['data']['results']
+        self.assertFalse(response.data['data']['valid'])
+        self.assertEqual([result['valid'] for result in results], [True, False, False])
+        self.assertEqual(results[2]['errors'], ['Missing required parameters: region'])
+
+
+class ApplicationIdTest(APITestCase):
+    """Test time-ordered application IDs and keyset pagination over them."""
+    
+    def setUp(self):
+        self.creator = User.objects.create_user(email='creator@test.com', password='testpass123', role='CREATOR')
+    
+    def _create(self, count):
+        return [
+            Application.objects.create(
+                name=f'Keyset App {index}',
+                description='App',
+                owner='team-keyset',
+                creator=self.creator,
+            )
+            for index in range(count)
+        ]
+    
+    def test_ids_are_monotonic_within_a_millisecond(self):
+        """Test that IDs minted in the same (or an earlier) millisecond keep increasing."""
+        generator = ids.MonotonicIdGenerator()
+        minted = [generator.generate(1_700_000_000_000) for _ in range(1000)]
+        minted.append(generator.generate(1_600_000_000_000))
+        
+        self.assertEqual(minted, sorted(minted))
+        self.assertEqual(len(set(minted)), len(minted))
+        self.assertTrue(all(ids.is_sortable_id(value) for value in minted))
+        self.assertEqual(ids.id_timestamp_ms(minted[0]), 1_700_000_000_000)
+    
+    def test_ids_sort_by_creation(self):
+        """Test that applications created later get larger IDs."""
+        apps = self._create(5)
+        self.assertEqual([app.application_id for app in apps], sorted(app.application_id for app in apps))
+        self.assertEqual(len(apps[0].application_id), ids.ID_LENGTH)
+    
+    def test_keyset_pagination(self):
+        """Test walking the catalog newest first with the ``after`` cursor."""
+        apps = self._create(5)
+        self.client.force_authenticate(user=self.creator)
+        
+        seen = []
+        params = {'page_size': 2}
+        while True:
+            response = self.client.get('/api/v1/applications/', params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            data = response.data['data']
+            seen += [row['application_id'] for row in data['results']]
+            if data['next_cursor'] is None:
+                self.assertIsNone(data['next'])
+                break
+            self.assertIn(f"after={data['next_cursor']}", data['next'])
+            params = {'page_size': 2, 'after': data['next_cursor']}
+        
+        self.assertEqual(seen, sorted((app.application_id for app in apps), reverse=True))
+        
+        for page_size, expected in (('0', 5), ('-1', 5), ('two', 5), ('1000', 5), ('3', 3)):
+            response = self.client.get('/api/v1/applications/', {'page_size': page_size})
+            self.assertEqual(len(response.data['data']['results']), expected, page_size)
+    
+    def test_reissue_legacy_ids(self):
+        """Test that legacy IDs are rewritten in creation order and remembered."""
+        apps = self._create(3)
+        for index, app in enumerate(apps):
+            Application.objects.filter(pk=app.pk).update(application_id=f'app_zz{index}x9k')
+        
+        out = StringIO()
+        call_command('reissue_application_ids', '--dry-run', '--batch-size', '2', stdout=out)
+        self.assertIn('3 application ID(s) would be reissued', out.getvalue())
+        # Batches smaller than the table are read by primary-key keyset.
+        call_command('reissue_application_ids', '--batch-size', '2', stdout=out)
+        self.assertIn('Reissued 3', out.getvalue())
+        
+        reissued = list(Application.objects.order_by('created_at', 'pk'))
+        self.assertEqual([app.legacy_application_id for app in reissued], ['app_zz0x9k', 'app_zz1x9k', 'app_zz2x9k'])
+        self.assertTrue(all(ids.is_sortable_id(app.application_id) for app in reissued))
+        self.assertEqual(
+            [app.application_id for app in reissued],
+            sorted(app.application_id for app in reissued)
+        )
+        
+        call_command('reissue_application_ids', stdout=out)
+        self.assertIn('Reissued 0', out.getvalue())
+
+
+class ApplicationImportTest(APITestCase):
+    """Test the bulk NDJSON import endpoint."""
+    
+    url = '/api/v1/applications/import/'
+    
+    def setUp(self):
+        self.creator = User.objects.create_user(email='creator@test.com', password='testpass123', role='CREATOR')
+        self.template = Template.objects.create(
+            template_id='tpl-import-01',
+            name='Import Template',
+            description='Template',
+            required_parameters=['region'],
+        )
+        Application.objects.create(name='Existing App', description='App', owner='team', creator=self.creator)
+        self.client.force_authenticate(user=self.creator)
+    
+    def _post(self, rows):
+        body = '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows) + '\n'
+        return self.client.generic('POST', self.url, body.encode(), content_type='application/x-ndjson')
+    
+    def _row(self, name, **extra):
+        return {'name': name, 'description': 'Imported', 'owner': 'team-import', **extra}
+    
+    def test_import_creates_rows_events_and_index_entries(self):
+        """Test that valid lines are inserted, indexed and get creation events."""
+        rows = [self._row(f'Imported App {index}', visibility='PUBLIC') for index in range(5)]
+        rows.append(self._row('Templated Import', template_id='tpl-import-01', parameters={'region': 'eu'}))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._post(rows)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'success')
+        self.assertEqual(response.data['data']['created_count'], 6)
+        self.assertEqual([row['line'] for row in response.data['data']['created']], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(Application.objects.filter(owner='team-import').count(), 6)
+        self.assertEqual(
+            OutboxEvent.objects.filter(event_type='creator.application.created').count(), 6
+        )
+        
+        search = self.client.get('/api/v1/applications/', {'q': 'Templated Import'})
+        self.assertEqual(search.data['data']['results'][0]['name'], 'Templated Import')
+    
+    def test_per_line_errors(self):
+        """Test that bad lines are reported by line number while the rest are created."""
+        response = self._post([
+            self._row('Good One'),
+            '{not json',
+            self._row('Existing App'),
+            self._row('Good One'),
+            self._row('Missing Params', template_id='tpl-import-01'),
+            ['not', 'an', 'object'],
+            {'name': 'No Description'},
+            self._row('Good Two'),
+        ])
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'error')
+        self.assertEqual(response.data['data']['created_count'], 2)
+        errors = {error['line']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(sorted(errors), [2, 3, 4, 5, 6, 7])
+        self.assertIn('Invalid JSON', errors[2]['non_field_errors'][0])
+        self.assertIn('already exists', errors[3]['name'][0])
+        self.assertIn('Duplicate name', errors[4]['name'][0])
+        self.assertIn('region', str(errors[5]['parameters']))
+        self.assertIn('description', errors[7])
+    
+    def test_queries_do_not_grow_with_lines(self):
+        """Test that a batch costs the same number of queries for 2 or 50 lines."""
+        def run(count, prefix):
+            with query_budget(100) as budget:
+                response = self._post([self._row(f'{prefix} {index}') for index in range(count)])
+            self.assertEqual(response.data['data']['created_count'], count)
+            return len(budget)
+        
+        self.assertEqual(run(2, 'Small'), run(50, 'Large'))
+    
+    def test_requires_ndjson_and_creator(self):
+        """Test the content type and role checks."""
+        response = self.client.post(self.url, [self._row('Json App')], format='json')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        
+        brand = User.objects.create_user(email='brand@test.com', password='testpass123', role='BRAND')
+        self.client.force_authenticate(user=brand)
+        response = self._post([self._row('Brand App')])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,11 +1,21 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import UnsupportedMediaType
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
-from django.utils import timezone
+from rest_framework.utils.urls import replace_query_param
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.db import transaction
 from django.db.models import Q
 import logging
 
+from .events import publish_applications_created
+from .importer import import_applications, read_lines
 from .models import Template, Application
+from .search import search_applications
+from .template_cache import template_cache
 from .serializers import (
     TemplateSerializer,
     ApplicationSerializer,
@@ -15,6 +25,8 @@ from .serializers import (
 
 logger = logging.getLogger(__name__)
 
+NDJSON_MEDIA_TYPES = ('application/x-ndjson', 'application/jsonl')
+
 
 class IsCreator(permissions.BasePermission):
     """Custom permission to only allow creators to create/edit applications."""
@@ -38,7 +50,89 @@ class IsCreator(permissions.BasePermission):
             return True
         
         # For write operations, check if user is the creator
-        return obj.creator == request.user
+        return obj.creator_id == request.user.pk
+
+
+class ApplicationSearchPagination(PageNumberPagination):
+    """Page-number pagination for catalog search results."""
+    
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    
+    def __init__(self):
+        self.page_size = settings.APPLICATION_SEARCH_PAGE_SIZE
+    
+    def get_paginated_response(self, data):
+        return Response({
+            'status': 'success',
+            'data': {
+                'count': self.page.paginator.count,
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'results': data,
+            },
+            'errors': []
+        })
+
+
+class ApplicationKeysetPagination(BasePagination):
+    """
+    Keyset pagination over the time-ordered application IDs, newest first.
+    
+    ``?after=<application_id>`` continues after that application, so a page
+    costs one indexed range query however deep the client has paged, and
+    rows created meanwhile never shift the pages being read.
+    """
+    
+    cursor_query_param = 'after'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    
+    def __init__(self):
+        self.page_size = settings.APPLICATION_PAGE_SIZE
+    
+    def get_page_size(self, request):
+        """``?page_size=`` if it is a positive integer (capped at ``max_page_size``), else the default."""
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size < 1:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        after = request.query_params.get(self.cursor_query_param)
+        
+        queryset = queryset.order_by('-application_id')
+        if after:
+            queryset = queryset.filter(application_id__lt=after)
+        
+        # One extra row tells whether there is a next page without a COUNT.
+        rows = list(queryset[:page_size + 1])
+        page = rows[:page_size]
+        self.next_cursor = page[-1].application_id if len(rows) > page_size else None
+        return page
+    
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor
+        )
+    
+    def get_paginated_response(self, data):
+        return Response({
+            'status': 'success',
+            'data': {
+                'next_cursor': self.next_cursor,
+                'next': self.get_next_link(),
+                'results': data,
+            },
+            'errors': []
+        })
 
 
 class TemplateViewSet(viewsets.ReadOnlyModelViewSet):
@@ -52,10 +146,21 @@ class TemplateViewSet(viewsets.ReadOnlyModelViewSet):
         """Return only available templates."""
         return Template.objects.filter(is_available=True)
     
+    def get_object(self):
+        """Resolve an available template from the template cache."""
+        try:
+            pk = int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except (TypeError, ValueError):
+            raise Http404
+        template = template_cache.get_by_pk(pk, available_only=True)
+        if template is None:
+            raise Http404
+        self.check_object_permissions(self.request, template)
+        return template
+    
     def list(self, request, *args, **kwargs):
         """List templates with consistent response format."""
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_serializer(template_cache.available(), many=True)
         return Response({
             'status': 'success',
             'data': serializer.data,
@@ -72,11 +177,43 @@ class TemplateViewSet(viewsets.ReadOnlyModelViewSet):
             'errors': []
         })
     
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['get', 'post'])
     def validate_parameters(self, request, pk=None):
-        """Validate provided parameters against template requirements."""
+        """
+        Validate parameters against the template's requirements and schema.
+        
+        GET validates the query string. POST validates ``parameters`` from the
+        body (keeping JSON types), or a list of ``parameter_sets`` in one go,
+        reporting the errors of each set.
+        """
         template = self.get_object()
-        parameters = request.query_params.dict()
+        
+        if request.method == 'POST' and 'parameter_sets' in request.data:
+            parameter_sets = request.data['parameter_sets']
+            if not isinstance(parameter_sets, list):
+                return Response({
+                    'status': 'error',
+                    'data': None,
+                    'errors': ['parameter_sets must be a list.']
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            results = [
+                {'valid': not errors, 'errors': errors}
+                for errors in template.validate_parameter_sets(parameter_sets)
+            ]
+            return Response({
+                'status': 'success',
+                'data': {
+                    'valid': all(result['valid'] for result in results),
+                    'results': results,
+                },
+                'errors': []
+            })
+        
+        if request.method == 'POST':
+            parameters = request.data.get('parameters', {})
+        else:
+            parameters = request.query_params.dict()
         
         try:
             template.validate_parameters(parameters)
@@ -85,11 +222,11 @@ class TemplateViewSet(viewsets.ReadOnlyModelViewSet):
                 'data': {'valid': True},
                 'errors': []
             })
-        except Exception as e:
+        except ValidationError as e:
             return Response({
                 'status': 'error',
                 'data': {'valid': False},
-                'errors': [str(e)]
+                'errors': e.messages
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -114,25 +251,56 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Application.objects.none()
         
+        # Serializers render the creator's email; templates come from the template cache
+        queryset = Application.objects.select_related('creator')
+        
         # Creators can see their own applications
         if user.role == 'CREATOR':
-            return Application.objects.filter(creator=user)
+            return queryset.filter(creator_id=user.pk)
         
         # Other authenticated users can see public and internal applications
-        return Application.objects.filter(
+        return queryset.filter(
             Q(visibility='PUBLIC') | Q(visibility='INTERNAL')
         )
     
+    @property
+    def search_query(self):
+        """The catalog search term from ``?q=``, or an empty string."""
+        return self.request.query_params.get('q', '').strip()
+    
+    @property
+    def paginator(self):
+        """
+        Search results are ranked and page-numbered; plain listings are
+        keyset-paginated when ``after`` or ``page_size`` is given.
+        """
+        if not hasattr(self, '_paginator'):
+            self._paginator = None
+            if self.action == 'list':
+                params = self.request.query_params
+                if self.search_query:
+                    self._paginator = ApplicationSearchPagination()
+                elif 'after' in params or 'page_size' in params:
+                    self._paginator = ApplicationKeysetPagination()
+        return self._paginator
+    
+    def filter_queryset(self, queryset):
+        """Apply the ``q`` catalog search (best match first) to listings."""
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list' and self.search_query:
+            queryset = search_applications(queryset, self.search_query)
+        return queryset
+    
     def create(self, request, *args, **kwargs):
         """Create a new application and publish creation event."""
         serializer = self.get_serializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
         
-        # Save the application
-        application = serializer.save()
-        
-        # Publish creation event
-        self._publish_creation_event(application)
+        # The application and its creation event commit (or roll back) together;
+        # the dispatch_events worker publishes the event to the broker after commit
+        with transaction.atomic():
+            application = serializer.save()
+            publish_applications_created([application])
         
         # Return success response
         response_serializer = ApplicationSerializer(application, context={'request': request})
@@ -199,26 +367,32 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             'errors': []
         }, status=status.HTTP_200_OK)
     
-    def _publish_creation_event(self, application):
-        """Publish creator.application.created event."""
-        event_data = {
-            'event_type': 'creator.application.created',
-            'timestamp': timezone.now().isoformat(),
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def bulk_import(self, request):
+        """
+        Create many applications from an NDJSON body (one application per line).
+        
+        Each line takes the same fields as a single create. Valid lines are
+        created even when others fail; failures are reported per line.
+        """
+        if request.content_type.split(';')[0].strip() not in NDJSON_MEDIA_TYPES:
+            raise UnsupportedMediaType(request.content_type)
+        
+        stream = request.stream
+        result = import_applications(
+            read_lines(stream) if stream is not None else [],
+            creator=request.user,
+            context={'request': request},
+        )
+        return Response({
+            'status': 'error' if result.errors else 'success',
             'data': {
-                'application_id': application.application_id,
-                'application_name': application.name,
-                'creator_email': application.creator.email,
-                'owner': application.owner,
-                'visibility': application.visibility,
-                'template_id': application.template.template_id if application.template else None,
-                'created_at': application.created_at.isoformat(),
-            }
-        }
-        
-        # Log the event (in a real system, this would publish to a message queue)
-        logger.info(f"Event published: {event_data}")
-
-        return event_data
+                'created_count': len(result.created),
+                'failed_count': len(result.errors),
+                'created': result.created,
+            },
+            'errors': result.errors
+        }, status=status.HTTP_200_OK)
     
     @action(detail=True, methods=['get'])
     def catalog_view(self, request, pk=None):
@@ -226,7 +400,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         application = self.get_object()
         
         # Check visibility permissions
-        if application.visibility == 'PRIVATE' and application.creator != request.user:
+        if application.visibility == 'PRIVATE' and application.creator_id != request.user.pk:
             return Response({
                 'status': 'error',
                 'data': None,
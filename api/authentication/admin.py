@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 
-from .models import User
+from .models import AccountDeletionJob, DataExportJob, User
 
 
 @admin.register(User)
@@ -33,3 +33,26 @@ class UserAdmin(BaseUserAdmin):
     )
     
     readonly_fields = ('created_at', 'updated_at', 'last_login', 'gdpr_consent_date')
+
+
+@admin.register(AccountDeletionJob)
+class AccountDeletionJobAdmin(admin.ModelAdmin):
+    """Admin for GDPR account deletion jobs."""
+    
+    list_display = ('id', 'status', 'deleted_items', 'total_items', 'created_at', 'completed_at')
+    list_filter = ('status',)
+    ordering = ('-created_at',)
+    readonly_fields = (
+        'id', 'user', 'status', 'total_items', 'deleted_items', 'last_error',
+        'created_at', 'updated_at', 'completed_at'
+    )
+
+
+@admin.register(DataExportJob)
+class DataExportJobAdmin(admin.ModelAdmin):
+    """Admin for GDPR data export jobs."""
+    
+    list_display = ('id', 'user', 'status', 'created_at', 'completed_at')
+    list_filter = ('status',)
+    ordering = ('-created_at',)
+    readonly_fields = ('id', 'user', 'status', 'archive', 'last_error', 'created_at', 'updated_at', 'completed_at')
@@ -0,0 +1,293 @@
+"""
+DRF authentication classes for the CollabMarket API.
+
+SimpleJWT's ``JWTAuthentication`` loads the user row on every request, which
+makes ``SELECT ... FROM authentication_user WHERE id = ?`` the most frequent
+query in the system. ``CachedJWTAuthentication`` keeps a short-lived copy of
+the user in the cache instead, loaded without its password hash so the hash
+never sits in the shared cache. Entries are keyed on the user id plus a
+per-user version stamp; bumping the stamp (on every save or delete of the
+user) makes all previously cached copies unreachable at once.
+
+``StatelessJWTAuthentication`` goes further: tokens carry the user's ``role``
+and ``token_version``, and the request user is a proxy that answers
+permission checks from those claims. The only per-request lookup is the
+user's current token version in the shared cache, which is how password,
+role and status changes (and deletion) revoke outstanding access tokens.
+A process-local cache would keep each worker's copy of the version to
+itself, so with one every lookup reads the database instead.
+
+Both classes also implement ``aauthenticate()`` for the native async views
+(``api.async_views``).
+"""
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject, empty
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from api.cache import is_process_local
+from api.routers import use_primary
+
+USER_CACHE_PREFIX = 'authentication:user'
+
+
+def _version_key(user_id):
+    return f'{USER_CACHE_PREFIX}:{user_id}:version'
+
+
+def _user_key(user_id, version):
+    return f'{USER_CACHE_PREFIX}:{user_id}:{version}'
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def get_user_cache_version(user_id):
+    """Return the current cache version for ``user_id``, creating one if needed."""
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        # A fresh random stamp (rather than a counter) means an evicted version
+        # key can never line up with an old cached user again.
+        cache.add(_version_key(user_id), _new_version(), timeout=None)
+        version = cache.get(_version_key(user_id))
+    return version
+
+
+def invalidate_cached_user(user_id):
+    """Make every cached copy of the user unreachable."""
+    cache.set(_version_key(user_id), _new_version(), timeout=None)
+
+
+TOKEN_VERSION_PREFIX = 'authentication:token-version'
+
+# Cached in place of a version for deleted or unknown users; never matches a claim.
+REVOKED = -1
+
+
+def _token_version_key(user_id):
+    return f'{TOKEN_VERSION_PREFIX}:{user_id}'
+
+
+def publish_token_version(user_id, version):
+    """Store the user's current token version in the shared cache."""
+    cache.set(_token_version_key(user_id), version, timeout=None)
+
+
+def forget_token_version(user_id):
+    """Drop the cached token version so the next lookup reads the database."""
+    cache.delete(_token_version_key(user_id))
+
+
+def get_token_version(user_id):
+    """
+    Return the user's current token version, or ``REVOKED`` if the user is gone.
+
+    Served from the shared cache; a miss reads the single column from the
+    database and seeds the cache with ``add`` so it cannot overwrite a newer
+    version published concurrently. A process-local cache is bypassed: a
+    version bumped by another worker would never reach it.
+    """
+    key = _token_version_key(user_id)
+    version = _cached_token_version(key)
+    if version is not None:
+        return version
+
+    with use_primary():
+        row = _token_version_query(user_id).first()
+    return _seed_token_version(key, row)
+
+
+async def aget_token_version(user_id):
+    """Async ``get_token_version()``; a miss reads the database with ``afirst()``."""
+    key = _token_version_key(user_id)
+    version = _cached_token_version(key)
+    if version is not None:
+        return version
+
+    with use_primary():
+        row = await _token_version_query(user_id).afirst()
+    return _seed_token_version(key, row)
+
+
+def _token_version_query(user_id):
+    return get_user_model().objects.filter(pk=user_id).values_list('token_version', 'is_active')
+
+
+def _cached_token_version(key):
+    return None if is_process_local() else cache.get(key)
+
+
+def _seed_token_version(key, row):
+    version = row[0] if row and row[1] else REVOKED
+    if is_process_local():
+        return version
+    cache.add(key, version, timeout=None)
+    return cache.get(key, version)
+
+
+def _user_id(validated_token):
+    try:
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken(_('Token contained no recognizable user identification'))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves the user from the cache when possible.
+
+    A cache hit costs no database query. Misses fall back to the normal
+    lookup and store the result for ``AUTH_USER_CACHE_TIMEOUT`` seconds.
+    The password column is deferred: code that needs it (a password check,
+    or ``CHECK_REVOKE_TOKEN``) loads it from the database on access.
+    """
+
+    async def aauthenticate(self, request):
+        """
+        ``authenticate()`` for native async views, on a plain ``HttpRequest``.
+
+        Token validation is CPU-only and the user comes from the cache, so a
+        warm request never leaves the event loop; only a miss queries,
+        through the async ORM.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        user = self.get_cached_user(_user_id(validated_token))
+        return self.check_user(user, validated_token)
+
+    async def aget_user(self, validated_token):
+        user = await self.aget_cached_user(_user_id(validated_token))
+        return self.check_user(user, validated_token)
+
+    def check_user(self, user, validated_token):
+        """Reject inactive users and tokens issued before a password change."""
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        return user
+
+    def cacheable_users(self):
+        """Return the queryset cached users are loaded from, without the password hash."""
+        return self.user_model.objects.defer('password')
+
+    def get_cached_user(self, user_id):
+        """Return the user for ``user_id`` from the cache, loading it on a miss."""
+        key = _user_key(user_id, get_user_cache_version(user_id))
+        user = cache.get(key)
+        if user is not None:
+            return user
+
+        try:
+            # Cached beyond this request, so never from a lagging replica.
+            with use_primary():
+                user = self.cacheable_users().get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        cache.set(key, user, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+    async def aget_cached_user(self, user_id):
+        """Async ``get_cached_user()``; a miss loads the user with ``aget()``."""
+        key = _user_key(user_id, get_user_cache_version(user_id))
+        user = cache.get(key)
+        if user is not None:
+            return user
+
+        try:
+            with use_primary():
+                user = await self.cacheable_users().aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        cache.set(key, user, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+
+class TokenClaimsUser(SimpleLazyObject):
+    """
+    Request user answered from the access token's claims.
+
+    ``pk``, ``id`` and ``role`` come straight from the token, which is all the
+    role permissions need. Any other attribute (or using the proxy in an ORM
+    filter) loads the real ``User`` row on first access.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+
+    def __init__(self, validated_token):
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        super().__init__(
+            lambda: get_user_model().objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        )
+        self.__dict__['_claims'] = {'id': user_id, 'role': validated_token.get('role')}
+
+    def __bool__(self):
+        # LazyObject would load the row to answer ``if request.user``.
+        return True
+
+    def _claim(self, name):
+        # Once the row is loaded (e.g. to update it), it is the source of truth.
+        if self._wrapped is not empty:
+            return getattr(self._wrapped, name)
+        return self.__dict__['_claims'][name]
+
+    @property
+    def pk(self):
+        return self._claim('id')
+
+    id = pk
+
+    @property
+    def role(self):
+        return self._claim('role')
+
+
+class StatelessJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT authentication that trusts the ``role`` claim instead of loading the user.
+
+    The token's ``token_version`` must match the user's current version, so
+    tokens issued before a password, role or status change are rejected.
+    Tokens without the claims (issued before this mode existed) fall back to
+    the cached user lookup.
+    """
+
+    def get_user(self, validated_token):
+        if 'token_version' not in validated_token:
+            return super().get_user(validated_token)
+        return self.check_token_version(get_token_version(_user_id(validated_token)), validated_token)
+
+    async def aget_user(self, validated_token):
+        if 'token_version' not in validated_token:
+            return await super().aget_user(validated_token)
+        return self.check_token_version(await aget_token_version(_user_id(validated_token)), validated_token)
+
+    def check_token_version(self, version, validated_token):
+        if version != validated_token['token_version']:
+            raise AuthenticationFailed(_('Token has been revoked.'), code='token_revoked')
+        return TokenClaimsUser(validated_token)
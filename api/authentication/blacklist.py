@@ -0,0 +1,154 @@
+"""
+In-memory Bloom filter in front of SimpleJWT's token blacklist.
+
+Every refresh (and logout) checks ``BlacklistedToken`` for the token's jti.
+Almost all of those checks are for tokens that were never blacklisted, so a
+Bloom filter of blacklisted jtis answers them without a query: a negative
+answer is definitive, and only a (rare) positive one falls through to the
+database.
+
+The filter lives in each process and is kept correct across workers by a
+generation counter in the shared cache. Blacklisting a token bumps the
+counter after commit; a process that sees a newer generation first pulls the
+rows added since its high-water mark (an indexed primary-key range query).
+The filter is rebuilt from scratch every ``TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS``
+so entries removed by ``prune_tokens`` eventually drop out.
+
+That counter only reaches other workers through a shared cache. With a
+process-local backend (the default ``LocMemCache``, or ``DummyCache``) the
+filter is bypassed and every check goes to the database, so a token logged
+out in one worker is never accepted by another.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from api.cache import is_process_local
+from api.routers import use_primary
+
+GENERATION_KEY = 'authentication:token-blacklist:generation'
+
+# Lower bound for the filter capacity, so a nearly empty blacklist still has
+# headroom for the entries added between rebuilds.
+MIN_CAPACITY = 1024
+
+# Primary keys are allocated before commit, so concurrent transactions can
+# commit out of order. Catch-ups re-read this many rows below the high-water
+# mark so a row committed late behind a higher key is not skipped.
+CATCH_UP_OVERLAP = 100
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over strings using double hashing."""
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(int(capacity), 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + index * second) % self.size for index in range(self.hash_count))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+def current_generation():
+    """Return the shared blacklist generation, initialising it if it is missing."""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    """Tell every process that new blacklist rows exist."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # The key is missing (first use or evicted); any new value forces a catch-up.
+        cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+class BlacklistFilter:
+    """Process-local view of the blacklist, refreshed lazily on lookup."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._high_water = 0
+        self._generation = None
+        self._built_at = 0.0
+
+    def might_contain(self, jti):
+        """Return False if ``jti`` is certainly not blacklisted."""
+        if is_process_local():
+            # Blacklistings in other workers would not reach this one.
+            return True
+        with self._lock:
+            self._refresh()
+            return jti in self._bloom
+
+    def add(self, jti):
+        """Record a token blacklisted by this process without waiting for a refresh."""
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def reset(self):
+        """Drop the filter so the next lookup rebuilds it."""
+        with self._lock:
+            self._bloom = None
+
+    @use_primary()
+    def _refresh(self):
+        if self._bloom is None or time.monotonic() - self._built_at > settings.TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS:
+            self._rebuild()
+            return
+
+        generation = current_generation()
+        if generation != self._generation:
+            # Read the generation before querying, so a bump that lands during
+            # the query triggers another catch-up on the next lookup.
+            self._generation = generation
+            self._catch_up()
+
+    def _rebuild(self):
+        self._generation = current_generation()
+        rows = BlacklistedToken.objects.all()
+        capacity = max(MIN_CAPACITY, rows.count() * 2)
+        bloom = BloomFilter(capacity, settings.TOKEN_BLACKLIST_FILTER_ERROR_RATE)
+
+        high_water = 0
+        for pk, jti in rows.values_list('pk', 'token__jti').order_by().iterator(chunk_size=5000):
+            bloom.add(jti)
+            high_water = max(high_water, pk)
+
+        self._bloom = bloom
+        self._high_water = high_water
+        self._built_at = time.monotonic()
+
+    def _catch_up(self):
+        new_rows = BlacklistedToken.objects.filter(
+            pk__gt=self._high_water - CATCH_UP_OVERLAP
+        ).values_list('pk', 'token__jti')
+        for pk, jti in new_rows.order_by('pk').iterator(chunk_size=5000):
+            self._bloom.add(jti)
+            self._high_water = max(self._high_water, pk)
+
+
+blacklist_filter = BlacklistFilter()
@@ -0,0 +1,274 @@
+"""
+Background processing of GDPR account deletion and data export.
+
+``User.delete_user_data`` only anonymizes and deactivates the account and
+records an ``AccountDeletionJob``; the request returns straight away. The
+``process_gdpr_jobs`` worker then removes the account's rows here, one
+bounded batch per transaction, children before parents, so no single
+statement cascades through an arbitrarily large account and locks are held
+only briefly. Stored media files are removed after the batch that deleted
+their rows commits.
+
+Several workers (or overlapping cron runs) can share the queue:
+``claim_job`` hands each job to one of them with a compare-and-swap
+``UPDATE`` and a lease of ``GDPR_JOB_LEASE_SECONDS``, renewed after every
+deletion batch and, while an export is written, every few chunks of rows
+or media files. A job whose worker died becomes claimable again once its
+lease runs out.
+
+``DataExportJob`` archives are written the same way: every section of the
+ZIP is produced from a database iterator or a storage stream straight into
+a temporary file, so memory use stays flat however much data the account
+holds.
+"""
+import json
+import logging
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from applications.models import Application as CreatorApplication
+from campaigns.models import Application as CampaignApplication, Campaign, CampaignFile
+
+from .models import AccountDeletionJob, DataExportJob, JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+def _lease_end():
+    return timezone.now() + timedelta(seconds=settings.GDPR_JOB_LEASE_SECONDS)
+
+
+def claim_job(model, pk, statuses):
+    """
+    Take job ``pk`` of ``model`` for this worker; return it, or None if it is taken.
+
+    The job must be in ``statuses`` and not leased to another worker. The
+    check and the claim are one ``UPDATE``, so of several workers racing for
+    the job exactly one gets it.
+    """
+    claimed = model.objects.filter(pk=pk, status__in=statuses).filter(
+        Q(claimed_until__isnull=True) | Q(claimed_until__lt=timezone.now())
+    ).update(status=JobStatus.RUNNING, claimed_until=_lease_end(), updated_at=timezone.now())
+    if not claimed:
+        return None
+    return model.objects.select_related('user').get(pk=pk)
+
+
+def renew_lease(job):
+    """Push back the end of ``job``'s lease so no other worker claims it."""
+    job.claimed_until = _lease_end()
+    type(job).objects.filter(pk=job.pk).update(claimed_until=job.claimed_until)
+
+
+def _deletion_steps(user_id):
+    """
+    Return ``(model, queryset)`` pairs covering everything owned by the user.
+
+    Ordered so each step only deletes rows nothing remaining still points at,
+    which keeps every batch's ORM cascade empty.
+    """
+    return [
+        (CampaignApplication, CampaignApplication.objects.filter(influencer_id=user_id)),
+        (CampaignApplication, CampaignApplication.objects.filter(campaign__brand_id=user_id)),
+        (CampaignFile, CampaignFile.objects.filter(campaign__brand_id=user_id)),
+        (Campaign, Campaign.objects.filter(brand_id=user_id)),
+        (CreatorApplication, CreatorApplication.objects.filter(creator_id=user_id)),
+        (DataExportJob, DataExportJob.objects.filter(user_id=user_id)),
+        (BlacklistedToken, BlacklistedToken.objects.filter(token__user_id=user_id)),
+        (OutstandingToken, OutstandingToken.objects.filter(user_id=user_id)),
+    ]
+
+
+def count_user_data(user_id):
+    """Return the number of rows (including the user itself) a deletion removes."""
+    return sum(queryset.count() for _, queryset in _deletion_steps(user_id)) + 1
+
+
+# Models whose rows own a stored file, and the field holding it.
+FILE_FIELDS = {
+    CampaignFile: 'file',
+    DataExportJob: 'archive',
+}
+
+
+def _delete_stored_files(storage, names):
+    for name in names:
+        try:
+            storage.delete(name)
+        except OSError:
+            # The row is gone either way; gc_campaign_media sweeps leftovers.
+            logger.warning('Could not delete stored file %s', name, exc_info=True)
+
+
+def _delete_batch(model, queryset, batch_size):
+    """Delete up to ``batch_size`` rows of ``queryset``; return how many went."""
+    file_field = FILE_FIELDS.get(model)
+    if file_field:
+        rows = list(queryset.order_by('pk').values_list('pk', file_field)[:batch_size])
+        pks = [pk for pk, _ in rows]
+        names = [name for _, name in rows if name]
+        if names:
+            storage = model._meta.get_field(file_field).storage
+            transaction.on_commit(lambda: _delete_stored_files(storage, names))
+    else:
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+
+    if not pks:
+        return 0
+    model.objects.filter(pk__in=pks).delete()
+    return len(pks)
+
+
+def run_deletion_batch(job, batch_size=None):
+    """
+    Run one batch of ``job`` in its own transaction.
+
+    Returns True while work remains. The final batch deletes the user row and
+    marks the job completed.
+    """
+    batch_size = batch_size or settings.GDPR_DELETION_BATCH_SIZE
+
+    with transaction.atomic():
+        if job.status == AccountDeletionJob.Status.PENDING or job.total_items is None:
+            job.status = AccountDeletionJob.Status.RUNNING
+            job.total_items = count_user_data(job.user_id) if job.user_id else 0
+
+        if job.user_id is not None:
+            for model, queryset in _deletion_steps(job.user_id):
+                deleted = _delete_batch(model, queryset, batch_size)
+                if deleted:
+                    job.deleted_items += deleted
+                    job.claimed_until = _lease_end()
+                    job.save(update_fields=['status', 'total_items', 'deleted_items', 'claimed_until', 'updated_at'])
+                    return True
+
+            # Nothing left pointing at the user; drop the row itself.
+            job.user.delete()
+            job.user = None
+            job.deleted_items += 1
+
+        job.status = AccountDeletionJob.Status.COMPLETED
+        job.completed_at = timezone.now()
+        job.claimed_until = None
+        job.last_error = ''
+        job.save()
+    return False
+
+
+def run_deletion_job(job, batch_size=None):
+    """Run ``job`` to completion, recording the error if a batch fails."""
+    try:
+        while run_deletion_batch(job, batch_size):
+            pass
+    except Exception as exc:
+        logger.exception('Account deletion job %s failed', job.pk)
+        job.refresh_from_db()
+        job.status = AccountDeletionJob.Status.FAILED
+        job.claimed_until = None
+        job.last_error = str(exc)
+        job.save(update_fields=['status', 'claimed_until', 'last_error', 'updated_at'])
+        return False
+    return True
+
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_LEASE_FILES = 20  # media files copied between lease renewals
+
+# Profile fields included in an export; credentials and internal flags are not.
+PROFILE_FIELDS = (
+    'id', 'email', 'first_name', 'last_name', 'role', 'gdpr_consent',
+    'gdpr_consent_date', 'followers', 'engagement_rate', 'platform',
+    'is_email_verified', 'date_joined', 'last_login', 'created_at', 'updated_at',
+)
+
+
+def _export_sections(user_id):
+    """Return ``(archive name, queryset)`` pairs written as NDJSON."""
+    return [
+        ('campaigns.ndjson', Campaign.objects.filter(brand_id=user_id)),
+        ('campaign_files.ndjson', CampaignFile.objects.filter(campaign__brand_id=user_id)),
+        ('campaign_applications.ndjson', CampaignApplication.objects.filter(
+            Q(influencer_id=user_id) | Q(campaign__brand_id=user_id)
+        )),
+        ('applications.ndjson', CreatorApplication.objects.filter(creator_id=user_id)),
+    ]
+
+
+def _write_ndjson(archive, name, rows, renew_lease):
+    with archive.open(name, 'w', force_zip64=True) as stream:
+        for count, row in enumerate(rows, 1):
+            stream.write(json.dumps(row, cls=DjangoJSONEncoder).encode())
+            stream.write(b'\n')
+            if count % EXPORT_CHUNK_SIZE == 0:
+                renew_lease()
+
+
+def write_export_archive(user, fileobj, renew_lease=lambda: None):
+    """
+    Write the ZIP export of ``user``'s data to the binary file ``fileobj``.
+
+    Rows are fetched in chunks with ``iterator()`` and media is copied from
+    storage in fixed-size blocks, so only one chunk is held at a time.
+    ``renew_lease`` is called after every section, every chunk of rows and
+    every ``EXPORT_LEASE_FILES`` media files.
+    """
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        profile = {field: getattr(user, field) for field in PROFILE_FIELDS}
+        archive.writestr('profile.json', json.dumps(profile, cls=DjangoJSONEncoder, indent=2))
+
+        for name, queryset in _export_sections(user.pk):
+            rows = queryset.order_by('pk').values().iterator(chunk_size=EXPORT_CHUNK_SIZE)
+            _write_ndjson(archive, name, rows, renew_lease)
+            renew_lease()
+
+        storage = CampaignFile._meta.get_field('file').storage
+        names = (
+            CampaignFile.objects.filter(campaign__brand_id=user.pk)
+            .order_by('pk').values_list('file', flat=True).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        for count, name in enumerate(names, 1):
+            if count % EXPORT_LEASE_FILES == 0:
+                renew_lease()
+            try:
+                source = storage.open(name, 'rb')
+            except OSError:
+                logger.warning('Stored file %s missing from export', name)
+                continue
+            with source, archive.open(f'media/{name}', 'w', force_zip64=True) as target:
+                shutil.copyfileobj(source, target)
+
+
+def run_export_job(job):
+    """Build the archive for ``job`` and attach it; return False on failure."""
+    job.status = DataExportJob.Status.RUNNING
+    job.save(update_fields=['status', 'updated_at'])
+    try:
+        # Spooled to disk, then streamed into storage in chunks by File.
+        with tempfile.TemporaryFile() as spool:
+            write_export_archive(job.user, spool, renew_lease=lambda: renew_lease(job))
+            spool.seek(0)
+            job.archive.save(f'{job.pk}.zip', File(spool), save=False)
+    except Exception as exc:
+        logger.exception('Data export job %s failed', job.pk)
+        job.status = DataExportJob.Status.FAILED
+        job.claimed_until = None
+        job.last_error = str(exc)
+        job.save(update_fields=['status', 'claimed_until', 'last_error', 'updated_at'])
+        return False
+
+    job.status = DataExportJob.Status.COMPLETED
+    job.completed_at = timezone.now()
+    job.claimed_until = None
+    job.last_error = ''
+    job.save()
+    return True
@@ -0,0 +1,125 @@
+"""
+Password hashers used by the PASSWORD_HASHER_PROFILES setting.
+
+Hashing is deliberately CPU-bound. Two things keep it from hurting request
+latency:
+
+* ``TunedArgon2PasswordHasher`` reads its cost parameters from settings, so
+  the Argon2id profile can be tuned per deployment. Django rehashes a stored
+  password transparently on the next successful login whenever the preferred
+  hasher or its parameters change.
+* When ``PASSWORD_HASHING_OFFLOAD`` is enabled (the ASGI entry point turns it
+  on), the actual hash computation runs in a dedicated, bounded thread pool.
+  At most ``PASSWORD_HASHING_THREADS`` hashes run at once, so a burst of
+  logins or registrations cannot take the CPU from every thread that serves
+  other requests. Sync callers (the DRF login, registration and password
+  views) wait for the pool through ``run_hashing``; async callers
+  (``User.acheck_password()``) await it through ``arun_hashing`` and keep
+  the event loop free.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, PBKDF2PasswordHasher, make_password, verify_password,
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pool_thread = threading.local()
+
+
+def _mark_pool_thread():
+    _pool_thread.active = True
+
+
+def get_hashing_executor():
+    """Return the process-wide thread pool used for password hashing."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASHING_THREADS,
+                    thread_name_prefix='password-hashing',
+                    initializer=_mark_pool_thread,
+                )
+    return _executor
+
+
+def run_hashing(func, *args, **kwargs):
+    """
+    Run a hashing callable, in the hashing pool when offloading is enabled.
+
+    The calling thread waits for the result, but the pool caps how many
+    hashes compute at once. Calls made from inside the pool run inline;
+    PBKDF2's ``verify`` calls ``encode``, and queueing that behind itself
+    could deadlock a full pool.
+    """
+    if not settings.PASSWORD_HASHING_OFFLOAD or getattr(_pool_thread, 'active', False):
+        return func(*args, **kwargs)
+    return get_hashing_executor().submit(func, *args, **kwargs).result()
+
+
+async def arun_hashing(func, *args, **kwargs):
+    """
+    Await a hashing callable from async code without blocking the event loop.
+
+    It runs in the hashing pool when offloading is enabled, and in the loop's
+    default executor otherwise.
+    """
+    executor = get_hashing_executor() if settings.PASSWORD_HASHING_OFFLOAD else None
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+async def acheck_password(password, encoded, setter=None, preferred='default'):
+    """Like Django's ``acheck_password()``, but verifies through ``arun_hashing``."""
+    is_correct, must_update = await arun_hashing(verify_password, password, encoded, preferred=preferred)
+    if setter and is_correct and must_update:
+        await setter(password)
+    return is_correct
+
+
+async def amake_password(password, salt=None, hasher='default'):
+    """``make_password()`` computed through ``arun_hashing``."""
+    return await arun_hashing(make_password, password, salt, hasher)
+
+
+class OffloadedHasherMixin:
+    """Route the expensive hasher operations through ``run_hashing``."""
+
+    def encode(self, *args, **kwargs):
+        return run_hashing(super().encode, *args, **kwargs)
+
+    def verify(self, password, encoded):
+        return run_hashing(super().verify, password, encoded)
+
+
+class OffloadedPBKDF2PasswordHasher(OffloadedHasherMixin, PBKDF2PasswordHasher):
+    """Django's PBKDF2-SHA256 hasher, computed in the hashing pool when enabled."""
+
+
+class TunedArgon2PasswordHasher(OffloadedHasherMixin, Argon2PasswordHasher):
+    """
+    Argon2id hasher whose costs come from ``PASSWORD_HASHER_ARGON2``.
+
+    Hashes keep Django's standard ``argon2`` format, so changing the costs only
+    makes ``must_update`` trigger a rehash on the next successful login.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_HASHER_ARGON2['time_cost']
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_HASHER_ARGON2['memory_cost']
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_HASHER_ARGON2['parallelism']
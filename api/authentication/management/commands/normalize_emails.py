@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Lower, Trim
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Rewrite stored emails into their canonical (trimmed, lower-cased) form.
+
+    Emails are looked up by equality with ``UserManager.normalize_email()``,
+    so accounts saved before emails were normalized no longer match until
+    this runs. Run it before the ``authentication_user_email_ci_unique``
+    constraint is applied to an existing database: case variants of one
+    address (``Ann@x.com`` and ``ann@x.com``) would make creating the
+    constraint fail.
+
+    Accounts whose canonical emails collide are reported and left as they
+    are; merge or rename them, then rerun. The command exits with an error
+    while any remain. Rows are updated in transactions of ``--batch-size``,
+    and rerunning it is safe.
+    """
+
+    help = 'Normalize stored user emails and report case-variant duplicates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Users read and updated per transaction (default: 1000).',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        duplicates = self.duplicate_groups()
+        conflicting = {pk for group in duplicates.values() for pk, _ in group}
+        for canonical, group in sorted(duplicates.items()):
+            accounts = ', '.join(f'{email!r} (id {pk})' for pk, email in group)
+            self.stderr.write(f'Duplicate accounts for {canonical}: {accounts}')
+
+        changed = 0
+        last_pk = None
+        while True:
+            users = User.objects.order_by('pk')
+            if last_pk is not None:
+                users = users.filter(pk__gt=last_pk)
+            rows = list(users.values_list('pk', 'email')[:batch_size])
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+
+            updates = [
+                User(pk=pk, email=User.objects.normalize_email(email))
+                for pk, email in rows
+                if pk not in conflicting and email != User.objects.normalize_email(email)
+            ]
+            changed += len(updates)
+            if updates and not options['dry_run']:
+                # bulk_update() skips save(), so token versions are left alone.
+                with transaction.atomic():
+                    User.objects.bulk_update(updates, ['email'])
+
+        verb = 'would be normalized' if options['dry_run'] else 'normalized'
+        self.stdout.write(self.style.SUCCESS(f'{changed} email(s) {verb}.'))
+        if duplicates:
+            raise CommandError(
+                f'{len(duplicates)} email(s) are shared by several accounts; resolve them and rerun.'
+            )
+
+    def duplicate_groups(self):
+        """Return ``{canonical email: [(pk, email), ...]}`` for emails several accounts share."""
+        canonical = Lower(Trim('email'))
+        shared = list(
+            User.objects.annotate(canonical=canonical).values('canonical')
+            .annotate(accounts=Count('pk')).filter(accounts__gt=1)
+            .order_by().values_list('canonical', flat=True)
+        )
+        groups = {}
+        if shared:
+            rows = User.objects.annotate(canonical=canonical).filter(canonical__in=shared).order_by('pk')
+            for pk, email, key in rows.values_list('pk', 'email', 'canonical'):
+                groups.setdefault(key, []).append((pk, email))
+        return groups
@@ -0,0 +1,87 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.gdpr import claim_job, run_deletion_job, run_export_job
+from authentication.models import AccountDeletionJob, DataExportJob
+
+
+class Command(BaseCommand):
+    """
+    Work through pending GDPR account deletion and data export jobs.
+
+    Deletion jobs delete the account's data in transactions of
+    ``--batch-size`` rows; export jobs stream the account's data into a ZIP
+    archive. Runs as a long-lived worker polling every ``--sleep`` seconds, or
+    with ``--once`` (e.g. from cron) to drain the queue and exit. Several
+    workers can run at once; each job is claimed by exactly one of them.
+    """
+
+    help = 'Process pending GDPR account deletion and data export jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Rows deleted per transaction (default: GDPR_DELETION_BATCH_SIZE).',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the jobs that are currently queued, then exit.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5.0,
+            help='Seconds to wait between polls when the queue is empty (default: 5).',
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also pick up jobs that previously failed.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size is not None and batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        statuses = [AccountDeletionJob.Status.PENDING, AccountDeletionJob.Status.RUNNING]
+        if options['retry_failed']:
+            statuses.append(AccountDeletionJob.Status.FAILED)
+
+        while True:
+            processed = 0
+            # Other workers may claim any of these first; claim_job() skips those.
+            for pk in self.queued(AccountDeletionJob, statuses):
+                job = claim_job(AccountDeletionJob, pk, statuses)
+                if job is None:
+                    continue
+                processed += 1
+                if run_deletion_job(job, batch_size):
+                    self.stdout.write(f'Deleted {job.deleted_items} row(s) for job {job.pk}.')
+                else:
+                    self.stderr.write(f'Job {job.pk} failed: {job.last_error}')
+
+            for pk in self.queued(DataExportJob, statuses):
+                export = claim_job(DataExportJob, pk, statuses)
+                if export is None:
+                    continue
+                processed += 1
+                if run_export_job(export):
+                    self.stdout.write(f'Wrote data export {export.pk}.')
+                else:
+                    self.stderr.write(f'Export {export.pk} failed: {export.last_error}')
+
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS('Processed pending GDPR jobs.'))
+
+    def queued(self, model, statuses):
+        """Return the ids of ``model`` jobs in ``statuses``, oldest first."""
+        return list(model.objects.filter(status__in=statuses).order_by('created_at').values_list('pk', flat=True))
@@ -1,11 +1,41 @@
-from django.db import models
+import uuid
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils.translation import gettext_lazy as _
 
+from .hashers import acheck_password, amake_password
+from .storage import export_storage
+
 
 class UserManager(BaseUserManager):
     """Custom user manager where email is the unique identifier."""
     
+    @classmethod
+    def normalize_email(cls, email):
+        """
+        Return the canonical form of an email address: trimmed and lower-cased.
+        
+        Emails are stored in this form and every lookup uses it, so plain
+        equality hits the unique index instead of an unindexable
+        ``UPPER(email) = UPPER(?)`` scan.
+        """
+        return (email or '').strip().lower()
+    
+    def get_by_email(self, email):
+        """Return the user with the given email, matched case-insensitively."""
+        return self.get(email=self.normalize_email(email))
+    
+    def email_exists(self, email):
+        """Return whether any user has the given email, matched case-insensitively."""
+        return self.filter(email=self.normalize_email(email)).exists()
+    
+    def get_by_natural_key(self, username):
+        """Authenticate against the canonical email so login is case-insensitive."""
+        return self.get_by_email(username)
+    
     def create_user(self, email, password=None, **extra_fields):
         """Create and save a regular user with the given email and password."""
         if not email:
@@ -87,6 +117,11 @@ class User(AbstractUser):
     
     # Additional fields
     is_email_verified = models.BooleanField(_('email verified'), default=False)
+    token_version = models.PositiveIntegerField(
+        _('token version'),
+        default=0,
+        help_text=_('Incremented to revoke all tokens issued before a password, role or status change')
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -99,12 +134,205 @@ class User(AbstractUser):
         verbose_name = _('user')
         verbose_name_plural = _('users')
         ordering = ['-created_at']
+        constraints = [
+            # Guards against case variants written around save(), e.g. queryset.update().
+            # On an existing database, run ``manage.py normalize_emails`` before adding it.
+            models.UniqueConstraint(Lower('email'), name='authentication_user_email_ci_unique'),
+        ]
+    
+    # Changing any of these revokes the tokens issued with the old values.
+    TOKEN_REVOKING_FIELDS = ('role', 'is_active')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded token-revoking fields and email to detect changes on save."""
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        instance._loaded_token_fields = {
+            name: value for name, value in loaded.items()
+            if name in cls.TOKEN_REVOKING_FIELDS
+        }
+        instance._loaded_email = loaded.get('email')
+        return instance
     
     def __str__(self):
         return self.email
     
+    @property
+    def email_changed(self):
+        """Whether the email differs from the stored one (True when that is unknown)."""
+        return getattr(self, '_loaded_email', None) != self.email
+    
+    def _token_fields_changed(self):
+        loaded = getattr(self, '_loaded_token_fields', {})
+        return any(getattr(self, name) != value for name, value in loaded.items())
+    
+    def save(self, *args, **kwargs):
+        """Store the canonical email and bump the token version on revoking changes."""
+        self.email = self.__class__.objects.normalize_email(self.email)
+        if self.pk is not None and (self._password is not None or self._token_fields_changed()):
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self._loaded_token_fields = {name: getattr(self, name) for name in self.TOKEN_REVOKING_FIELDS}
+        self._loaded_email = self.email
+    
+    async def acheck_password(self, raw_password):
+        """Check the password in the hashing pool rather than on the event loop."""
+        
+        async def setter(raw_password):
+            # A hash upgrade is not a password change, so the token version stays.
+            self.password = await amake_password(raw_password)
+            await self.asave(update_fields=['password'])
+        
+        return await acheck_password(raw_password, self.password, setter)
+    
+    def anonymize(self):
+        """Strip personal data and deactivate the account (revokes all tokens)."""
+        self.email = f'deleted-{uuid.uuid4().hex}@deleted.invalid'
+        self.first_name = ''
+        self.last_name = ''
+        self.set_unusable_password()
+        self.is_active = False
+        self.is_email_verified = False
+        self.gdpr_consent = False
+        self.gdpr_consent_date = None
+        self.followers = None
+        self.engagement_rate = None
+        self.platform = None
+        self.save()
+    
     def delete_user_data(self):
-        """GDPR-compliant data deletion method."""
-        # This method can be extended to handle cascading deletions
-        # or anonymization of related data
-        self.delete()
+        """
+        GDPR-compliant data deletion method.
+        
+        The account is anonymized and deactivated immediately; related
+        campaigns, applications, media and finally the user row are deleted
+        in bounded batches by the ``process_gdpr_jobs`` worker, so a large
+        account never deletes in one long-running cascade.
+        """
+        with transaction.atomic():
+            self.anonymize()
+            return AccountDeletionJob.objects.create(user=self)
+
+
+class JobStatus(models.TextChoices):
+    """Lifecycle of the background GDPR jobs."""
+    
+    PENDING = 'PENDING', _('Pending')
+    RUNNING = 'RUNNING', _('Running')
+    COMPLETED = 'COMPLETED', _('Completed')
+    FAILED = 'FAILED', _('Failed')
+
+
+class AccountDeletionJob(models.Model):
+    """Progress record for the background deletion of an account's data."""
+    
+    Status = JobStatus
+    
+    # The id doubles as the unguessable handle for the unauthenticated status endpoint.
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='deletion_jobs',
+        help_text=_('Account being deleted (cleared once the user row is gone)')
+    )
+    status = models.CharField(
+        _('status'),
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    total_items = models.PositiveIntegerField(
+        _('total items'),
+        null=True,
+        blank=True,
+        help_text=_('Rows to delete, counted when the job starts')
+    )
+    deleted_items = models.PositiveIntegerField(_('deleted items'), default=0)
+    last_error = models.TextField(_('last error'), blank=True)
+    claimed_until = models.DateTimeField(
+        _('claimed until'),
+        null=True,
+        blank=True,
+        help_text=_('End of the lease of the worker running the job')
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = _('account deletion job')
+        verbose_name_plural = _('account deletion jobs')
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Deletion {self.id} - {self.get_status_display()}"
+    
+    @property
+    def progress(self):
+        """Fraction of the work done, between 0 and 1 (None until counted)."""
+        if self.status == self.Status.COMPLETED:
+            return 1.0
+        if not self.total_items:
+            return None
+        return min(self.deleted_items / self.total_items, 1.0)
+
+
+def export_upload_to(instance, filename):
+    return f'{instance.user_id}/{filename}'
+
+
+class DataExportJob(models.Model):
+    """A user's request for a copy of their data, built in the background."""
+    
+    Status = JobStatus
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='data_exports'
+    )
+    status = models.CharField(
+        _('status'),
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    archive = models.FileField(
+        _('archive'),
+        storage=export_storage,
+        upload_to=export_upload_to,
+        blank=True,
+        help_text=_('ZIP archive, kept outside the public media root')
+    )
+    last_error = models.TextField(_('last error'), blank=True)
+    claimed_until = models.DateTimeField(
+        _('claimed until'),
+        null=True,
+        blank=True,
+        help_text=_('End of the lease of the worker running the job')
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = _('data export job')
+        verbose_name_plural = _('data export jobs')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Export {self.id} - {self.get_status_display()}"
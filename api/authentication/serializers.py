@@ -3,6 +3,15 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+from django.conf import settings
+from django.urls import reverse
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_api_settings
+
+from .authentication import get_token_version
+from .models import AccountDeletionJob, DataExportJob
+from .tokens import RefreshToken
 
 User = get_user_model()
 
@@ -29,6 +38,8 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'first_name': {'required': False},
             'last_name': {'required': False},
+            # Uniqueness is checked case-insensitively in validate_email.
+            'email': {'validators': []},
         }
     
     def validate(self, attrs):
@@ -47,9 +58,9 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     
     def validate_email(self, value):
         """Validate email is unique and properly formatted."""
-        if User.objects.filter(email__iexact=value).exists():
+        if User.objects.email_exists(value):
             raise serializers.ValidationError(_("A user with this email already exists."))
-        return value.lower()
+        return User.objects.normalize_email(value)
     
     def create(self, validated_data):
         """Create and return a new user."""
@@ -93,6 +104,50 @@ class UserSerializer(serializers.ModelSerializer):
             'is_email_verified', 'gdpr_consent', 'created_at', 'updated_at'
         )
         read_only_fields = ('id', 'is_email_verified', 'created_at', 'updated_at')
+        extra_kwargs = {
+            # Uniqueness is checked case-insensitively in validate_email.
+            'email': {'validators': []},
+        }
+    
+    def validate_email(self, value):
+        """Validate that no other user has this email."""
+        email = User.objects.normalize_email(value)
+        others = User.objects.filter(email=email)
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        if others.exists():
+            raise serializers.ValidationError(_("A user with this email already exists."))
+        return email
+
+
+class AccountDeletionJobSerializer(serializers.ModelSerializer):
+    """Serializer for the progress of a GDPR account deletion."""
+    
+    progress = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = AccountDeletionJob
+        fields = (
+            'id', 'status', 'total_items', 'deleted_items', 'progress',
+            'created_at', 'completed_at'
+        )
+        read_only_fields = fields
+
+
+class DataExportJobSerializer(serializers.ModelSerializer):
+    """Serializer for a GDPR data export request."""
+    
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = DataExportJob
+        fields = ('id', 'status', 'download_url', 'created_at', 'completed_at')
+        read_only_fields = fields
+    
+    def get_download_url(self, obj):
+        if obj.status != DataExportJob.Status.COMPLETED:
+            return None
+        return reverse('authentication:data_export_download', args=[obj.pk])
 
 
 class PasswordResetRequestSerializer(serializers.Serializer):
@@ -101,12 +156,8 @@ class PasswordResetRequestSerializer(serializers.Serializer):
     email = serializers.EmailField(required=True)
     
     def validate_email(self, value):
-        """Validate that email exists in the system."""
-        if not User.objects.filter(email__iexact=value).exists():
-            # Return success even if email doesn't exist (security best practice)
-            # Don't reveal whether email exists or not
-            pass
-        return value.lower()
+        """Normalize the email; whether it exists is deliberately not revealed."""
+        return User.objects.normalize_email(value)
 
 
 class PasswordResetConfirmSerializer(serializers.Serializer):
@@ -168,3 +219,25 @@ class PasswordChangeSerializer(serializers.Serializer):
         if not user.check_password(value):
             raise serializers.ValidationError(_("Old password is incorrect."))
         return value
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """Issue tokens with the project's RefreshToken class."""
+    
+    token_class = RefreshToken
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """Refresh tokens, checking the blacklist through the Bloom filter."""
+    
+    token_class = RefreshToken
+    
+    def validate(self, attrs):
+        """In stateless mode, reject refresh tokens issued before a revoking change."""
+        if settings.JWT_STATELESS_AUTH:
+            refresh = self.token_class(attrs['refresh'])
+            if 'token_version' in refresh:
+                user_id = refresh.get(jwt_api_settings.USER_ID_CLAIM)
+                if get_token_version(user_id) != refresh['token_version']:
+                    raise AuthenticationFailed(_('Token has been revoked.'), code='token_revoked')
+        return super().validate(attrs)
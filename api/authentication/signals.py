@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .authentication import REVOKED, forget_token_version, invalidate_cached_user, publish_token_version
+from .blacklist import blacklist_filter, bump_generation
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """
+    Drop cached copies of a user whenever the row changes.
+
+    This covers role selection, password changes and resets, profile updates
+    and GDPR deletion, since they all go through ``save()`` or ``delete()``.
+    The version is bumped again after commit so a request that re-cached the
+    old row while the transaction was still open cannot keep serving it.
+    """
+    user_id = instance.pk
+    invalidate_cached_user(user_id)
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def publish_user_token_version(sender, instance, **kwargs):
+    """
+    Publish the user's token version so stateless authentication sees revocations.
+
+    The cached version is dropped right away (readers fall back to the
+    database) and only replaced after commit, so a rolled-back change can
+    never leave a version in the cache that the database does not have.
+    """
+    user_id = instance.pk
+    if kwargs['signal'] is post_delete or not instance.is_active:
+        version = REVOKED
+    else:
+        version = instance.token_version
+    forget_token_version(user_id)
+    transaction.on_commit(lambda: publish_token_version(user_id, version))
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def track_blacklisted_token(sender, instance, created, **kwargs):
+    """
+    Add a newly blacklisted token to the Bloom filter.
+
+    This process sees the token immediately; other processes catch up once the
+    shared generation is bumped after commit.
+    """
+    if created:
+        blacklist_filter.add(instance.token.jti)
+        transaction.on_commit(bump_generation)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.functional import cached_property
+
+
+class ExportStorage(FileSystemStorage):
+    """
+    File storage for GDPR data exports, rooted at ``GDPR_EXPORT_ROOT``.
+
+    Archives live outside ``MEDIA_ROOT`` so they are never reachable through
+    the public media URL; they are only served by the authenticated
+    download endpoint.
+    """
+
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.GDPR_EXPORT_ROOT)
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == 'GDPR_EXPORT_ROOT':
+            self.__dict__.pop('base_location', None)
+            self.__dict__.pop('location', None)
+
+
+export_storage = ExportStorage()
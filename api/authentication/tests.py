@@ -1,10 +1,45 @@
-from django.test import TestCase
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import zipfile
+from datetime import date
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+import msgpack
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import Argon2PasswordHasher, check_password, make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework import status
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
 from django.utils import timezone
 
+from campaigns.models import Application as CampaignApplication, Campaign, CampaignFile
+from campaigns.views import IsBrand, IsInfluencer
+
+from .authentication import StatelessJWTAuthentication, _user_key, get_user_cache_version
+from .gdpr import claim_job, renew_lease, run_deletion_batch, write_export_archive
+from .blacklist import BloomFilter, blacklist_filter, bump_generation
+from .hashers import arun_hashing
+from .models import AccountDeletionJob, DataExportJob
+from .tokens import RefreshToken, tokens_for_user
+
 User = get_user_model()
 
 
@@ -103,6 +138,23 @@ class UserLoginTests(TestCase):
         self.assertIn('access', response.data['data']['tokens'])
         self.assertIn('refresh', response.data['data']['tokens'])
     
+    def test_login_msgpack(self):
+        """Test logging in with a MessagePack body and response."""
+        payload = {
+            'email': 'test@example.com',
+            'password': 'TestPass123!'
+        }
+        
+        response = self.client.post(
+            self.login_url, msgpack.packb(payload),
+            content_type='application/msgpack', HTTP_ACCEPT='application/msgpack',
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = msgpack.unpackb(response.content)
+        self.assertEqual(body['status'], 'success')
+        self.assertIn('access', body['data']['tokens'])
+    
     def test_login_wrong_password(self):
         """Test login fails with wrong password."""
         payload = {
@@ -287,3 +339,649 @@ class CurrentUserTests(TestCase):
         self.assertEqual(response.data['status'], 'success')
         self.assertEqual(response.data['data']['user']['email'], 'test@example.com')
         self.assertEqual(response.data['data']['user']['role'], 'BRAND')
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """Test that authenticated requests resolve the user from the cache."""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.me_url = reverse('authentication:current_user')
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='TestPass123!',
+            gdpr_consent=True,
+            gdpr_consent_date=timezone.now()
+        )
+        
+        response = self.client.post(reverse('authentication:login'), {
+            'email': 'test@example.com',
+            'password': 'TestPass123!'
+        }, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['data']['tokens']['access']}")
+    
+    def test_cached_request_skips_user_query(self):
+        """Test that a warm cache serves the user without touching the database."""
+        self.client.get(self.me_url)
+        
+        with self.assertNumQueries(0):
+            response = self.client.get(self.me_url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['user']['email'], 'test@example.com')
+    
+    def test_cached_user_has_no_password_hash(self):
+        """Test that the shared cache never holds the password hash."""
+        self.client.get(self.me_url)
+        
+        cached = cache.get(_user_key(self.user.pk, get_user_cache_version(self.user.pk)))
+        self.assertIn('password', cached.get_deferred_fields())
+        self.assertNotIn(self.user.password.encode(), pickle.dumps(cached))
+        self.assertTrue(cached.check_password('TestPass123!'))
+    
+    def test_role_change_invalidates_cached_user(self):
+        """Test that selecting a role is visible on the next request."""
+        self.client.get(self.me_url)
+        
+        self.client.post(reverse('authentication:role_selection'), {'role': 'BRAND'}, format='json')
+        response = self.client.get(self.me_url)
+        
+        self.assertEqual(response.data['data']['user']['role'], 'BRAND')
+    
+    def test_deactivated_user_is_rejected(self):
+        """Test that deactivating a user invalidates the cached copy."""
+        self.client.get(self.me_url)
+        
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.me_url)
+        
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PasswordHasherProfileTests(TestCase):
+    """Test the configurable hasher profile and transparent rehashing."""
+    
+    def test_new_passwords_use_argon2(self):
+        """Test that the default profile hashes new passwords with Argon2id."""
+        user = User.objects.create_user(email='argon@example.com', password='TestPass123!')
+        
+        self.assertTrue(user.password.startswith('argon2$argon2id$'))
+    
+    def test_login_rehashes_legacy_pbkdf2_password(self):
+        """Test that a successful login upgrades an existing PBKDF2 hash."""
+        user = User.objects.create_user(email='legacy@example.com', password='unused')
+        user.password = make_password('TestPass123!', hasher='pbkdf2_sha256')
+        user.save()
+        
+        response = APIClient().post(reverse('authentication:login'), {
+            'email': 'legacy@example.com',
+            'password': 'TestPass123!'
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('argon2$'))
+        self.assertTrue(user.check_password('TestPass123!'))
+    
+    @override_settings(PASSWORD_HASHING_OFFLOAD=True)
+    def test_offloaded_hashing_runs_in_dedicated_pool(self):
+        """Test that async callers hash in the hashing pool when offloading is enabled."""
+        thread_name = async_to_sync(arun_hashing)(lambda: threading.current_thread().name)
+        
+        self.assertTrue(thread_name.startswith('password-hashing'))
+        self.assertTrue(check_password('TestPass123!', make_password('TestPass123!')))
+    
+    @override_settings(PASSWORD_HASHING_OFFLOAD=True)
+    def test_asgi_login_hashes_in_dedicated_pool(self):
+        """Test that a login served through ASGI verifies the password in the hashing pool."""
+        User.objects.create_user(email='asgi@example.com', password='TestPass123!')
+        threads = []
+        verify = Argon2PasswordHasher.verify
+        
+        def recording_verify(hasher, password, encoded):
+            threads.append(threading.current_thread().name)
+            return verify(hasher, password, encoded)
+        
+        with mock.patch.object(Argon2PasswordHasher, 'verify', recording_verify):
+            response = async_to_sync(AsyncClient().post)(
+                reverse('authentication:login'),
+                {'email': 'asgi@example.com', 'password': 'TestPass123!'},
+                content_type='application/json',
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith('password-hashing') for name in threads))
+    
+    @override_settings(PASSWORD_HASHING_OFFLOAD=True)
+    def test_async_check_password_upgrades_hash(self):
+        """Test that acheck_password() verifies and upgrades a legacy hash off the event loop."""
+        user = User.objects.create_user(email='async@example.com', password='TestPass123!')
+        user.password = make_password('TestPass123!', hasher='pbkdf2_sha256')
+        user.save()
+        token_version = User.objects.get(pk=user.pk).token_version
+        
+        self.assertFalse(async_to_sync(user.acheck_password)('wrong'))
+        self.assertTrue(async_to_sync(user.acheck_password)('TestPass123!'))
+        
+        user = User.objects.get(pk=user.pk)
+        self.assertTrue(user.password.startswith('argon2$'))
+        self.assertEqual(user.token_version, token_version)
+
+
+class TokenBlacklistFilterTests(TestCase):
+    """Test the Bloom filter in front of the blacklist and token pruning."""
+    
+    def setUp(self):
+        # The filter needs a cache shared between processes; files stand in for one.
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        shared_cache = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': directory,
+        }})
+        shared_cache.enable()
+        self.addCleanup(shared_cache.disable)
+        cache.clear()
+        blacklist_filter.reset()
+        self.client = APIClient()
+        self.refresh_url = reverse('authentication:token_refresh')
+        self.user = User.objects.create_user(email='test@example.com', password='TestPass123!')
+    
+    def test_bloom_filter_membership(self):
+        """Test that added values are always reported as present."""
+        bloom = BloomFilter(capacity=100, error_rate=0.01)
+        for index in range(100):
+            bloom.add(f'jti-{index}')
+        
+        self.assertTrue(all(f'jti-{index}' in bloom for index in range(100)))
+        false_positives = sum(f'other-{index}' in bloom for index in range(1000))
+        self.assertLess(false_positives, 50)
+    
+    def test_unknown_token_skips_blacklist_query(self):
+        """Test that a warm filter answers for a never-blacklisted token without a query."""
+        refresh = RefreshToken.for_user(self.user)
+        RefreshToken(str(RefreshToken.for_user(self.user)))
+        
+        with self.assertNumQueries(0):
+            RefreshToken(str(refresh))
+    
+    def test_rotated_token_cannot_be_reused(self):
+        """Test that a refresh token blacklisted after rotation is rejected."""
+        refresh = str(RefreshToken.for_user(self.user))
+        
+        first = self.client.post(self.refresh_url, {'refresh': refresh}, format='json')
+        second = self.client.post(self.refresh_url, {'refresh': refresh}, format='json')
+        
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_token_blacklisted_elsewhere_is_caught_up(self):
+        """Test that blacklist rows written by another process are picked up."""
+        refresh = RefreshToken.for_user(self.user)
+        blacklist_filter.might_contain('warm-up')
+        
+        outstanding = OutstandingToken.objects.get(jti=refresh['jti'])
+        # Simulate another process: write the row without this process's signal handler.
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=outstanding)])
+        bump_generation()
+        
+        self.assertTrue(blacklist_filter.might_contain(refresh['jti']))
+    
+    def test_process_local_cache_always_checks_database(self):
+        """Test that without a shared cache, another worker's blacklisting is never missed."""
+        refresh = RefreshToken.for_user(self.user)
+        outstanding = OutstandingToken.objects.get(jti=refresh['jti'])
+        
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'this-worker',
+        }}):
+            blacklist_filter.might_contain('warm-up')
+            # Another worker blacklists the token; its generation bump lands in its own cache.
+            BlacklistedToken.objects.bulk_create([BlacklistedToken(token=outstanding)])
+            
+            self.assertTrue(blacklist_filter.might_contain(refresh['jti']))
+            with self.assertRaises(TokenError):
+                RefreshToken(str(refresh))
+    
+    def test_prune_tokens_deletes_only_expired(self):
+        """Test that pruning removes expired outstanding and blacklisted tokens."""
+        live = RefreshToken.for_user(self.user)
+        expired = RefreshToken.for_user(self.user)
+        expired.blacklist()
+        OutstandingToken.objects.filter(jti=expired['jti']).update(
+            expires_at=timezone.now() - timedelta(days=1)
+        )
+        
+        call_command('prune_tokens', '--batch-size', '1', stdout=StringIO())
+        
+        self.assertTrue(OutstandingToken.objects.filter(jti=live['jti']).exists())
+        self.assertFalse(OutstandingToken.objects.filter(jti=expired['jti']).exists())
+        self.assertEqual(BlacklistedToken.objects.count(), 0)
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    """Test role and token-version claims for stateless authentication."""
+    
+    def setUp(self):
+        # Token versions are only cached in a cache shared between processes.
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        shared_cache = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': directory,
+        }})
+        shared_cache.enable()
+        self.addCleanup(shared_cache.disable)
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.authentication = StatelessJWTAuthentication()
+        self.user = User.objects.create_user(
+            email='brand@example.com',
+            password='TestPass123!',
+            role='BRAND'
+        )
+        self.access = tokens_for_user(self.user)['access']
+    
+    def _authenticate(self, access):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        return self.authentication.authenticate(request)
+    
+    def test_permission_check_without_user_query(self):
+        """Test that role permissions are answered from the token claims."""
+        self._authenticate(self.access)
+        
+        with self.assertNumQueries(0):
+            user, _token = self._authenticate(self.access)
+            request = SimpleNamespace(user=user)
+            self.assertTrue(IsBrand().has_permission(request, None))
+            self.assertFalse(IsInfluencer().has_permission(request, None))
+        
+        self.assertEqual(user.email, 'brand@example.com')
+    
+    def test_role_change_revokes_access_token(self):
+        """Test that changing the role rejects tokens carrying the old role."""
+        self.user.role = 'INFLUENCER'
+        self.user.save()
+        
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(self.access)
+        user, _token = self._authenticate(tokens_for_user(self.user)['access'])
+        self.assertEqual(user.role, 'INFLUENCER')
+    
+    def test_password_change_revokes_access_token(self):
+        """Test that a password change bumps the token version."""
+        self.user.set_password('NewPass456!')
+        self.user.save()
+        
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(self.access)
+    
+    def test_rehash_on_login_keeps_tokens_valid(self):
+        """Test that a transparent password rehash is not treated as a change."""
+        User.objects.filter(pk=self.user.pk).update(
+            password=make_password('TestPass123!', hasher='pbkdf2_sha256')
+        )
+        stored = User.objects.get(pk=self.user.pk)
+        self.assertTrue(stored.check_password('TestPass123!'))
+        
+        stored.refresh_from_db()
+        self.assertTrue(stored.password.startswith('argon2$'))
+        self.assertEqual(stored.token_version, 0)
+        user, _token = self._authenticate(self.access)
+        self.assertEqual(user.pk, self.user.pk)
+    
+    def test_deleted_user_tokens_are_revoked(self):
+        """Test that deleting the user revokes outstanding access tokens."""
+        self.user.delete()
+        
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(self.access)
+    
+    def test_process_local_cache_reads_token_version_from_database(self):
+        """Test that without a shared cache, another worker's version bump is never missed."""
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'this-worker',
+        }}):
+            self._authenticate(self.access)
+            # Another worker changes the password; its version lands in its own cache.
+            User.objects.filter(pk=self.user.pk).update(token_version=self.user.token_version + 1)
+            
+            with self.assertRaises(AuthenticationFailed):
+                self._authenticate(self.access)
+            with self.assertRaises(AuthenticationFailed):
+                request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {self.access}')
+                async_to_sync(self.authentication.aauthenticate)(request)
+    
+    def test_async_authentication(self):
+        """Test that aauthenticate() matches authenticate() and revokes the same tokens."""
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        self._authenticate(self.access)
+        
+        with self.assertNumQueries(0):
+            user, _token = async_to_sync(self.authentication.aauthenticate)(request)
+        self.assertEqual((user.pk, user.role), (self.user.pk, 'BRAND'))
+        
+        self.user.set_password('NewPass456!')
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            async_to_sync(self.authentication.aauthenticate)(request)
+    
+    def test_role_selection_returns_replacement_tokens(self):
+        """Test that the role endpoint issues tokens carrying the new role."""
+        user = User.objects.create_user(email='new@example.com', password='TestPass123!')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        
+        response = client.post(reverse('authentication:role_selection'), {'role': 'INFLUENCER'}, format='json')
+        
+        access = AccessToken(response.data['data']['tokens']['access'])
+        self.assertEqual(access['role'], 'INFLUENCER')
+        self.assertEqual(access['token_version'], 1)
+
+
+class CaseInsensitiveEmailTests(TestCase):
+    """Test that emails are stored and looked up in canonical lower-case form."""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='Mixed.Case@Example.COM', password='TestPass123!')
+    
+    def test_email_is_stored_lower_cased(self):
+        """Test that the stored email is canonical."""
+        self.assertEqual(self.user.email, 'mixed.case@example.com')
+    
+    def test_register_rejects_case_variant(self):
+        """Test that registration treats case variants as the same email."""
+        response = self.client.post(reverse('authentication:register'), {
+            'email': 'MIXED.case@example.com',
+            'password': 'TestPass123!',
+            'password_confirm': 'TestPass123!',
+            'gdpr_consent': True
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_login_is_case_insensitive_and_loads_user_once(self):
+        """Test that login matches any case and does not re-fetch the user."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('authentication:login'), {
+                'email': 'MIXED.CASE@example.com',
+                'password': 'TestPass123!'
+            }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['user']['email'], 'mixed.case@example.com')
+        user_selects = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "authentication_user"' in query['sql']
+        ]
+        self.assertEqual(len(user_selects), 1)
+    
+    def test_normalize_emails_backfills_and_reports_duplicates(self):
+        """Test that legacy mixed-case emails are normalized and colliding accounts reported."""
+        legacy = User.objects.create_user(email='legacy@example.com', password='TestPass123!')
+        first = User.objects.create_user(email='twin@example.com', password='TestPass123!')
+        second = User.objects.create_user(email='other-twin@example.com', password='TestPass123!')
+        # Rows written before emails were normalized.
+        User.objects.filter(pk=legacy.pk).update(email='Legacy@Example.COM')
+        User.objects.filter(pk=first.pk).update(email='Twin@example.com')
+        User.objects.filter(pk=second.pk).update(email=' twin@example.com')
+        
+        out, err = StringIO(), StringIO()
+        with self.assertRaises(CommandError):
+            call_command('normalize_emails', '--dry-run', stdout=out, stderr=err)
+        self.assertIn('1 email(s) would be normalized', out.getvalue())
+        self.assertEqual(User.objects.get(pk=legacy.pk).email, 'Legacy@Example.COM')
+        
+        with self.assertRaises(CommandError):
+            call_command('normalize_emails', '--batch-size', '1', stdout=out, stderr=err)
+        
+        self.assertEqual(User.objects.get_by_email('LEGACY@example.com').pk, legacy.pk)
+        self.assertIn('Duplicate accounts for twin@example.com', err.getvalue())
+        self.assertEqual(User.objects.get(pk=first.pk).email, 'Twin@example.com')
+        self.assertEqual(User.objects.get(pk=second.pk).email, ' twin@example.com')
+    
+    def test_case_variant_rejected_by_database(self):
+        """Test that the functional unique constraint rejects case variants."""
+        other = User.objects.create_user(email='other@example.com', password='TestPass123!')
+        
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.filter(pk=other.pk).update(email='MIXED.CASE@EXAMPLE.COM')
+
+
+class AccountDeletionTests(TestCase):
+    """Test the asynchronous GDPR account deletion."""
+    
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        self.client = APIClient()
+        self.brand = User.objects.create_user(
+            email='brand@example.com',
+            password='TestPass123!',
+            first_name='Brand',
+            role=User.Role.BRAND
+        )
+        self.influencer = User.objects.create_user(
+            email='influencer@example.com',
+            password='TestPass123!',
+            role=User.Role.INFLUENCER
+        )
+        self.campaigns = [
+            Campaign.objects.create(
+                title=f'Campaign {index}',
+                description='Test',
+                content_type=Campaign.ContentType.INSTAGRAM_REEL,
+                deliverables='Test',
+                budget=Decimal('100.00'),
+                deadline=date.today() + timedelta(days=30),
+                status=Campaign.Status.LIVE,
+                brand=self.brand
+            )
+            for index in range(3)
+        ]
+        for campaign in self.campaigns:
+            CampaignApplication.objects.create(campaign=campaign, influencer=self.influencer, pitch='Pitch')
+        self.reference = CampaignFile.objects.create(
+            campaign=self.campaigns[0],
+            file=SimpleUploadedFile('brief.pdf', b'%PDF-1.4 brief')
+        )
+        tokens_for_user(self.brand)
+    
+    def test_delete_anonymizes_immediately_and_returns_job(self):
+        """Test that the request deactivates the account without deleting related rows."""
+        self.client.force_authenticate(user=self.brand)
+        
+        response = self.client.delete(reverse('authentication:delete_user_data'))
+        
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = AccountDeletionJob.objects.get(pk=response.data['data']['job']['id'])
+        self.assertEqual(job.status, AccountDeletionJob.Status.PENDING)
+        self.brand.refresh_from_db()
+        self.assertFalse(self.brand.is_active)
+        self.assertFalse(self.brand.has_usable_password())
+        self.assertNotIn('brand@example.com', self.brand.email)
+        self.assertEqual(self.brand.first_name, '')
+        self.assertEqual(Campaign.objects.filter(brand=self.brand).count(), 3)
+    
+    def test_batches_delete_everything_with_progress(self):
+        """Test that the worker deletes related data in bounded batches, then the user."""
+        job = self.brand.delete_user_data()
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(run_deletion_batch(job, batch_size=2))
+        self.assertEqual(job.status, AccountDeletionJob.Status.RUNNING)
+        self.assertEqual(job.deleted_items, 2)
+        # 3 applications, 1 file, 3 campaigns, 1 outstanding token and the user.
+        self.assertEqual(job.total_items, 9)
+        
+        batches = 1
+        with self.captureOnCommitCallbacks(execute=True):
+            while run_deletion_batch(job, batch_size=2):
+                batches += 1
+        
+        self.assertGreater(batches, 4)
+        self.assertEqual(job.status, AccountDeletionJob.Status.COMPLETED)
+        self.assertEqual(job.deleted_items, job.total_items)
+        self.assertEqual(job.progress, 1.0)
+        self.assertFalse(User.objects.filter(pk=self.brand.pk).exists())
+        self.assertFalse(Campaign.objects.exists())
+        self.assertFalse(CampaignApplication.objects.exists())
+        self.assertFalse(OutstandingToken.objects.filter(user_id=self.brand.pk).exists())
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, self.reference.file.name)))
+        self.assertTrue(User.objects.filter(pk=self.influencer.pk).exists())
+    
+    def test_status_endpoint_reports_progress(self):
+        """Test that the anonymous status endpoint follows the job."""
+        job = self.brand.delete_user_data()
+        url = reverse('authentication:delete_user_data_status', args=[job.pk])
+        
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['status'], 'PENDING')
+        self.assertIsNone(response.data['data']['progress'])
+        
+        call_command('process_gdpr_jobs', '--once', stdout=StringIO())
+        
+        response = self.client.get(url)
+        self.assertEqual(response.data['data']['status'], 'COMPLETED')
+        self.assertEqual(response.data['data']['progress'], 1.0)
+    
+    def test_each_job_is_claimed_by_one_worker(self):
+        """Test that a claimed job is skipped by other workers until its lease runs out."""
+        job = self.brand.delete_user_data()
+        export = DataExportJob.objects.create(user=self.influencer)
+        statuses = [AccountDeletionJob.Status.PENDING, AccountDeletionJob.Status.RUNNING]
+        
+        self.assertIsNotNone(claim_job(AccountDeletionJob, job.pk, statuses))
+        self.assertIsNotNone(claim_job(DataExportJob, export.pk, statuses))
+        self.assertIsNone(claim_job(AccountDeletionJob, job.pk, statuses))
+        self.assertIsNone(claim_job(DataExportJob, export.pk, statuses))
+        
+        # Another worker (or an overlapping cron run) leaves leased jobs alone.
+        call_command('process_gdpr_jobs', '--once', stdout=StringIO())
+        self.assertEqual(AccountDeletionJob.objects.get(pk=job.pk).status, AccountDeletionJob.Status.RUNNING)
+        self.assertEqual(Campaign.objects.filter(brand=self.brand).count(), 3)
+        
+        # The claiming worker died: the job is recovered once the lease expires.
+        AccountDeletionJob.objects.filter(pk=job.pk).update(claimed_until=timezone.now() - timedelta(seconds=1))
+        call_command('process_gdpr_jobs', '--once', stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, AccountDeletionJob.Status.COMPLETED)
+        self.assertIsNone(job.claimed_until)
+
+
+class DataExportTests(TestCase):
+    """Test the background GDPR data export."""
+    
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.export_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.export_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, GDPR_EXPORT_ROOT=self.export_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        self.client = APIClient()
+        self.brand = User.objects.create_user(
+            email='brand@example.com',
+            password='TestPass123!',
+            role=User.Role.BRAND
+        )
+        self.influencer = User.objects.create_user(
+            email='influencer@example.com',
+            password='TestPass123!',
+            role=User.Role.INFLUENCER
+        )
+        campaign = Campaign.objects.create(
+            title='Exported Campaign',
+            description='Test',
+            content_type=Campaign.ContentType.INSTAGRAM_REEL,
+            deliverables='Test',
+            budget=Decimal('100.00'),
+            deadline=date.today() + timedelta(days=30),
+            status=Campaign.Status.LIVE,
+            brand=self.brand
+        )
+        CampaignApplication.objects.create(campaign=campaign, influencer=self.influencer, pitch='Pitch')
+        self.reference = CampaignFile.objects.create(
+            campaign=campaign,
+            file=SimpleUploadedFile('brief.pdf', b'%PDF-1.4 brief')
+        )
+    
+    def _export(self, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.post(reverse('authentication:data_export'))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        call_command('process_gdpr_jobs', '--once', stdout=StringIO())
+        return response.data['data']['id']
+    
+    def test_archive_contains_profile_records_and_media(self):
+        """Test that the finished archive holds profile JSON, NDJSON rows and media."""
+        job_id = self._export(self.brand)
+        
+        response = self.client.get(reverse('authentication:data_export_status', args=[job_id]))
+        self.assertEqual(response.data['data']['status'], 'COMPLETED')
+        
+        response = self.client.get(response.data['data']['download_url'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with tempfile.TemporaryFile() as downloaded:
+            for chunk in response.streaming_content:
+                downloaded.write(chunk)
+            with zipfile.ZipFile(downloaded) as archive:
+                profile = archive.read('profile.json').decode()
+                campaigns = archive.read('campaigns.ndjson').decode().splitlines()
+                applications = archive.read('campaign_applications.ndjson').decode().splitlines()
+                media = archive.read(f'media/{self.reference.file.name}')
+        
+        self.assertIn('brand@example.com', profile)
+        self.assertNotIn('password', profile)
+        self.assertEqual(len(campaigns), 1)
+        self.assertIn('Exported Campaign', campaigns[0])
+        self.assertEqual(len(applications), 1)
+        self.assertEqual(media, b'%PDF-1.4 brief')
+        self.assertFalse(self.export_root.startswith(self.media_root))
+    
+    def test_export_renews_its_lease(self):
+        """Test that writing an archive keeps extending the job's lease."""
+        job = DataExportJob.objects.create(user=self.brand)
+        claim_job(DataExportJob, job.pk, [DataExportJob.Status.PENDING])
+        almost_expired = timezone.now() + timedelta(seconds=1)
+        DataExportJob.objects.filter(pk=job.pk).update(claimed_until=almost_expired)
+        
+        with tempfile.TemporaryFile() as spool:
+            write_export_archive(self.brand, spool, renew_lease=lambda: renew_lease(job))
+        
+        job.refresh_from_db()
+        self.assertGreater(job.claimed_until, almost_expired + timedelta(seconds=60))
+    
+    def test_archive_is_only_served_to_its_owner(self):
+        """Test that other users and anonymous requests cannot download an export."""
+        job_id = self._export(self.brand)
+        url = reverse('authentication:data_export_download', args=[job_id])
+        
+        self.client.force_authenticate(user=self.influencer)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_pending_export_has_no_download(self):
+        """Test that an unfinished export cannot be downloaded yet."""
+        job = DataExportJob.objects.create(user=self.brand)
+        self.client.force_authenticate(user=self.brand)
+        
+        response = self.client.get(reverse('authentication:data_export_status', args=[job.pk]))
+        self.assertIsNone(response.data['data']['download_url'])
+        response = self.client.get(reverse('authentication:data_export_download', args=[job.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,35 @@
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+from .blacklist import blacklist_filter
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    Refresh token used for every token the API issues.
+
+    Tokens carry the user's ``role`` and ``token_version`` (copied into the
+    access tokens derived from them) for stateless authentication, and the
+    blacklist check consults the in-memory Bloom filter first.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['role'] = user.role
+        token['token_version'] = user.token_version
+        return token
+
+    def check_blacklist(self):
+        if not blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            return
+        super().check_blacklist()
+
+
+def tokens_for_user(user):
+    """Return a fresh refresh/access token pair for ``user``."""
+    refresh = RefreshToken.for_user(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
@@ -11,6 +11,10 @@ from .views import (
     PasswordResetConfirmView,
     PasswordChangeView,
     DeleteUserDataView,
+    DeletionStatusView,
+    DataExportView,
+    DataExportStatusView,
+    DataExportDownloadView,
 )
 
 app_name = 'authentication'
@@ -33,4 +37,8 @@ urlpatterns = [
     
     # GDPR compliance
     path('delete/', DeleteUserDataView.as_view(), name='delete_user_data'),
+    path('delete/<uuid:job_id>/', DeletionStatusView.as_view(), name='delete_user_data_status'),
+    path('export/', DataExportView.as_view(), name='data_export'),
+    path('export/<uuid:job_id>/', DataExportStatusView.as_view(), name='data_export_status'),
+    path('export/<uuid:job_id>/download/', DataExportDownloadView.as_view(), name='data_export_download'),
 ]
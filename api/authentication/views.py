@@ -2,7 +2,6 @@ from rest_framework import status, generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.core.mail import send_mail
@@ -10,9 +9,15 @@ from django.template.loader import render_to_string
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.conf import settings
+from django.http import FileResponse, Http404
+from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
+from .models import AccountDeletionJob, DataExportJob
+from .tokens import RefreshToken, tokens_for_user
 from .serializers import (
+    AccountDeletionJobSerializer,
+    DataExportJobSerializer,
     UserRegistrationSerializer,
     UserSerializer,
     RoleSelectionSerializer,
@@ -41,17 +46,12 @@ class RegisterView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
         
-        # Generate JWT tokens for the new user
-        refresh = RefreshToken.for_user(user)
-        
         return Response({
             'status': 'success',
             'data': {
                 'user': UserSerializer(user).data,
-                'tokens': {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }
+                # Generate JWT tokens for the new user
+                'tokens': tokens_for_user(user),
             },
             'errors': []
         }, status=status.HTTP_201_CREATED)
@@ -79,14 +79,11 @@ class LoginView(TokenObtainPairView):
         try:
             serializer.is_valid(raise_exception=True)
             
-            # Get user info
-            email = data.get('username') or data.get('email')
-            user = User.objects.get(email=email)
-            
             return Response({
                 'status': 'success',
                 'data': {
-                    'user': UserSerializer(user).data,
+                    # The serializer already holds the authenticated user
+                    'user': UserSerializer(serializer.user).data,
                     'tokens': serializer.validated_data,
                 },
                 'errors': []
@@ -155,10 +152,12 @@ class RoleSelectionView(APIView):
             user.role = serializer.validated_data['role']
             user.save()
             
+            # The role change revokes the old tokens; hand out a replacement pair.
             return Response({
                 'status': 'success',
                 'data': {
                     'user': UserSerializer(user).data,
+                    'tokens': tokens_for_user(user),
                     'message': _('Role updated successfully.')
                 },
                 'errors': []
@@ -209,7 +208,7 @@ class PasswordResetRequestView(APIView):
             email = serializer.validated_data['email']
             
             try:
-                user = User.objects.get(email=email)
+                user = User.objects.get_by_email(email)
                 
                 # Generate password reset token
                 token = default_token_generator.make_token(user)
@@ -325,9 +324,11 @@ class PasswordChangeView(APIView):
             user.set_password(serializer.validated_data['new_password'])
             user.save()
             
+            # The password change revokes the old tokens; hand out a replacement pair.
             return Response({
                 'status': 'success',
                 'data': {
+                    'tokens': tokens_for_user(user),
                     'message': _('Password changed successfully.')
                 },
                 'errors': []
@@ -344,7 +345,10 @@ class DeleteUserDataView(APIView):
     """
     API endpoint for GDPR-compliant user data deletion.
     
-    Allows authenticated users to delete their account and data.
+    Allows authenticated users to delete their account and data. The account
+    is anonymized and deactivated immediately; the related data is deleted
+    in the background (see ``authentication.gdpr``), and progress can be
+    followed at the returned status URL.
     """
     
     permission_classes = [permissions.IsAuthenticated]
@@ -354,12 +358,94 @@ class DeleteUserDataView(APIView):
         email = user.email
         
         # Call the GDPR-compliant deletion method
-        user.delete_user_data()
+        job = user.delete_user_data()
         
         return Response({
             'status': 'success',
             'data': {
-                'message': _(f'Account {email} and associated data have been deleted.')
+                'message': _(f'Account {email} has been deactivated and its data is being deleted.'),
+                'job': AccountDeletionJobSerializer(job).data,
+                'status_url': reverse('authentication:delete_user_data_status', args=[job.pk]),
             },
             'errors': []
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class DeletionStatusView(generics.RetrieveAPIView):
+    """
+    API endpoint for the progress of a GDPR account deletion.
+    
+    Open to anonymous requests, since the account can no longer sign in;
+    the random job id is the only handle to it.
+    """
+    
+    queryset = AccountDeletionJob.objects.all()
+    serializer_class = AccountDeletionJobSerializer
+    permission_classes = [permissions.AllowAny]
+    lookup_url_kwarg = 'job_id'
+    
+    def retrieve(self, request, *args, **kwargs):
+        job = self.get_object()
+        return Response({
+            'status': 'success',
+            'data': self.get_serializer(job).data,
+            'errors': []
+        }, status=status.HTTP_200_OK)
+
+
+class DataExportView(APIView):
+    """
+    API endpoint for GDPR data portability.
+    
+    POST queues a "download my data" export; the archive is built in the
+    background by ``process_gdpr_jobs``.
+    """
+    
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        job = DataExportJob.objects.create(user_id=request.user.pk)
+        
+        return Response({
+            'status': 'success',
+            'data': DataExportJobSerializer(job).data,
+            'errors': []
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class DataExportStatusView(generics.RetrieveAPIView):
+    """API endpoint for the status of one of the user's data exports."""
+    
+    serializer_class = DataExportJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_url_kwarg = 'job_id'
+    
+    def get_queryset(self):
+        return DataExportJob.objects.filter(user_id=self.request.user.pk)
+    
+    def retrieve(self, request, *args, **kwargs):
+        job = self.get_object()
+        return Response({
+            'status': 'success',
+            'data': self.get_serializer(job).data,
+            'errors': []
         }, status=status.HTTP_200_OK)
+
+
+class DataExportDownloadView(DataExportStatusView):
+    """
+    API endpoint serving a finished export archive to its owner.
+    
+    The archive is streamed from private storage in chunks.
+    """
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(status=DataExportJob.Status.COMPLETED)
+    
+    def retrieve(self, request, *args, **kwargs):
+        job = self.get_object()
+        try:
+            archive = job.archive.open('rb')
+        except (ValueError, OSError):
+            raise Http404
+        return FileResponse(archive, as_attachment=True, filename='collabmarket-data-export.zip')
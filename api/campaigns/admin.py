@@ -14,6 +14,7 @@ class CampaignAdmin(admin.ModelAdmin):
     """Admin interface for Campaign model."""
     
     list_display = ['title', 'brand', 'status', 'content_type', 'budget', 'deadline', 'created_at']
+    list_select_related = ['brand']
     list_filter = ['status', 'content_type', 'created_at']
     search_fields = ['title', 'description', 'brand__email']
     readonly_fields = ['created_at', 'updated_at']
@@ -38,6 +39,7 @@ class CampaignFileAdmin(admin.ModelAdmin):
     """Admin interface for CampaignFile model."""
     
     list_display = ['campaign', 'file', 'uploaded_at']
+    list_select_related = ['campaign']
     list_filter = ['uploaded_at']
     search_fields = ['campaign__title']
     readonly_fields = ['uploaded_at']
@@ -0,0 +1,60 @@
+"""
+Shared cache of the influencer campaign listing.
+
+Every influencer sees the same live campaigns for the same filters, so the
+serialized listing is cached per filter combination in the two-tier cache
+(``api.cache``) for ``LIVE_CAMPAIGNS_CACHE_TIMEOUT`` seconds. Any change to
+a campaign, or to a brand whose email the listing shows, retires the whole
+namespace.
+
+Listings are built from the primary database, even during requests that
+read from replicas (api/routers.py): a listing built from a lagging replica
+would be served to every influencer for the whole cache timeout.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+
+from api.cache import two_tier_cache
+from api.routers import use_primary
+
+NAMESPACE = 'campaigns:live'
+
+FILTER_PARAMS = ('budget_min', 'budget_max', 'category', 'content_type', 'deadline_before')
+
+
+def listing_key(query_params):
+    """Return the cache key of the listing for the filters in ``query_params``."""
+    filters = {name: query_params.get(name) for name in FILTER_PARAMS if query_params.get(name)}
+    digest = hashlib.sha256(json.dumps(filters, sort_keys=True).encode()).hexdigest()[:32]
+    return f'listing:{digest}'
+
+
+def get_listing(query_params, compute):
+    """Return the cached listing for ``query_params``, building it with ``compute()``."""
+    def compute_from_primary():
+        with use_primary():
+            return compute()
+    
+    return two_tier_cache.get_or_set(
+        listing_key(query_params), compute_from_primary,
+        settings.LIVE_CAMPAIGNS_CACHE_TIMEOUT, namespace=NAMESPACE,
+    )
+
+
+async def aget_listing(query_params, acompute):
+    """``get_listing()`` for async views, with ``acompute`` a coroutine function."""
+    async def compute_from_primary():
+        with use_primary():
+            return await acompute()
+    
+    return await two_tier_cache.aget_or_set(
+        listing_key(query_params), compute_from_primary,
+        settings.LIVE_CAMPAIGNS_CACHE_TIMEOUT, namespace=NAMESPACE,
+    )
+
+
+def invalidate():
+    """Make every process rebuild the live listings on the next request."""
+    two_tier_cache.invalidate(NAMESPACE)
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from campaigns.media import iter_orphaned_files, remove_empty_directories
+
+
+class Command(BaseCommand):
+    """
+    Delete campaign media files that no CampaignFile row references.
+
+    Intended to run periodically (e.g. nightly from cron). Storage and the
+    CampaignFile table are compared in streaming batches, so the command is
+    safe to run against millions of files.
+    """
+
+    help = 'Delete unreferenced campaign media files older than a grace period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List orphaned files without deleting them.',
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=int,
+            default=24,
+            help='Only delete files last modified more than this many hours ago (default: 24).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of storage paths checked against the database per query (default: 1000).',
+        )
+
+    def handle(self, *args, **options):
+        if options['grace_hours'] < 0:
+            raise CommandError('--grace-hours must not be negative.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        dry_run = options['dry_run']
+        verbosity = options['verbosity']
+        older_than = timezone.now() - timedelta(hours=options['grace_hours'])
+
+        orphaned = 0
+        reclaimed_bytes = 0
+        for stored in iter_orphaned_files(default_storage, older_than, batch_size=options['batch_size']):
+            orphaned += 1
+            try:
+                reclaimed_bytes += default_storage.size(stored.name)
+            except OSError:
+                pass
+
+            if verbosity >= 2 or dry_run:
+                self.stdout.write(stored.name)
+            if not dry_run:
+                default_storage.delete(stored.name)
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(
+                f'Dry run: {orphaned} orphaned file(s), {reclaimed_bytes} bytes would be reclaimed.'
+            ))
+            return
+
+        removed_directories = remove_empty_directories(default_storage)
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {orphaned} orphaned file(s), reclaimed {reclaimed_bytes} bytes, '
+            f'removed {removed_directories} empty director(ies).'
+        ))
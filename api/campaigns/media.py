@@ -0,0 +1,126 @@
+"""
+Helpers for finding campaign media files that no longer belong to a campaign.
+
+Deleting a Campaign cascades away its CampaignFile rows but leaves the files
+in storage. These helpers walk the storage tree lazily and compare it against
+the CampaignFile table one batch at a time, so memory use stays bounded by the
+batch size rather than by the number of files on disk.
+"""
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.files.storage import FileSystemStorage
+
+from .models import CampaignFile
+
+CAMPAIGN_MEDIA_PREFIX = 'campaigns'
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    """A file found in storage, identified by its storage-relative name."""
+
+    name: str
+    modified_at: datetime
+
+
+def iter_stored_files(storage, prefix=CAMPAIGN_MEDIA_PREFIX):
+    """
+    Yield every file below ``prefix`` in ``storage`` without building a full listing.
+
+    Local storage is walked with ``os.scandir`` so each directory is streamed
+    entry by entry; other backends fall back to ``storage.listdir``, which holds
+    one directory listing at a time.
+    """
+    if isinstance(storage, FileSystemStorage):
+        yield from _iter_local_files(storage, prefix)
+    else:
+        yield from _iter_remote_files(storage, prefix)
+
+
+def _iter_local_files(storage, prefix):
+    root = storage.path(prefix)
+    if not os.path.isdir(root):
+        return
+
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    relative = os.path.relpath(entry.path, storage.location)
+                    yield StoredFile(
+                        name=relative.replace(os.sep, '/'),
+                        modified_at=datetime.fromtimestamp(
+                            entry.stat(follow_symlinks=False).st_mtime,
+                            tz=dt_timezone.utc,
+                        ),
+                    )
+
+
+def _iter_remote_files(storage, prefix):
+    pending = [prefix]
+    while pending:
+        directory = pending.pop()
+        directories, files = storage.listdir(directory)
+        pending.extend(f'{directory}/{name}' for name in directories)
+        for name in files:
+            path = f'{directory}/{name}'
+            yield StoredFile(name=path, modified_at=storage.get_modified_time(path))
+
+
+def iter_batches(iterable, batch_size):
+    """Group ``iterable`` into lists of at most ``batch_size`` items."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_orphaned_files(storage, older_than, batch_size=1000, prefix=CAMPAIGN_MEDIA_PREFIX):
+    """
+    Yield stored files that no CampaignFile references and that predate ``older_than``.
+
+    The grace period protects uploads that are written to storage before their
+    CampaignFile row is committed. Each batch costs one indexed ``IN`` query.
+    """
+    for batch in iter_batches(iter_stored_files(storage, prefix), batch_size):
+        candidates = [stored for stored in batch if stored.modified_at < older_than]
+        if not candidates:
+            continue
+
+        referenced = set(
+            CampaignFile.objects.filter(
+                file__in=[stored.name for stored in candidates]
+            ).values_list('file', flat=True)
+        )
+        for stored in candidates:
+            if stored.name not in referenced:
+                yield stored
+
+
+def remove_empty_directories(storage, prefix=CAMPAIGN_MEDIA_PREFIX):
+    """Remove empty directories below ``prefix`` left behind by deleted files (local storage only)."""
+    if not isinstance(storage, FileSystemStorage):
+        return 0
+
+    root = storage.path(prefix)
+    removed = 0
+    for directory, _subdirectories, _files in os.walk(root, topdown=False):
+        if directory == root:
+            continue
+        try:
+            os.rmdir(directory)
+            removed += 1
+        except OSError:
+            # Not empty (or already gone) - leave it alone.
+            pass
+    return removed
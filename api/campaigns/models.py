@@ -113,9 +113,22 @@ class Campaign(models.Model):
             models.Index(fields=['brand', '-created_at']),
         ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded status to detect transitions on save."""
+        instance = super().from_db(db, field_names, values)
+        if 'status' in field_names:
+            instance._loaded_status = values[field_names.index('status')]
+        return instance
+    
     def __str__(self):
         return f"{self.title} - {self.get_status_display()}"
     
+    @property
+    def status_changed(self):
+        """True if the status differs from the one loaded (always, for new campaigns)."""
+        return self.status != getattr(self, '_loaded_status', None)
+    
     def clean(self):
         """Validate that deadline is in the future."""
         super().clean()
@@ -126,6 +139,8 @@ class Campaign(models.Model):
         """Override save to run clean validation."""
         self.full_clean()
         super().save(*args, **kwargs)
+        # post_save receivers have seen the transition by now.
+        self._loaded_status = self.status
 
 
 class CampaignFile(models.Model):
@@ -154,6 +169,10 @@ class CampaignFile(models.Model):
         verbose_name = _('campaign file')
         verbose_name_plural = _('campaign files')
         ordering = ['-uploaded_at']
+        indexes = [
+            # Lets the media garbage collector check storage paths in batches.
+            models.Index(fields=['file']),
+        ]
     
     def __str__(self):
         return f"File for {self.campaign.title}"
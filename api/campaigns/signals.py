@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache, stream
+from .models import Campaign
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Campaign)
+@receiver(post_delete, sender=Campaign)
+def invalidate_live_campaigns(sender, instance, **kwargs):
+    """Retire the cached live listings, now and again once the change commits."""
+    cache.invalidate()
+    # A worker may rebuild between the first bump and the commit, caching the old rows.
+    transaction.on_commit(cache.invalidate)
+
+
+@receiver(post_save, sender=User)
+def invalidate_brand_campaigns(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """
+    The listing shows each campaign's brand email.
+
+    Other saves of a brand (a login's ``last_login``, a token-version bump)
+    leave the listing alone, so they do not flush it for every influencer.
+    """
+    if raw or created or instance.role != 'BRAND':
+        return
+    if update_fields is not None and 'email' not in update_fields:
+        return
+    if instance.email_changed:
+        invalidate_live_campaigns(sender, instance)
+
+
+@receiver(post_save, sender=Campaign)
+def publish_campaign_transition(sender, instance, raw=False, **kwargs):
+    """Stream campaigns that went live or closed, once the change commits."""
+    if raw or not instance.status_changed or instance.status not in stream.EVENT_TYPES:
+        return
+    event = stream.campaign_event(instance)
+    transaction.on_commit(lambda: stream.publish(*event))
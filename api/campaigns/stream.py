@@ -0,0 +1,409 @@
+"""
+Server-Sent Events stream of campaigns going live or closing.
+
+Instead of polling ``/api/v1/campaigns/``, clients open
+``/api/v1/campaigns/stream/`` (optionally with ``?category=`` and
+``?content_type=``, each a comma-separated list) and receive one compact
+event per transition::
+
+    id: 3f2a9c...-42
+    event: campaign.live
+    data: {"id":7,"title":"Summer reels","status":"LIVE",...}
+
+A campaign saved into LIVE or CLOSED is published, after its transaction
+commits, to the pub/sub log configured by ``CAMPAIGN_STREAM``:
+
+* ``CachePubSub`` keeps the log in the shared cache, so every node sees
+  every event (the default; it needs a shared backend across nodes, as the
+  other invalidations do);
+* ``MemoryPubSub`` keeps it in the process, for single-process deployments.
+
+Each process runs one ``Broadcaster`` per event loop. It polls the log head
+(one small cache read every ``CAMPAIGN_STREAM_POLL_SECONDS``, or at once
+when this process publishes) and fans new events out to its connections.
+An event id is ``<log epoch>-<sequence>``. A client reconnecting with
+``Last-Event-ID`` gets the retained events after that id. If the log
+no longer reaches back that far, or was reset (a cache flush starts a new
+epoch), the client gets a ``reset`` event first and should reload the
+listing.
+
+Long-lived connections need the ASGI app (``ASYNC_READ_VIEWS``). Under WSGI
+the endpoint answers with the backlog and a ``retry`` hint, so EventSource
+clients reconnect and poll incrementally.
+"""
+import asyncio
+import json
+import threading
+import time
+import uuid
+import weakref
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.renderers import BaseRenderer
+
+from .models import Campaign
+
+LIVE = 'campaign.live'
+CLOSED = 'campaign.closed'
+RESET = 'reset'
+
+EVENT_TYPES = {Campaign.Status.LIVE: LIVE, Campaign.Status.CLOSED: CLOSED}
+
+# Stop proxies from buffering or caching the stream.
+HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+# Fields each filter may match, with their valid values.
+FILTERS = {
+    'category': set(Campaign.Category.values),
+    'content_type': set(Campaign.ContentType.values),
+}
+
+
+def campaign_event(campaign):
+    """Return ``(event_type, data)`` for a campaign that went live or closed."""
+    return EVENT_TYPES[campaign.status], {
+        'id': campaign.pk,
+        'title': campaign.title,
+        'status': campaign.status,
+        'category': campaign.category,
+        'content_type': campaign.content_type,
+        'budget': str(campaign.budget),
+        'deadline': campaign.deadline.isoformat(),
+    }
+
+
+def format_cursor(cursor):
+    return f'{cursor[0]}-{cursor[1]}'
+
+
+def parse_cursor(value):
+    """Parse a ``Last-Event-ID`` header; None if it is missing or malformed."""
+    epoch, _, seq = (value or '').rpartition('-')
+    if not epoch or not seq.isdigit():
+        return None
+    return epoch, int(seq)
+
+
+class PubSub:
+    """
+    An ordered, bounded log of stream events.
+
+    Backends implement ``publish``, ``head`` (the cursor of the newest event,
+    or sequence 0 of an empty log) and ``since``, which returns the retained events after a cursor (all of
+    them for None) and whether they continue it without a gap.
+    """
+
+    def publish(self, event_type, data):
+        raise NotImplementedError
+
+    def head(self):
+        raise NotImplementedError
+
+    def since(self, cursor):
+        raise NotImplementedError
+
+    @staticmethod
+    def _after(epoch, events, cursor):
+        if cursor is None:
+            return list(events), True
+        if cursor[0] != epoch:
+            return list(events), False
+        newer = [event for event in events if event[0][1] > cursor[1]]
+        complete = not events or events[0][0][1] <= cursor[1] + 1
+        return newer, complete
+
+
+class MemoryPubSub(PubSub):
+    """A log in this process's memory; other processes never see its events."""
+
+    def __init__(self, backlog=500):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.events = deque(maxlen=backlog)
+        self.seq = 0
+        self.lock = threading.Lock()
+
+    def publish(self, event_type, data):
+        with self.lock:
+            self.seq += 1
+            cursor = (self.epoch, self.seq)
+            self.events.append((cursor, event_type, data))
+        return cursor
+
+    def head(self):
+        return self.epoch, self.seq
+
+    def since(self, cursor):
+        with self.lock:
+            return self._after(self.epoch, list(self.events), cursor)
+
+
+class CachePubSub(PubSub):
+    """
+    A log in the shared cache, visible to every node.
+
+    Publishers serialise on a ``cache.add`` lock (transitions are rare) and
+    write the log before moving the head, so a reader that sees a head also
+    finds its event.
+    """
+
+    # Seconds a publisher waits for the lock before appending regardless.
+    lock_timeout = 2
+
+    def __init__(self, alias='default', backlog=500, timeout=24 * 60 * 60, prefix='campaigns:stream'):
+        self.alias = alias
+        self.backlog = backlog
+        self.timeout = timeout
+        self.head_key = f'{prefix}:head'
+        self.log_key = f'{prefix}:log'
+        self.lock_key = f'{prefix}:lock'
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def publish(self, event_type, data):
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+        while not self.cache.add(self.lock_key, token, timeout=self.lock_timeout):
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(0.01)
+        try:
+            log = self._log()
+            seq = log['events'][-1][0][1] + 1 if log['events'] else 1
+            cursor = (log['epoch'], seq)
+            log['events'] = [*log['events'][1 - self.backlog:], (cursor, event_type, data)]
+            self.cache.set(self.log_key, log, timeout=self.timeout)
+            self.cache.set(self.head_key, cursor, timeout=self.timeout)
+        finally:
+            if self.cache.get(self.lock_key) == token:
+                self.cache.delete(self.lock_key)
+        return cursor
+
+    def _log(self):
+        log = self.cache.get(self.log_key)
+        if log is None:
+            # A new (or evicted) log starts a new epoch, so old ids cannot match it.
+            self.cache.add(self.log_key, {'epoch': uuid.uuid4().hex[:12], 'events': []}, timeout=self.timeout)
+            log = self.cache.get(self.log_key)
+        return log
+
+    def head(self):
+        head = self.cache.get(self.head_key)
+        if head is None:
+            log = self._log()
+            head = log['events'][-1][0] if log['events'] else (log['epoch'], 0)
+            self.cache.add(self.head_key, head, timeout=self.timeout)
+        return head
+
+    def since(self, cursor):
+        log = self._log()
+        return self._after(log['epoch'], log['events'], cursor)
+
+
+_pubsub = None
+
+
+def get_pubsub():
+    """Return this process's pub/sub backend, configured by ``CAMPAIGN_STREAM``."""
+    global _pubsub
+    if _pubsub is None:
+        config = settings.CAMPAIGN_STREAM
+        _pubsub = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return _pubsub
+
+
+def publish(event_type, data):
+    """Publish an event and wake this process's broadcasters."""
+    cursor = get_pubsub().publish(event_type, data)
+    for broadcaster in list(_broadcasters.values()):
+        broadcaster.notify()
+    return cursor
+
+
+class Subscription:
+    """One connection's queue of ``(cursor, event_type, data)``, with its filters."""
+
+    def __init__(self, filters, size):
+        self.filters = filters
+        self.queue = asyncio.Queue(maxsize=size)
+        # Set when the queue overflowed; the client must reconnect and resume.
+        self.dropped = False
+
+    def offer(self, event):
+        if self.dropped:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class Broadcaster:
+    """Poll the pub/sub log and fan its events out to this event loop's subscriptions."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.subscriptions = set()
+        self.wakeup = asyncio.Event()
+        self.cursor = None
+        self.task = None
+
+    def subscribe(self, filters):
+        subscription = Subscription(filters, settings.CAMPAIGN_STREAM_QUEUE_SIZE)
+        self.subscriptions.add(subscription)
+        if self.task is None or self.task.done():
+            self.cursor = get_pubsub().head()
+            self.task = self.loop.create_task(self.run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+
+    def notify(self):
+        """Poll now; callable from any thread."""
+        if self.task is not None and not self.task.done():
+            try:
+                self.loop.call_soon_threadsafe(self.wakeup.set)
+            except RuntimeError:
+                # The loop was closed; its broadcaster is about to be collected.
+                pass
+
+    def poll(self):
+        pubsub = get_pubsub()
+        head = pubsub.head()
+        if head == self.cursor:
+            return
+        events, complete = pubsub.since(self.cursor)
+        if not complete:
+            events = [(head, RESET, {}), *events]
+        for event in events:
+            for subscription in list(self.subscriptions):
+                if event[1] == RESET or matches(subscription.filters, event[2]):
+                    subscription.offer(event)
+        self.cursor = head
+
+    async def run(self):
+        while self.subscriptions:
+            self.wakeup.clear()
+            self.poll()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), settings.CAMPAIGN_STREAM_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+# One broadcaster per event loop of this process.
+_broadcasters = weakref.WeakKeyDictionary()
+
+
+def get_broadcaster():
+    loop = asyncio.get_running_loop()
+    broadcaster = _broadcasters.get(loop)
+    if broadcaster is None:
+        broadcaster = _broadcasters[loop] = Broadcaster(loop)
+    return broadcaster
+
+
+def format_event(cursor, event_type, data):
+    """Encode one event in the ``text/event-stream`` format."""
+    payload = json.dumps(data, separators=(',', ':'))
+    return f'id: {format_cursor(cursor)}\nevent: {event_type}\ndata: {payload}\n\n'
+
+
+def matches(filters, data):
+    return all(data.get(name) in values for name, values in filters.items())
+
+
+def backlog(last_event_id, filters):
+    """
+    Return ``(events, through)`` for a client resuming at ``last_event_id``.
+
+    ``events`` are the retained events it missed, led by a ``reset`` event if
+    some are gone; ``through`` is the log head they reach. Clients that are
+    not resuming get no events.
+    """
+    pubsub = get_pubsub()
+    through = pubsub.head()
+    if last_event_id is None:
+        return [], through
+    cursor = parse_cursor(last_event_id)
+    if cursor is None:
+        return [(through, RESET, {})], through
+    events, complete = pubsub.since(cursor)
+    events = [
+        event for event in events
+        if (event[0][0] != through[0] or event[0][1] <= through[1]) and matches(filters, event[2])
+    ]
+    if not complete:
+        events.insert(0, (through, RESET, {}))
+    return events, through
+
+
+def format_backlog(events, through):
+    """Encode the backlog, ending with ``through`` as the client's resume point."""
+    # An id without data is not dispatched, but it moves the client's Last-Event-ID.
+    return ''.join(format_event(*event) for event in events) + f'id: {format_cursor(through)}\n\n'
+
+
+async def event_stream(last_event_id, filters):
+    """Yield the backlog since ``last_event_id``, then live events and heartbeats."""
+    broadcaster = get_broadcaster()
+    # Subscribe first, so nothing published while the backlog is read is lost.
+    subscription = broadcaster.subscribe(filters)
+    try:
+        events, through = backlog(last_event_id, filters)
+        yield f'retry: {settings.CAMPAIGN_STREAM_RETRY_MS}\n\n' + format_backlog(events, through)
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), settings.CAMPAIGN_STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            if event is None:
+                # Fell too far behind; the client resumes from its last id.
+                return
+            cursor = event[0]
+            if cursor[0] == through[0] and cursor[1] <= through[1]:
+                # Already sent with the backlog.
+                continue
+            yield format_event(*event)
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+def parse_filters(query_params):
+    """Return ``(filters, errors)`` for the ``category`` and ``content_type`` parameters."""
+    filters, errors = {}, {}
+    for name, valid in FILTERS.items():
+        raw = query_params.get(name)
+        if not raw:
+            continue
+        values = {value.strip() for value in raw.split(',') if value.strip()}
+        invalid = sorted(values - valid)
+        if invalid:
+            errors[name] = [f'"{value}" is not a valid choice.' for value in invalid]
+        else:
+            filters[name] = values
+    return filters, errors
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets clients ask for ``text/event-stream``; errors become an ``error`` event."""
+
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return f'event: error\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'.encode()
@@ -1,14 +1,39 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import include, path, reverse
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.core.files.uploadedfile import SimpleUploadedFile
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase, force_authenticate
 from rest_framework import status
 from datetime import date, timedelta
 from decimal import Decimal
-from .models import Campaign, CampaignFile
+import msgpack
+from api.cache import two_tier_cache
+from authentication.authentication import CachedJWTAuthentication
+from authentication.tokens import tokens_for_user
+from api.query_budget import QueryBudgetTestMixin, query_budget
+
+from . import stream
+from .models import Application, Campaign, CampaignFile
+from .urls import async_urlpatterns, router
+from .views import CampaignViewSet
 
 User = get_user_model()
 
+# URLconf of AsyncReadViewTest: the async routes in front of the router's.
+urlpatterns = [path('api/v1/', include(async_urlpatterns + router.urls))]
+
 
 class CampaignModelTest(TestCase):
     """Test Campaign model."""
@@ -88,6 +113,37 @@ class CampaignAPITest(APITestCase):
         self.assertEqual(response.data['data']['title'], self.campaign_data['title'])
         self.assertEqual(Campaign.objects.count(), 1)
     
+    def test_msgpack_create_and_list(self):
+        """Test that MessagePack clients get the same envelope and values as JSON ones."""
+        self.client.force_authenticate(user=self.brand_user)
+        response = self.client.post(
+            '/api/v1/campaigns/', msgpack.packb(self.campaign_data),
+            content_type='application/msgpack', HTTP_ACCEPT='application/msgpack',
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        created = msgpack.unpackb(response.content)
+        self.assertEqual(created['status'], 'success')
+        self.assertEqual(created['data']['budget'], '250.00')
+        self.assertEqual(created['data']['deadline'], self.campaign_data['deadline'])
+        
+        listing = self.client.get('/api/v1/campaigns/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(msgpack.unpackb(listing.content), self.client.get('/api/v1/campaigns/').json())
+    
+    def test_msgpack_error_envelope(self):
+        """Test that validation errors keep the envelope in MessagePack."""
+        self.client.force_authenticate(user=self.brand_user)
+        response = self.client.post(
+            '/api/v1/campaigns/', msgpack.packb({**self.campaign_data, 'budget': '0.00'}),
+            content_type='application/msgpack', HTTP_ACCEPT='application/msgpack',
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        body = msgpack.unpackb(response.content)
+        self.assertEqual(body['status'], 'error')
+        self.assertIn('budget', body['errors'])
+    
     def test_influencer_cannot_create_campaign(self):
         """Test that an influencer cannot create a campaign."""
         self.client.force_authenticate(user=self.influencer_user)
@@ -272,3 +328,548 @@ class CampaignAPITest(APITestCase):
         
         response = self.client.post('/api/v1/campaigns/', self.campaign_data)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class CampaignMediaGarbageCollectionTest(TestCase):
+    """Test the gc_campaign_media management command."""
+    
+    def setUp(self):
+        """Set up a temporary media root with referenced and orphaned files."""
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        brand_user = User.objects.create_user(
+            email='brand@test.com',
+            password='testpass123',
+            role='BRAND'
+        )
+        self.campaign = Campaign.objects.create(
+            title='Campaign With Files',
+            description='Test',
+            content_type=Campaign.ContentType.INSTAGRAM_REEL,
+            deliverables='Test',
+            budget=Decimal('100.00'),
+            deadline=date.today() + timedelta(days=30),
+            status=Campaign.Status.LIVE,
+            brand=brand_user
+        )
+        self.kept = CampaignFile.objects.create(
+            campaign=self.campaign,
+            file=SimpleUploadedFile('brief.pdf', b'%PDF-1.4 referenced')
+        )
+        self.orphan_path = self._write_file('campaigns/999/reference/old.pdf', age_hours=48)
+        self.fresh_orphan_path = self._write_file('campaigns/998/reference/new.pdf', age_hours=0)
+        self._age(self.kept.file.path, hours=48)
+    
+    def _write_file(self, name, age_hours):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as handle:
+            handle.write(b'orphaned')
+        self._age(path, hours=age_hours)
+        return path
+    
+    def _age(self, path, hours):
+        timestamp = time.time() - hours * 3600
+        os.utime(path, (timestamp, timestamp))
+    
+    def test_dry_run_keeps_files(self):
+        """Test that a dry run reports orphans without deleting anything."""
+        out = StringIO()
+        call_command('gc_campaign_media', '--dry-run', '--batch-size', '1', stdout=out)
+        
+        self.assertIn('campaigns/999/reference/old.pdf', out.getvalue())
+        self.assertNotIn('new.pdf', out.getvalue())
+        self.assertTrue(os.path.exists(self.orphan_path))
+    
+    def test_deletes_only_old_unreferenced_files(self):
+        """Test that only orphans older than the grace period are deleted."""
+        call_command('gc_campaign_media', '--batch-size', '1', stdout=StringIO())
+        
+        self.assertFalse(os.path.exists(self.orphan_path))
+        self.assertFalse(os.path.isdir(os.path.join(self.media_root, 'campaigns', '999')))
+        self.assertTrue(os.path.exists(self.fresh_orphan_path))
+        self.assertTrue(os.path.exists(self.kept.file.path))
+
+
+class CampaignQueryBudgetTest(QueryBudgetTestMixin, APITestCase):
+    """Pin the query count of every campaigns endpoint at 1 and 100 rows."""
+    
+    def setUp(self):
+        """Set up a brand, an influencer and a temporary media root."""
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        self.brand = User.objects.create_user(email='brand@test.com', password='testpass123', role='BRAND')
+        self.influencer = User.objects.create_user(
+            email='influencer@test.com',
+            password='testpass123',
+            role='INFLUENCER'
+        )
+    
+    def _campaign(self, index):
+        return Campaign(
+            title=f'Campaign {index}',
+            description='Test',
+            content_type=Campaign.ContentType.INSTAGRAM_REEL,
+            deliverables='Test',
+            budget=Decimal('100.00'),
+            deadline=date.today() + timedelta(days=30),
+            status=Campaign.Status.LIVE,
+            brand=self.brand
+        )
+    
+    def _make_campaigns(self, count):
+        """Top up to ``count`` campaigns, each with a reference file and an application."""
+        existing = Campaign.objects.count()
+        campaigns = Campaign.objects.bulk_create(self._campaign(index) for index in range(existing, count))
+        CampaignFile.objects.bulk_create(
+            CampaignFile(campaign=campaign, file=f'campaigns/{campaign.pk}/reference/brief.pdf')
+            for campaign in campaigns
+        )
+        Application.objects.bulk_create(
+            Application(campaign=campaign, influencer=self.influencer, pitch='Pitch')
+            for campaign in campaigns
+        )
+        return Campaign.objects.order_by('pk').first()
+    
+    def _make_applications(self, count):
+        self._make_campaigns(count)
+        return Application.objects.order_by('pk').first()
+    
+    def _fresh_campaign(self, count):
+        self._make_campaigns(count)
+        campaign = self._campaign('fresh')
+        campaign.save()
+        return campaign
+    
+    def test_campaign_list_budget(self):
+        """Test the campaign list as brand and as influencer."""
+        for user in (self.brand, self.influencer):
+            self.client.force_authenticate(user=user)
+            self.assertQueryBudget(
+                1, lambda target: self.client.get('/api/v1/campaigns/'),
+                self._make_campaigns, label=f'{user.role} campaign list'
+            )
+    
+    def test_campaign_retrieve_budget(self):
+        """Test retrieving a campaign with its reference files."""
+        self.client.force_authenticate(user=self.influencer)
+        self.assertQueryBudget(
+            2, lambda campaign: self.client.get(f'/api/v1/campaigns/{campaign.pk}/'),
+            self._make_campaigns
+        )
+    
+    def test_campaign_create_budget(self):
+        """Test creating a campaign."""
+        self.client.force_authenticate(user=self.brand)
+        self.assertQueryBudget(
+            3, lambda target: self.client.post('/api/v1/campaigns/', {
+                'title': 'New Campaign',
+                'description': 'Test',
+                'content_type': 'INSTAGRAM_REEL',
+                'deliverables': 'Test',
+                'budget': '100.00',
+                'deadline': str(date.today() + timedelta(days=30)),
+            }, format='json'),
+            self._make_campaigns
+        )
+    
+    def test_campaign_update_budget(self):
+        """Test full and partial updates of a campaign."""
+        self.client.force_authenticate(user=self.brand)
+        self.assertQueryBudget(
+            4, lambda campaign: self.client.patch(
+                f'/api/v1/campaigns/{campaign.pk}/', {'title': 'Renamed'}, format='json'
+            ),
+            self._make_campaigns, label='partial update'
+        )
+        self.assertQueryBudget(
+            4, lambda campaign: self.client.put(f'/api/v1/campaigns/{campaign.pk}/', {
+                'title': 'Replaced',
+                'description': 'Test',
+                'content_type': 'INSTAGRAM_REEL',
+                'deliverables': 'Test',
+                'budget': '150.00',
+                'deadline': str(date.today() + timedelta(days=40)),
+                'status': 'LIVE',
+            }, format='json'),
+            self._make_campaigns, label='update'
+        )
+    
+    def test_campaign_destroy_budget(self):
+        """Test deleting a campaign."""
+        self.client.force_authenticate(user=self.brand)
+        self.assertQueryBudget(
+            4, lambda campaign: self.client.delete(f'/api/v1/campaigns/{campaign.pk}/'),
+            self._fresh_campaign
+        )
+    
+    def test_campaign_upload_file_budget(self):
+        """Test uploading a reference file to a campaign."""
+        self.client.force_authenticate(user=self.brand)
+        self.assertQueryBudget(
+            3, lambda campaign: self.client.post(
+                f'/api/v1/campaigns/{campaign.pk}/upload_file/',
+                {'file': SimpleUploadedFile('brief.pdf', b'%PDF-1.4 brief')},
+                format='multipart'
+            ),
+            self._make_campaigns
+        )
+    
+    def test_application_list_budget(self):
+        """Test the application list as brand and as influencer."""
+        for user in (self.brand, self.influencer):
+            self.client.force_authenticate(user=user)
+            self.assertQueryBudget(
+                1, lambda target: self.client.get('/api/v1/campaign-applications/'),
+                self._make_applications, label=f'{user.role} application list'
+            )
+    
+    def test_application_retrieve_budget(self):
+        """Test retrieving an application."""
+        self.client.force_authenticate(user=self.influencer)
+        self.assertQueryBudget(
+            1, lambda application: self.client.get(f'/api/v1/campaign-applications/{application.pk}/'),
+            self._make_applications
+        )
+    
+    def test_application_create_budget(self):
+        """Test applying to a campaign."""
+        self.client.force_authenticate(user=self.influencer)
+        self.assertQueryBudget(
+            6, lambda campaign: self.client.post('/api/v1/campaign-applications/', {
+                'campaign': campaign.pk,
+                'pitch': 'Pitch',
+            }, format='json'),
+            self._fresh_campaign
+        )
+    
+    def test_str_uses_selected_related_rows(self):
+        """Test that printing applications and files reads selected related rows without queries."""
+        self._make_campaigns(1)
+        application = Application.objects.select_related('campaign', 'influencer').get()
+        reference = CampaignFile.objects.select_related('campaign').get()
+        
+        with query_budget(0):
+            self.assertEqual(str(application), 'influencer@test.com - Campaign 0')
+            self.assertEqual(str(reference), 'File for Campaign 0')
+    
+    def test_application_update_status_budget(self):
+        """Test the brand reviewing an application."""
+        self.client.force_authenticate(user=self.brand)
+        self.assertQueryBudget(
+            5, lambda application: self.client.patch(
+                f'/api/v1/campaign-applications/{application.pk}/update_status/',
+                {'status': 'ACCEPTED'}, format='json'
+            ),
+            self._make_applications
+        )
+
+
+class LiveCampaignCacheTest(APITestCase):
+    """Test the cached influencer campaign listing."""
+    
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        two_tier_cache.clear_local()
+        self.brand = User.objects.create_user(email='brand@test.com', password='x', role='BRAND')
+        self.influencer = User.objects.create_user(email='influencer@test.com', password='x', role='INFLUENCER')
+        self.campaign = Campaign.objects.create(
+            title='Live', description='Test', content_type=Campaign.ContentType.INSTAGRAM_REEL,
+            category=Campaign.Category.BEAUTY, deliverables='Test', budget=Decimal('100.00'),
+            deadline=date.today() + timedelta(days=30), status=Campaign.Status.LIVE, brand=self.brand,
+        )
+        self.client.force_authenticate(user=self.influencer)
+    
+    def titles(self, query=''):
+        response = self.client.get(f'/api/v1/campaigns/{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [campaign['title'] for campaign in response.data['data']]
+    
+    def test_listing_is_cached(self):
+        """Test that a repeated listing needs no query."""
+        self.assertEqual(self.titles(), ['Live'])
+        with query_budget(0):
+            self.assertEqual(self.titles(), ['Live'])
+    
+    def test_filters_are_cached_separately(self):
+        """Test that each filter combination has its own entry."""
+        self.assertEqual(self.titles(), ['Live'])
+        self.assertEqual(self.titles('?category=TECH'), [])
+        self.assertEqual(self.titles('?category=BEAUTY'), ['Live'])
+    
+    def test_campaign_change_invalidates(self):
+        """Test that saving or deleting a campaign retires the cached listing."""
+        self.titles()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaign.status = Campaign.Status.CLOSED
+            self.campaign.save()
+        self.assertEqual(self.titles(), [])
+        
+        self.campaign.status = Campaign.Status.LIVE
+        self.campaign.save()
+        self.titles()
+        self.campaign.delete()
+        self.assertEqual(self.titles(), [])
+    
+    def test_brand_email_change_invalidates(self):
+        """Test that the listing picks up a brand's new email."""
+        self.titles()
+        self.brand.email = 'renamed@test.com'
+        self.brand.save()
+        response = self.client.get('/api/v1/campaigns/')
+        self.assertEqual(response.data['data'][0]['brand_email'], 'renamed@test.com')
+    
+    def test_brand_login_keeps_listing_cached(self):
+        """Test that saves not touching the brand email leave the listing cached."""
+        self.titles()
+        response = APIClient().post(
+            reverse('authentication:login'), {'email': 'brand@test.com', 'password': 'x'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.brand.first_name = 'Renamed'
+        self.brand.save()
+        
+        with query_budget(0):
+            self.assertEqual(self.titles(), ['Live'])
+    
+    def test_brands_are_not_cached(self):
+        """Test that brands still list their own campaigns from the database."""
+        self.client.force_authenticate(user=self.brand)
+        self.client.get('/api/v1/campaigns/')
+        with query_budget(1):
+            response = self.client.get('/api/v1/campaigns/')
+        self.assertEqual(len(response.data['data']), 1)
+
+
+@override_settings(ROOT_URLCONF='campaigns.tests')
+class AsyncReadViewTest(APITestCase):
+    """Test the native async campaign and inbox views."""
+    
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        two_tier_cache.clear_local()
+        self.brand = User.objects.create_user(email='brand@test.com', password='x', role='BRAND')
+        self.influencer = User.objects.create_user(email='influencer@test.com', password='x', role='INFLUENCER')
+        self.campaigns = [
+            Campaign.objects.create(
+                title=f'Campaign {status_}', description='Test', content_type=Campaign.ContentType.INSTAGRAM_REEL,
+                deliverables='Test', budget=Decimal('100.00'), deadline=date.today() + timedelta(days=30),
+                status=status_, brand=self.brand,
+            )
+            for status_ in (Campaign.Status.LIVE, Campaign.Status.DRAFT)
+        ]
+        Application.objects.create(campaign=self.campaigns[0], influencer=self.influencer, pitch='Pitch')
+        self.async_client = AsyncClient()
+    
+    def auth(self, user):
+        return {'Authorization': f"Bearer {tokens_for_user(user)['access']}"}
+    
+    def get_both(self, path, user=None):
+        """Return the sync and async responses for ``path``."""
+        headers = self.auth(user) if user else {}
+        with override_settings(ROOT_URLCONF='api.urls'):
+            sync = self.client.get(path, headers=headers)
+        return sync, async_to_sync(self.async_client.get)(path, headers=headers)
+    
+    def assertSameResponse(self, path, user=None):
+        sync, native = self.get_both(path, user)
+        self.assertEqual(native.status_code, sync.status_code)
+        self.assertEqual(native.content, sync.content)
+        for header in ('Content-Type', 'Allow', 'Vary', 'WWW-Authenticate'):
+            self.assertEqual(native.get(header), sync.get(header), header)
+        return native
+    
+    def test_responses_match_sync_views(self):
+        """Test that each async route answers exactly like its DRF view."""
+        live, draft = self.campaigns
+        for user in (self.brand, self.influencer):
+            self.assertSameResponse('/api/v1/campaigns/', user)
+            self.assertSameResponse('/api/v1/campaigns/?category=OTHER', user)
+            self.assertSameResponse(f'/api/v1/campaigns/{live.pk}/', user)
+            self.assertSameResponse('/api/v1/campaign-applications/', user)
+        response = self.assertSameResponse(f'/api/v1/campaigns/{draft.pk}/', self.influencer)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.assertSameResponse('/api/v1/campaigns/', None)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertSameResponse('/api/v1/campaigns/abc/', self.brand)
+    
+    def test_inbox_lists_applicants(self):
+        """Test that the brand's inbox lists applications to its campaigns."""
+        response = async_to_sync(self.async_client.get)('/api/v1/campaign-applications/', headers=self.auth(self.brand))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [application['influencer_email'] for application in response.json()['data']],
+            ['influencer@test.com']
+        )
+    
+    def test_authentication_stays_async(self):
+        """Test that reads never run the sync authentication path."""
+        headers = self.auth(self.brand)
+        with mock.patch.object(CachedJWTAuthentication, 'authenticate', side_effect=AssertionError('sync auth')):
+            response = async_to_sync(self.async_client.get)('/api/v1/campaigns/', headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_session_authentication(self):
+        """Test that a logged-in session is accepted, as by the DRF views."""
+        async_to_sync(self.async_client.aforce_login)(self.brand)
+        response = async_to_sync(self.async_client.get)('/api/v1/campaigns/')
+        self.assertEqual(len(response.json()['data']), 2)
+    
+    def test_writes_use_the_viewset(self):
+        """Test that other methods on the same paths reach the DRF view."""
+        response = async_to_sync(self.async_client.post)('/api/v1/campaigns/', {
+            'title': 'New', 'description': 'Test', 'content_type': 'INSTAGRAM_REEL',
+            'deliverables': 'Test', 'budget': '100.00', 'deadline': str(date.today() + timedelta(days=30)),
+        }, content_type='application/json', headers=self.auth(self.brand))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Campaign.objects.filter(title='New').exists())
+
+
+class CampaignStreamTest(APITestCase):
+    """Test the Server-Sent Events stream of campaign transitions."""
+    
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.brand = User.objects.create_user(email='brand@test.com', password='x', role='BRAND')
+        self.influencer = User.objects.create_user(email='influencer@test.com', password='x', role='INFLUENCER')
+        self.client.force_authenticate(user=self.influencer)
+    
+    def campaign(self, status_=Campaign.Status.DRAFT, category=Campaign.Category.BEAUTY):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Campaign.objects.create(
+                title='Campaign', description='Test', content_type=Campaign.ContentType.TIKTOK_VIDEO,
+                category=category, deliverables='Test', budget=Decimal('100.00'),
+                deadline=date.today() + timedelta(days=30), status=status_, brand=self.brand,
+            )
+    
+    def set_status(self, campaign, status_):
+        with self.captureOnCommitCallbacks(execute=True):
+            campaign.status = status_
+            campaign.save()
+    
+    def get_sync(self, query='', **headers):
+        """Request the sync stream view (what WSGI deployments serve)."""
+        request = APIRequestFactory().get(f'/api/v1/campaigns/stream/{query}', headers=headers)
+        force_authenticate(request, user=self.influencer)
+        return CampaignViewSet.as_view({'get': 'stream'})(request)
+    
+    def published(self):
+        events, _complete = stream.get_pubsub().since(None)
+        return [(event_type, data['id']) for _cursor, event_type, data in events]
+    
+    def parse(self, body):
+        """Return ``[(id, event, data)]`` from a text/event-stream body."""
+        events = []
+        for block in body.strip().split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+            if 'event' in fields:
+                events.append((fields['id'], fields['event'], json.loads(fields['data'])))
+        return events
+    
+    def test_transitions_are_published(self):
+        """Test that only changes into LIVE or CLOSED are published."""
+        draft = self.campaign()
+        live = self.campaign(Campaign.Status.LIVE)
+        live.title = 'Renamed'
+        live.save()
+        self.set_status(draft, Campaign.Status.LIVE)
+        self.set_status(Campaign.objects.get(pk=live.pk), Campaign.Status.CLOSED)
+        
+        self.assertEqual(self.published(), [
+            (stream.LIVE, live.pk), (stream.LIVE, draft.pk), (stream.CLOSED, live.pk),
+        ])
+    
+    def test_rolled_back_transition_is_not_published(self):
+        """Test that events are only published once the change commits."""
+        with self.captureOnCommitCallbacks(execute=False):
+            Campaign.objects.create(
+                title='Campaign', description='Test', content_type=Campaign.ContentType.TIKTOK_VIDEO,
+                deliverables='Test', budget=Decimal('100.00'), deadline=date.today() + timedelta(days=30),
+                status=Campaign.Status.LIVE, brand=self.brand,
+            )
+        self.assertEqual(self.published(), [])
+    
+    def test_resume_with_last_event_id(self):
+        """Test that a reconnecting client receives the events it missed, filtered."""
+        self.campaign(Campaign.Status.LIVE)
+        last_event_id = stream.format_cursor(stream.get_pubsub().head())
+        self.campaign(Campaign.Status.LIVE, category=Campaign.Category.TECH)
+        beauty = self.campaign(Campaign.Status.LIVE)
+        
+        response = self.get_sync('?category=BEAUTY', **{'Last-Event-ID': last_event_id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream; charset=utf-8')
+        self.assertTrue(response.content.startswith(b'retry: '))
+        events = self.parse(response.content.decode())
+        self.assertEqual([(event, data['id']) for _id, event, data in events], [(stream.LIVE, beauty.pk)])
+        self.assertEqual(events[0][2]['budget'], '100.00')
+    
+    def test_new_client_gets_resume_point(self):
+        """Test that a client without a Last-Event-ID is given the current head to resume from."""
+        self.campaign(Campaign.Status.LIVE)
+        head = stream.format_cursor(stream.get_pubsub().head())
+        body = self.get_sync().content.decode()
+        self.assertEqual(self.parse(body), [])
+        self.assertTrue(body.endswith(f'id: {head}\n\n'))
+        
+        live = self.campaign(Campaign.Status.LIVE)
+        events = self.parse(self.get_sync(**{'Last-Event-ID': head}).content.decode())
+        self.assertEqual([data['id'] for _id, _event, data in events], [live.pk])
+    
+    def test_unknown_last_event_id_resets(self):
+        """Test that a client whose id predates the retained log is told to reload."""
+        live = self.campaign(Campaign.Status.LIVE)
+        response = self.get_sync(**{'Last-Event-ID': 'gone-3'})
+        events = self.parse(response.content.decode())
+        self.assertEqual([event for _id, event, _data in events], [stream.RESET, stream.LIVE])
+        self.assertEqual(events[1][2]['id'], live.pk)
+    
+    def test_backlog_gap_resets(self):
+        """Test that a resume point older than the retained backlog sends a reset."""
+        pubsub = stream.MemoryPubSub(backlog=2)
+        for number in range(4):
+            pubsub.publish(stream.LIVE, {'id': number})
+        events, complete = pubsub.since((pubsub.epoch, 1))
+        self.assertFalse(complete)
+        self.assertEqual([data['id'] for _cursor, _event, data in events], [2, 3])
+        events, complete = pubsub.since((pubsub.epoch, 2))
+        self.assertTrue(complete)
+    
+    def test_invalid_filter(self):
+        """Test that unknown categories are rejected."""
+        response = self.client.get('/api/v1/campaigns/stream/?category=NOPE', HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('category', response.data['errors'])
+    
+    @override_settings(ROOT_URLCONF='campaigns.tests', CAMPAIGN_STREAM_HEARTBEAT_SECONDS=0.2)
+    def test_live_stream(self):
+        """Test that an open async stream receives matching events as they are published."""
+        headers = {'Authorization': f"Bearer {tokens_for_user(self.influencer)['access']}"}
+        live_event = stream.campaign_event(self.campaign(Campaign.Status.LIVE))
+        
+        async def read():
+            response = await AsyncClient().get('/api/v1/campaigns/stream/?content_type=TIKTOK_VIDEO', headers=headers)
+            chunks = response.streaming_content.__aiter__()
+            received = [await anext(chunks)]
+            stream.publish(stream.CLOSED, {**live_event[1], 'content_type': 'YOUTUBE_VIDEO'})
+            stream.publish(*live_event)
+            for _ in range(2):
+                received.append(await asyncio.wait_for(anext(chunks), 5))
+            await chunks.aclose()
+            return response, b''.join(received).decode()
+        
+        response, body = async_to_sync(read)()
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertEqual([(event, data['id']) for _id, event, data in self.parse(body)], [(stream.LIVE, live_event[1]['id'])])
+        self.assertIn(': keep-alive', body)
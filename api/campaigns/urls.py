@@ -1,11 +1,42 @@
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
+from api.async_views import async_read_view
 from .views import CampaignViewSet, ApplicationViewSet
 
 router = DefaultRouter()
 router.register(r'campaigns', CampaignViewSet, basename='campaign')
 router.register(r'campaign-applications', ApplicationViewSet, basename='campaign-application')
 
+# Same paths and names as the router's, with GET and HEAD served natively async
+async_urlpatterns = [
+    re_path(
+        r'^campaigns/stream/$',
+        async_read_view(CampaignViewSet, {'get': 'stream'}, basename='campaign', detail=False),
+        name='campaign-stream',
+    ),
+    re_path(
+        r'^campaigns/$',
+        async_read_view(CampaignViewSet, {'get': 'list', 'post': 'create'}, basename='campaign', detail=False),
+        name='campaign-list',
+    ),
+    re_path(
+        r'^campaigns/(?P<pk>[^/.]+)/$',
+        async_read_view(CampaignViewSet, {
+            'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy',
+        }, basename='campaign', detail=True),
+        name='campaign-detail',
+    ),
+    re_path(
+        r'^campaign-applications/$',
+        async_read_view(ApplicationViewSet, {'get': 'list', 'post': 'create'}, basename='campaign-application', detail=False),
+        name='campaign-application-list',
+    ),
+]
+
 urlpatterns = [
     path('', include(router.urls)),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = async_urlpatterns + urlpatterns
@@ -3,8 +3,14 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
 from django.core.mail import send_mail
 from django.conf import settings
+from api.async_views import aget_object
+from api.parsers import MessagePackParser, ORJSONParser
+from api.renderers import ORJSONRenderer
+from . import cache as live_cache
+from . import stream
 from .models import Campaign, CampaignFile, Application
 from .serializers import (
     CampaignSerializer,
@@ -45,7 +51,10 @@ class CampaignViewSet(viewsets.ModelViewSet):
     - List view shows different campaigns based on user role
     """
     
-    parser_classes = [parsers.MultiPartParser, parsers.FormParser, parsers.JSONParser]
+    parser_classes = [parsers.MultiPartParser, parsers.FormParser, ORJSONParser, MessagePackParser]
+    
+    # Actions whose response includes the campaign's reference files
+    REFERENCE_FILE_ACTIONS = ('retrieve', 'update', 'partial_update')
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -84,10 +93,10 @@ class CampaignViewSet(viewsets.ModelViewSet):
         
         if user.role == 'BRAND':
             # Brands see their own campaigns regardless of status
-            queryset = Campaign.objects.filter(brand=user).select_related('brand').prefetch_related('reference_files')
+            queryset = Campaign.objects.filter(brand_id=user.pk).select_related('brand')
         elif user.role == 'INFLUENCER':
             # Influencers see only live campaigns
-            queryset = Campaign.objects.filter(status=Campaign.Status.LIVE).select_related('brand').prefetch_related('reference_files')
+            queryset = Campaign.objects.filter(status=Campaign.Status.LIVE).select_related('brand')
             
             # Apply filters from query parameters
             budget_min = self.request.query_params.get('budget_min')
@@ -119,12 +128,13 @@ class CampaignViewSet(viewsets.ModelViewSet):
                     queryset = queryset.filter(deadline__lte=deadline_before)
                 except ValueError:
                     pass
-            
-            return queryset
         else:
             # No role assigned - return empty queryset
             return Campaign.objects.none()
         
+        # Only the full campaign serializer renders reference files
+        if self.action in self.REFERENCE_FILE_ACTIONS:
+            queryset = queryset.prefetch_related('reference_files')
         return queryset
     
     def perform_create(self, serializer):
@@ -132,21 +142,12 @@ class CampaignViewSet(viewsets.ModelViewSet):
         serializer.save()
     
     def perform_update(self, serializer):
-        """Ensure only campaign owner can update."""
-        campaign = self.get_object()
-        if campaign.brand != self.request.user:
-            return Response(
-                {
-                    'status': 'error',
-                    'errors': ['You do not have permission to edit this campaign.']
-                },
-                status=status.HTTP_403_FORBIDDEN
-            )
+        """Save the campaign (ownership is checked in update)."""
         serializer.save()
     
     def perform_destroy(self, instance):
         """Ensure only campaign owner can delete."""
-        if instance.brand != self.request.user:
+        if instance.brand_id != self.request.user.pk:
             return Response(
                 {
                     'status': 'error',
@@ -159,13 +160,45 @@ class CampaignViewSet(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         """
         List campaigns with consistent JSON response format.
+        
+        Influencers all see the same live campaigns, so their listing is
+        served from the shared cache (see campaigns/cache.py).
         """
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
+        def serialize():
+            queryset = self.filter_queryset(self.get_queryset())
+            return self.get_serializer(queryset, many=True).data
+        
+        if request.user.role == 'INFLUENCER':
+            data = live_cache.get_listing(request.query_params, lambda: list(serialize()))
+        else:
+            data = serialize()
         
         return Response({
             'status': 'success',
-            'data': serializer.data,
+            'data': data,
+            'errors': []
+        })
+    
+    async def alist(self, request, *args, **kwargs):
+        """
+        Native async list(), served under ASGI (see api/async_views.py).
+        """
+        async def serialize():
+            queryset = self.filter_queryset(self.get_queryset())
+            campaigns = [campaign async for campaign in queryset.aiterator()]
+            return self.get_serializer(campaigns, many=True).data
+        
+        if request.user.role == 'INFLUENCER':
+            async def compute():
+                return list(await serialize())
+            
+            data = await live_cache.aget_listing(request.query_params, compute)
+        else:
+            data = await serialize()
+        
+        return Response({
+            'status': 'success',
+            'data': data,
             'errors': []
         })
     
@@ -182,6 +215,19 @@ class CampaignViewSet(viewsets.ModelViewSet):
             'errors': []
         })
     
+    async def aretrieve(self, request, *args, **kwargs):
+        """
+        Native async retrieve(), served under ASGI.
+        """
+        instance = await aget_object(self)
+        serializer = self.get_serializer(instance)
+        
+        return Response({
+            'status': 'success',
+            'data': serializer.data,
+            'errors': []
+        })
+    
     def create(self, request, *args, **kwargs):
         """
         Create a campaign with consistent JSON response format.
@@ -214,7 +260,7 @@ class CampaignViewSet(viewsets.ModelViewSet):
         instance = self.get_object()
         
         # Check ownership
-        if instance.brand != request.user:
+        if instance.brand_id != request.user.pk:
             return Response({
                 'status': 'error',
                 'data': {},
@@ -245,7 +291,7 @@ class CampaignViewSet(viewsets.ModelViewSet):
         instance = self.get_object()
         
         # Check ownership
-        if instance.brand != request.user:
+        if instance.brand_id != request.user.pk:
             return Response({
                 'status': 'error',
                 'data': {},
@@ -260,6 +306,42 @@ class CampaignViewSet(viewsets.ModelViewSet):
             'errors': []
         }, status=status.HTTP_200_OK)
     
+    @action(detail=False, methods=['get'], renderer_classes=[stream.EventStreamRenderer, ORJSONRenderer])
+    def stream(self, request):
+        """
+        Server-Sent Events of campaigns going live or closing (see campaigns/stream.py).
+        
+        The sync view cannot hold the connection: it sends the events missed
+        since Last-Event-ID and lets the client reconnect after the retry delay.
+        """
+        filters, errors = stream.parse_filters(request.query_params)
+        if errors:
+            return self._stream_errors(errors)
+        
+        events, through = stream.backlog(request.headers.get('Last-Event-ID'), filters)
+        body = f'retry: {settings.CAMPAIGN_STREAM_RETRY_MS}\n\n' + stream.format_backlog(events, through)
+        return HttpResponse(body, content_type='text/event-stream; charset=utf-8', headers=stream.HEADERS)
+    
+    async def astream(self, request):
+        """
+        Native async stream(): holds the connection and pushes events as they happen.
+        """
+        filters, errors = stream.parse_filters(request.query_params)
+        if errors:
+            return self._stream_errors(errors)
+        
+        return StreamingHttpResponse(
+            stream.event_stream(request.headers.get('Last-Event-ID'), filters),
+            content_type='text/event-stream; charset=utf-8', headers=stream.HEADERS,
+        )
+    
+    def _stream_errors(self, errors):
+        return Response({
+            'status': 'error',
+            'data': {},
+            'errors': errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
     @action(detail=True, methods=['post'], permission_classes=[IsBrand])
     def upload_file(self, request, pk=None):
         """
@@ -269,7 +351,7 @@ class CampaignViewSet(viewsets.ModelViewSet):
         campaign = self.get_object()
         
         # Check ownership
-        if campaign.brand != request.user:
+        if campaign.brand_id != request.user.pk:
             return Response({
                 'status': 'error',
                 'data': {},
@@ -341,13 +423,13 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         if user.role == 'BRAND':
             # Brands see applications for their campaigns
             return Application.objects.filter(
-                campaign__brand=user
-            ).select_related('campaign', 'influencer').order_by('-created_at')
+                campaign__brand_id=user.pk
+            ).select_related('campaign__brand', 'influencer').order_by('-created_at')
         elif user.role == 'INFLUENCER':
             # Influencers see their own applications
             return Application.objects.filter(
-                influencer=user
-            ).select_related('campaign', 'influencer').order_by('-created_at')
+                influencer_id=user.pk
+            ).select_related('campaign__brand', 'influencer').order_by('-created_at')
         else:
             return Application.objects.none()
     
@@ -362,6 +444,18 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             'errors': []
         })
     
+    async def alist(self, request, *args, **kwargs):
+        """Native async list() (the brand's applicant inbox), served under ASGI."""
+        queryset = self.filter_queryset(self.get_queryset())
+        applications = [application async for application in queryset.aiterator()]
+        serializer = self.get_serializer(applications, many=True)
+        
+        return Response({
+            'status': 'success',
+            'data': serializer.data,
+            'errors': []
+        })
+    
     def retrieve(self, request, *args, **kwargs):
         """Retrieve a single application with consistent JSON response format."""
         instance = self.get_object()
@@ -433,7 +527,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         new_status = request.data.get('status')
         
         # Verify user is the campaign owner
-        if request.user != application.campaign.brand:
+        if application.campaign.brand_id != request.user.pk:
             return Response({
                 'status': 'error',
                 'data': {},
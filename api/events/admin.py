@@ -0,0 +1,25 @@
+from django.contrib import admin
+
+from .models import OutboxEvent
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    """Admin for the event outbox and its dead-letter queue."""
+    
+    list_display = ('id', 'event_type', 'dedup_key', 'status', 'attempts', 'created_at', 'published_at')
+    list_filter = ('status', 'event_type')
+    search_fields = ('dedup_key',)
+    ordering = ('-id',)
+    readonly_fields = (
+        'event_type', 'dedup_key', 'payload', 'attempts', 'last_error',
+        'created_at', 'published_at'
+    )
+    actions = ['requeue']
+    
+    @admin.action(description='Requeue selected events')
+    def requeue(self, request, queryset):
+        from .outbox import requeue
+        
+        count = requeue(queryset)
+        self.message_user(request, f'Requeued {count} event(s).')
@@ -0,0 +1,133 @@
+"""
+Message brokers the outbox dispatcher publishes to.
+
+A broker takes a batch of event envelopes (see ``OutboxEvent.to_message``)
+and returns the dedup keys it failed to publish, mapped to the error. The
+dispatcher retries those and marks the rest published, so delivery is
+at-least-once: a batch that reached the broker but was not recorded as
+published is sent again, and consumers discard repeats by ``dedup_key``.
+
+The broker is chosen by the ``EVENT_BROKER`` setting::
+
+    EVENT_BROKER = {
+        'BACKEND': 'events.brokers.SQLiteBroker',
+        'OPTIONS': {'path': '/var/lib/collabmarket/events.sqlite3'},
+    }
+
+``FileBroker`` and ``SQLiteBroker`` are local stand-ins for a real queue
+(Kafka, SQS, RabbitMQ); an adapter for one only needs ``publish_batch``.
+"""
+import json
+import logging
+import os
+import sqlite3
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Broker:
+    """Base broker: publishes messages one at a time through ``publish``."""
+
+    def publish(self, message):
+        raise NotImplementedError
+
+    def publish_batch(self, messages):
+        """Publish ``messages``; return ``{dedup_key: error}`` for those that failed."""
+        failures = {}
+        for message in messages:
+            try:
+                self.publish(message)
+            except Exception as e:
+                failures[message['dedup_key']] = repr(e)
+        return failures
+
+
+class LogBroker(Broker):
+    """Write events to the log only; nothing downstream receives them."""
+
+    def publish(self, message):
+        logger.info('Event published: %s', message)
+
+
+class FileBroker(Broker):
+    """Append events as NDJSON lines to a file, one fsync per batch."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def publish_batch(self, messages):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = ''.join(json.dumps(message, cls=DjangoJSONEncoder) + '\n' for message in messages)
+        with open(self.path, 'a', encoding='utf-8') as stream:
+            stream.write(lines)
+            stream.flush()
+            os.fsync(stream.fileno())
+        return {}
+
+    def read(self):
+        """Return every message written so far (for consumers and tests)."""
+        if not self.path.exists():
+            return []
+        with open(self.path, encoding='utf-8') as stream:
+            return [json.loads(line) for line in stream if line.strip()]
+
+
+class SQLiteBroker(Broker):
+    """
+    A durable queue in a separate SQLite file.
+
+    The queue table is keyed on ``dedup_key``, so a redelivered event is
+    dropped on arrival, as a broker with idempotent producers would do.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS messages ('
+            'seq INTEGER PRIMARY KEY AUTOINCREMENT, '
+            'dedup_key TEXT NOT NULL UNIQUE, '
+            'event_type TEXT NOT NULL, '
+            'body TEXT NOT NULL)'
+        )
+        return connection
+
+    def publish_batch(self, messages):
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany(
+                    'INSERT OR IGNORE INTO messages (dedup_key, event_type, body) VALUES (?, ?, ?)',
+                    [
+                        (message['dedup_key'], message['event_type'], json.dumps(message, cls=DjangoJSONEncoder))
+                        for message in messages
+                    ]
+                )
+        finally:
+            connection.close()
+        return {}
+
+    def consume(self, after=0, limit=100):
+        """Return up to ``limit`` ``(seq, message)`` pairs after sequence number ``after``."""
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                'SELECT seq, body FROM messages WHERE seq > ? ORDER BY seq LIMIT ?', (after, limit)
+            ).fetchall()
+        finally:
+            connection.close()
+        return [(seq, json.loads(body)) for seq, body in rows]
+
+
+def get_broker():
+    """Return the broker configured by ``EVENT_BROKER``."""
+    config = settings.EVENT_BROKER
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
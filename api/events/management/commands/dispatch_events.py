@@ -0,0 +1,89 @@
+import json
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from events.brokers import get_broker
+from events.models import OutboxEvent
+from events.outbox import dispatch_batch, outbox_metrics, purge_published, requeue
+
+
+class Command(BaseCommand):
+    """
+    Publish outbox events to the configured broker.
+
+    Runs as a long-lived worker that drains the outbox batch by batch and
+    polls every ``--sleep`` seconds once it is empty; keep the poll interval
+    well under the publication SLO. ``--once`` drains the outbox and exits,
+    ``--stats`` prints the backlog and lag metrics as JSON.
+    """
+
+    help = 'Publish pending outbox events (creator.application.created, ...) to the broker.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Events published per batch (default: EVENT_OUTBOX_BATCH_SIZE).',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Publish the events that are currently due, then exit.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.5,
+            help='Seconds to wait between polls when nothing is due (default: 0.5).',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Print outbox backlog and publication lag metrics as JSON, then exit.',
+        )
+        parser.add_argument(
+            '--requeue-dead',
+            action='store_true',
+            help='Move dead-lettered events back to the queue before dispatching.',
+        )
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            default=None,
+            help='Delete events published more than this many days ago, then exit.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size is not None and batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        if options['stats']:
+            self.stdout.write(json.dumps(outbox_metrics(), indent=2))
+            return
+
+        if options['purge_days'] is not None:
+            deleted = purge_published(timezone.now() - timedelta(days=options['purge_days']))
+            self.stdout.write(f'Purged {deleted} published event(s).')
+            return
+
+        if options['requeue_dead']:
+            count = requeue(OutboxEvent.objects.filter(status=OutboxEvent.Status.DEAD))
+            self.stdout.write(f'Requeued {count} dead-lettered event(s).')
+
+        broker = get_broker()
+        while True:
+            result = dispatch_batch(broker, batch_size)
+            if result:
+                self.stdout.write(
+                    f'Published {result.published}, retrying {result.retried}, '
+                    f'dead-lettered {result.dead} (max lag {result.max_lag:.2f}s).'
+                )
+                continue
+            if options['once']:
+                return
+            time.sleep(options['sleep'])
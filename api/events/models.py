@@ -0,0 +1,73 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxEvent(models.Model):
+    """
+    A domain event waiting to be (or already) published to the broker.
+    
+    Rows are written in the same transaction as the change they describe,
+    so an event exists if and only if that change committed. The dispatcher
+    publishes them in id order and marks them published; events that keep
+    failing end up ``DEAD`` (the dead-letter queue) for inspection and
+    requeueing.
+    """
+    
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', _('Pending')
+        PUBLISHED = 'PUBLISHED', _('Published')
+        DEAD = 'DEAD', _('Dead-lettered')
+    
+    event_type = models.CharField(_('event type'), max_length=100)
+    dedup_key = models.CharField(
+        _('deduplication key'),
+        max_length=200,
+        unique=True,
+        help_text=_('Stable key consumers use to discard redelivered events')
+    )
+    payload = models.JSONField(_('payload'), default=dict)
+    status = models.CharField(
+        _('status'),
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    attempts = models.PositiveIntegerField(_('attempts'), default=0)
+    last_error = models.TextField(_('last error'), blank=True)
+    available_at = models.DateTimeField(
+        _('available at'),
+        default=timezone.now,
+        help_text=_('Earliest time of the next delivery attempt')
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    published_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = _('outbox event')
+        verbose_name_plural = _('outbox events')
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+            models.Index(fields=['status', 'published_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} {self.dedup_key} - {self.get_status_display()}"
+    
+    @property
+    def lag(self):
+        """Seconds from the event being recorded to it being published (None if pending)."""
+        if self.published_at is None:
+            return None
+        return (self.published_at - self.created_at).total_seconds()
+    
+    def to_message(self):
+        """The envelope handed to the broker."""
+        return {
+            'id': self.pk,
+            'event_type': self.event_type,
+            'dedup_key': self.dedup_key,
+            'timestamp': self.created_at.isoformat(),
+            'data': self.payload,
+        }
@@ -0,0 +1,212 @@
+"""
+Transactional outbox.
+
+``enqueue`` records an event in the ``OutboxEvent`` table inside the
+caller's transaction; ``dispatch_batch`` (run by ``manage.py
+dispatch_events``) later publishes pending events to the broker in id order.
+Because the event row commits or rolls back with the change it describes,
+no event is lost when the broker is down and none is published for a
+change that never happened.
+
+Failed events are retried with exponential backoff and dead-lettered after
+``EVENT_OUTBOX_MAX_ATTEMPTS``. ``outbox_metrics`` reports the backlog and
+publication lag against ``EVENT_PUBLISH_SLO_SECONDS``.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between two delivery attempts of one event.
+MAX_BACKOFF_SECONDS = 300
+
+
+def enqueue(event_type, payload, dedup_key, using=DEFAULT_DB_ALIAS):
+    """
+    Record one event for publication in the current transaction.
+
+    Enqueueing a ``dedup_key`` that is already in the outbox is a no-op, so
+    retried requests do not produce duplicate events.
+    """
+    enqueue_many([(event_type, payload, dedup_key)], using=using)
+
+
+def enqueue_many(events, using=DEFAULT_DB_ALIAS):
+    """Record ``(event_type, payload, dedup_key)`` tuples in a single insert."""
+    now = timezone.now()
+    OutboxEvent.objects.using(using).bulk_create(
+        [
+            OutboxEvent(
+                event_type=event_type,
+                payload=payload,
+                dedup_key=dedup_key,
+                created_at=now,
+                available_at=now,
+            )
+            for event_type, payload, dedup_key in events
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def backoff(attempts):
+    """Delay before the next attempt of an event that has failed ``attempts`` times."""
+    return timedelta(seconds=min(2 ** attempts, MAX_BACKOFF_SECONDS))
+
+
+@dataclass
+class DispatchResult:
+    published: int = 0
+    retried: int = 0
+    dead: int = 0
+    max_lag: float = 0.0
+
+    def __bool__(self):
+        return bool(self.published or self.retried or self.dead)
+
+
+def claim_batch(batch_size, using=DEFAULT_DB_ALIAS):
+    """
+    Lease the next ``batch_size`` due events to the caller and return them.
+
+    The rows are locked with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+    database supports it, only for as long as it takes to push their
+    ``available_at`` ``EVENT_OUTBOX_LEASE_SECONDS`` ahead. Other dispatchers
+    skip leased events; if this one dies before recording the outcome, they
+    become due again when the lease runs out.
+    """
+    now = timezone.now()
+    with transaction.atomic(using=using):
+        events = list(
+            OutboxEvent.objects.using(using)
+            .select_for_update(skip_locked=True)
+            .filter(status=OutboxEvent.Status.PENDING, available_at__lte=now)
+            .order_by('id')[:batch_size]
+        )
+        if events:
+            OutboxEvent.objects.using(using).filter(pk__in=[event.pk for event in events]).update(
+                available_at=now + timedelta(seconds=settings.EVENT_OUTBOX_LEASE_SECONDS)
+            )
+    return events
+
+
+def dispatch_batch(broker, batch_size=None, max_attempts=None, using=DEFAULT_DB_ALIAS):
+    """
+    Publish the next batch of due events and record the outcome.
+
+    The batch is claimed in one short transaction (``claim_batch``),
+    published with no transaction open, so no row or database lock is held
+    during broker I/O, and the outcome is recorded in a second transaction.
+    Several dispatchers can run side by side.
+    """
+    batch_size = batch_size or settings.EVENT_OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.EVENT_OUTBOX_MAX_ATTEMPTS
+    result = DispatchResult()
+
+    events = claim_batch(batch_size, using=using)
+    if not events:
+        return result
+
+    try:
+        failures = broker.publish_batch([event.to_message() for event in events])
+    except Exception as e:
+        logger.exception('Broker rejected a batch of %d event(s)', len(events))
+        failures = {event.dedup_key: repr(e) for event in events}
+
+    now = timezone.now()
+    for event in events:
+        error = failures.get(event.dedup_key)
+        if error is None:
+            event.status = OutboxEvent.Status.PUBLISHED
+            event.published_at = now
+            result.published += 1
+            result.max_lag = max(result.max_lag, event.lag)
+            continue
+        event.attempts += 1
+        event.last_error = error
+        if event.attempts >= max_attempts:
+            event.status = OutboxEvent.Status.DEAD
+            result.dead += 1
+            logger.error('Event %s dead-lettered after %d attempts: %s', event.dedup_key, event.attempts, error)
+        else:
+            event.available_at = now + backoff(event.attempts)
+            result.retried += 1
+
+    with transaction.atomic(using=using):
+        OutboxEvent.objects.using(using).bulk_update(
+            events, ['status', 'published_at', 'attempts', 'last_error', 'available_at']
+        )
+
+    if result.max_lag > settings.EVENT_PUBLISH_SLO_SECONDS:
+        logger.warning(
+            'Event publication lag %.1fs is over the %ss SLO',
+            result.max_lag, settings.EVENT_PUBLISH_SLO_SECONDS
+        )
+    return result
+
+
+def requeue(queryset):
+    """Send events (typically dead-lettered ones) back to the queue; return the count."""
+    return queryset.update(
+        status=OutboxEvent.Status.PENDING,
+        attempts=0,
+        last_error='',
+        available_at=timezone.now(),
+    )
+
+
+def purge_published(older_than, using=DEFAULT_DB_ALIAS):
+    """Delete events published before ``older_than``; return the count."""
+    deleted, _ = OutboxEvent.objects.using(using).filter(
+        status=OutboxEvent.Status.PUBLISHED, published_at__lt=older_than
+    ).delete()
+    return deleted
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def outbox_metrics(window=timedelta(minutes=15), using=DEFAULT_DB_ALIAS):
+    """
+    Return backlog and lag figures for the outbox.
+
+    ``oldest_pending_age`` is how long the oldest unpublished event has been
+    waiting (the current lag); the ``lag_*`` figures cover events published
+    within ``window``, and ``within_slo`` is the share of those published
+    within ``EVENT_PUBLISH_SLO_SECONDS``.
+    """
+    now = timezone.now()
+    events = OutboxEvent.objects.using(using)
+    pending = events.filter(status=OutboxEvent.Status.PENDING)
+    oldest = pending.aggregate(oldest=Min('created_at'))['oldest']
+
+    lags = sorted(
+        (published_at - created_at).total_seconds()
+        for created_at, published_at in events.filter(
+            status=OutboxEvent.Status.PUBLISHED, published_at__gte=now - window
+        ).values_list('created_at', 'published_at')
+    )
+    slo = settings.EVENT_PUBLISH_SLO_SECONDS
+    return {
+        'pending': pending.count(),
+        'dead': events.filter(status=OutboxEvent.Status.DEAD).count(),
+        'oldest_pending_age': (now - oldest).total_seconds() if oldest else 0.0,
+        'published': len(lags),
+        'lag_p50': _percentile(lags, 0.5),
+        'lag_p95': _percentile(lags, 0.95),
+        'lag_max': lags[-1] if lags else None,
+        'slo_seconds': slo,
+        'within_slo': sum(1 for lag in lags if lag <= slo) / len(lags) if lags else None,
+    }
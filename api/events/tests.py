@@ -0,0 +1,195 @@
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from applications.models import Application
+
+from .brokers import Broker, FileBroker, SQLiteBroker, get_broker
+from .models import OutboxEvent
+from .outbox import claim_batch, dispatch_batch, enqueue, outbox_metrics, requeue
+
+User = get_user_model()
+
+
+class FailingBroker(Broker):
+    """Broker that rejects every message."""
+    
+    def publish(self, message):
+        raise ConnectionError('broker unavailable')
+
+
+class TempBrokerMixin:
+    """Point EVENT_BROKER at a SQLite file in a temporary directory."""
+    
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.broker_path = Path(directory.name) / 'events.sqlite3'
+        settings_override = override_settings(EVENT_BROKER={
+            'BACKEND': 'events.brokers.SQLiteBroker',
+            'OPTIONS': {'path': str(self.broker_path)},
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class ApplicationCreatedOutboxTest(TempBrokerMixin, APITestCase):
+    """Test that creating an application records its event transactionally."""
+    
+    def setUp(self):
+        super().setUp()
+        self.creator = User.objects.create_user(email='creator@test.com', password='testpass123', role='CREATOR')
+        self.client.force_authenticate(user=self.creator)
+        self.data = {'name': 'Outbox App', 'description': 'App', 'owner': 'team-outbox', 'visibility': 'PUBLIC'}
+    
+    def test_create_writes_outbox_event(self):
+        """Test that the create endpoint stores one pending creator.application.created event."""
+        response = self.client.post('/api/v1/applications/', self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        event = OutboxEvent.objects.get()
+        application_id = response.data['data']['application_id']
+        self.assertEqual(event.event_type, 'creator.application.created')
+        self.assertEqual(event.dedup_key, f'creator.application.created:{application_id}')
+        self.assertEqual(event.status, OutboxEvent.Status.PENDING)
+        self.assertEqual(event.payload['application_id'], application_id)
+        self.assertEqual(event.payload['creator_email'], 'creator@test.com')
+    
+    def test_failed_enqueue_rolls_back_application(self):
+        """Test that the application is not kept when its event cannot be recorded."""
+        with mock.patch('applications.events.enqueue_many', side_effect=RuntimeError('outbox down')):
+            with self.assertRaises(RuntimeError):
+                self.client.post('/api/v1/applications/', self.data, format='json')
+        self.assertFalse(Application.objects.exists())
+    
+    def test_dispatch_publishes_to_broker(self):
+        """Test that the dispatcher delivers the event and marks it published."""
+        self.client.post('/api/v1/applications/', self.data, format='json')
+        
+        out = StringIO()
+        call_command('dispatch_events', '--once', stdout=out)
+        self.assertIn('Published 1', out.getvalue())
+        
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.status, OutboxEvent.Status.PUBLISHED)
+        self.assertIsNotNone(event.lag)
+        [(seq, message)] = get_broker().consume()
+        self.assertEqual(message['dedup_key'], event.dedup_key)
+        self.assertEqual(message['data']['application_id'], event.payload['application_id'])
+
+
+class OutboxDispatchTest(TempBrokerMixin, TestCase):
+    """Test delivery guarantees, dead-lettering and metrics of the outbox."""
+    
+    def test_enqueue_is_idempotent_per_dedup_key(self):
+        """Test that enqueueing the same dedup key twice keeps one event."""
+        enqueue('test.event', {'n': 1}, dedup_key='test:1')
+        enqueue('test.event', {'n': 2}, dedup_key='test:1')
+        self.assertEqual(OutboxEvent.objects.get().payload, {'n': 1})
+    
+    def test_redelivery_is_deduplicated_by_broker(self):
+        """Test at-least-once redelivery reaches consumers only once."""
+        enqueue('test.event', {'n': 1}, dedup_key='test:1')
+        broker = SQLiteBroker(self.broker_path)
+        dispatch_batch(broker)
+        
+        requeue(OutboxEvent.objects.all())
+        result = dispatch_batch(broker)
+        
+        self.assertEqual(result.published, 1)
+        self.assertEqual(len(broker.consume()), 1)
+    
+    def test_failures_back_off_then_dead_letter(self):
+        """Test that a failing event is retried later and dead-lettered after max attempts."""
+        enqueue('test.event', {}, dedup_key='test:1')
+        
+        result = dispatch_batch(FailingBroker(), max_attempts=2)
+        event = OutboxEvent.objects.get()
+        self.assertEqual(result.retried, 1)
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('broker unavailable', event.last_error)
+        self.assertGreater(event.available_at, timezone.now())
+        
+        # Not due yet, so nothing is attempted
+        self.assertFalse(dispatch_batch(FailingBroker(), max_attempts=2))
+        
+        OutboxEvent.objects.update(available_at=timezone.now())
+        with self.assertLogs('events.outbox', 'ERROR'):
+            result = dispatch_batch(FailingBroker(), max_attempts=2)
+        self.assertEqual(result.dead, 1)
+        self.assertEqual(OutboxEvent.objects.get().status, OutboxEvent.Status.DEAD)
+        
+        out = StringIO()
+        call_command('dispatch_events', '--once', '--requeue-dead', stdout=out)
+        self.assertIn('Requeued 1', out.getvalue())
+        self.assertEqual(OutboxEvent.objects.get().status, OutboxEvent.Status.PUBLISHED)
+    
+    def test_publish_runs_outside_transactions_on_a_leased_batch(self):
+        """Test that no transaction is open during broker I/O and other dispatchers skip the batch."""
+        enqueue('test.event', {}, dedup_key='test:1')
+        # TestCase wraps each test in its own atomic blocks; dispatch must not add one.
+        outer_savepoints = len(connection.savepoint_ids)
+        other_broker = SQLiteBroker(self.broker_path)
+        seen = {}
+        
+        class InspectingBroker(Broker):
+            def publish(self, message):
+                seen['savepoints'] = len(connection.savepoint_ids)
+                seen['concurrent'] = dispatch_batch(other_broker)
+        
+        result = dispatch_batch(InspectingBroker())
+        
+        self.assertEqual(seen['savepoints'], outer_savepoints)
+        self.assertFalse(seen['concurrent'])
+        self.assertEqual(result.published, 1)
+        self.assertEqual(OutboxEvent.objects.get().status, OutboxEvent.Status.PUBLISHED)
+    
+    def test_expired_lease_is_dispatched_again(self):
+        """Test that a batch claimed by a dispatcher that died becomes due again."""
+        enqueue('test.event', {}, dedup_key='test:1')
+        claim_batch(10)
+        self.assertFalse(dispatch_batch(SQLiteBroker(self.broker_path)))
+        
+        OutboxEvent.objects.update(available_at=timezone.now())
+        self.assertEqual(dispatch_batch(SQLiteBroker(self.broker_path)).published, 1)
+    
+    def test_file_broker_appends_batches(self):
+        """Test that the file broker writes one NDJSON line per event."""
+        broker = FileBroker(self.broker_path.with_suffix('.ndjson'))
+        for index in range(3):
+            enqueue('test.event', {'n': index}, dedup_key=f'test:{index}')
+        dispatch_batch(broker, batch_size=2)
+        dispatch_batch(broker, batch_size=2)
+        self.assertEqual([message['data']['n'] for message in broker.read()], [0, 1, 2])
+    
+    def test_metrics_report_lag_against_slo(self):
+        """Test the backlog and lag figures."""
+        enqueue('test.event', {}, dedup_key='test:late')
+        enqueue('test.event', {}, dedup_key='test:pending')
+        OutboxEvent.objects.filter(dedup_key='test:late').update(
+            status=OutboxEvent.Status.PUBLISHED,
+            created_at=timezone.now() - timedelta(seconds=8),
+            published_at=timezone.now(),
+        )
+        
+        metrics = outbox_metrics()
+        self.assertEqual(metrics['pending'], 1)
+        self.assertEqual(metrics['published'], 1)
+        self.assertGreaterEqual(metrics['lag_max'], 8)
+        self.assertEqual(metrics['within_slo'], 0.0)
+        
+        out = StringIO()
+        call_command('dispatch_events', '--stats', stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['pending'], 1)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Benchmark catalog search latency against a large application catalog.
+
+Fills a throwaway test database with --rows applications, then times
+``GET /api/v1/applications/?q=...`` for prefix, typo and multi-word queries
+through the full API stack. The target is well under 500 ms per request.
+
+Usage:
+    python benchmarks/bench_application_search.py [--rows 20000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import django
+
+# Add the api directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import setup_test_environment
+from rest_framework.test import APIClient
+
+from applications.models import Application
+
+User = get_user_model()
+
+WORDS = (
+    'analytics portal dashboard billing customer insights payments reporting '
+    'campaign creator storefront inventory checkout loyalty onboarding search '
+    'messaging scheduler metrics gateway identity catalog review studio'
+).split()
+
+QUERIES = ('analyt', 'custmer portl', 'billing dashboard', 'team-7', 'onboard')
+
+
+def populate(rows):
+    creator = User.objects.create_user(email='bench@example.com', password='x', role='CREATOR')
+    rng = random.Random(0)
+    with transaction.atomic():
+        for index in range(rows):
+            # Model save() runs validation and the search-index signal, as in production.
+            Application.objects.create(
+                name=f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {index}',
+                description=' '.join(rng.choice(WORDS) for _ in range(12)),
+                owner=f'team-{index % 50}',
+                visibility=rng.choice(['PUBLIC', 'INTERNAL', 'PRIVATE']),
+                creator=creator,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=20000, help='Applications in the catalog.')
+    parser.add_argument('--repeat', type=int, default=20, help='Requests per query.')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        started = time.perf_counter()
+        populate(args.rows)
+        print(f'Indexed {args.rows} applications in {time.perf_counter() - started:.1f}s')
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(email='brand@example.com', password='x', role='BRAND'))
+
+        print(f"{'query':<20} {'results':>8} {'mean ms':>9} {'max ms':>9}")
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                response = client.get('/api/v1/applications/', {'q': query})
+                timings.append((time.perf_counter() - started) * 1000)
+            count = response.data['data']['count']
+            print(f'{query:<20} {count:>8} {sum(timings) / len(timings):>9.1f} {max(timings):>9.1f}')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+"""
+Benchmark the read endpoints under WSGI (sync views) and uvicorn (async views).
+
+Seeds a throwaway SQLite database with campaigns and applications, then
+serves the API twice: from a threaded WSGI server with the sync DRF views,
+and from uvicorn with ASYNC_READ_VIEWS on (as api/asgi.py sets it). For each
+--concurrency level, that many keep-alive clients request the influencer
+campaign listing, a campaign and the brand inbox in turn for --seconds, and
+the benchmark reports throughput, p50/p99 latency and errors.
+
+The WSGI server is gunicorn (gthread workers) when it is installed, else the
+standard library's threaded wsgiref server. uvicorn must be installed for
+the ASGI run (pip install uvicorn); it is skipped otherwise.
+
+Usage:
+    python benchmarks/bench_async_views.py [--concurrency 1 16 64] [--seconds 5] [--workers 1]
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def seed(args):
+    """Create the schema and data, and print the clients' access tokens as JSON."""
+    import django
+
+    sys.path.insert(0, API_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+    django.setup()
+
+    from datetime import date, timedelta
+    from decimal import Decimal
+
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from authentication.tokens import tokens_for_user
+    from campaigns.models import Application, Campaign
+
+    User = get_user_model()
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    brand = User.objects.create_user(email='brand@example.com', password='x', role='BRAND')
+    influencers = [
+        User.objects.create_user(email=f'influencer{number}@example.com', password='x', role='INFLUENCER')
+        for number in range(20)
+    ]
+    campaigns = Campaign.objects.bulk_create([
+        Campaign(
+            title=f'Campaign {number}', description='Bench', content_type=Campaign.ContentType.INSTAGRAM_REEL,
+            category=Campaign.Category.choices[number % len(Campaign.Category.choices)][0],
+            deliverables='Bench', budget=Decimal('100.00') + number, deadline=date.today() + timedelta(days=30),
+            status=Campaign.Status.LIVE, brand=brand,
+        )
+        for number in range(args.campaigns)
+    ])
+    Application.objects.bulk_create([
+        Application(campaign=campaign, influencer=influencer, pitch='Bench')
+        for campaign in campaigns[:10] for influencer in influencers
+    ])
+    print(json.dumps({
+        'brand': tokens_for_user(brand)['access'],
+        'influencer': tokens_for_user(influencers[0])['access'],
+        'campaign': campaigns[0].pk,
+    }))
+
+
+def serve_wsgi(args):
+    """Serve api.wsgi from a threaded wsgiref server (the gunicorn fallback)."""
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+    sys.path.insert(0, API_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+    from api.wsgi import application
+
+    class ThreadingServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    class KeepAliveHandler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def handle(self):
+            # WSGIRequestHandler serves one request per connection.
+            self.close_connection = False
+            while not self.close_connection:
+                super().handle()
+
+        def log_message(self, *args):
+            pass
+
+    make_server('127.0.0.1', args.port, application, ThreadingServer, KeepAliveHandler).serve_forever()
+
+
+def server_command(kind, port, workers):
+    if kind == 'asgi':
+        return [
+            sys.executable, '-m', 'uvicorn', 'api.asgi:application', '--port', str(port),
+            '--workers', str(workers), '--no-access-log', '--log-level', 'warning',
+        ]
+    if importlib.util.find_spec('gunicorn') is not None:
+        return [
+            sys.executable, '-m', 'gunicorn', 'api.wsgi:application', '--bind', f'127.0.0.1:{port}',
+            '--workers', str(workers), '--worker-class', 'gthread', '--threads', '32',
+        ]
+    return [sys.executable, os.path.abspath(__file__), '--serve-wsgi', '--port', str(port)]
+
+
+async def request(reader, writer, path, token):
+    writer.write(
+        f'GET {path} HTTP/1.1\r\nHost: localhost\r\nAuthorization: Bearer {token}\r\n\r\n'.encode()
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def load(port, concurrency, seconds, seed_data):
+    paths = [
+        ('/api/v1/campaigns/', seed_data['influencer']),
+        (f"/api/v1/campaigns/{seed_data['campaign']}/", seed_data['influencer']),
+        ('/api/v1/campaign-applications/', seed_data['brand']),
+    ]
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(number):
+        nonlocal errors
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        sent = number
+        try:
+            while time.perf_counter() < deadline:
+                path, token = paths[sent % len(paths)]
+                sent += 1
+                started = time.perf_counter()
+                try:
+                    status = await request(reader, writer, path, token)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    errors += 1
+                    writer.close()
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                    continue
+                if status != 200:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] if latencies else 0.0
+
+    return len(latencies) / elapsed, percentile(0.5), percentile(0.99), errors
+
+
+def wait_for(port, process, log, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            with open(log) as f:
+                raise RuntimeError(f.read().strip().splitlines()[-1])
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('server did not start')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16, 64], help='Concurrent clients.')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duration per run.')
+    parser.add_argument('--workers', type=int, default=1, help='Server worker processes.')
+    parser.add_argument('--campaigns', type=int, default=50, help='Live campaigns to seed.')
+    parser.add_argument('--seed', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--serve-wsgi', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args)
+        return
+    if args.serve_wsgi:
+        serve_wsgi(args)
+        return
+
+    directory = tempfile.TemporaryDirectory()
+    env = {
+        **os.environ,
+        'DB_NAME': os.path.join(directory.name, 'bench.sqlite3'),
+        'PYTHONPATH': API_DIR,
+    }
+    seeded = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--seed', '--campaigns', str(args.campaigns)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    seed_data = json.loads(seeded.stdout.strip().splitlines()[-1])
+
+    print(f"{'server':<8} {'clients':>7} {'req/s':>8} {'p50':>8} {'p99':>8} {'errors':>7}")
+    try:
+        for kind in ('wsgi', 'asgi'):
+            if kind == 'asgi' and importlib.util.find_spec('uvicorn') is None:
+                print('asgi     skipped: uvicorn is not installed')
+                continue
+            port = free_port()
+            log = os.path.join(directory.name, f'{kind}.log')
+            with open(log, 'w') as stderr:
+                process = subprocess.Popen(
+                    server_command(kind, port, args.workers), cwd=API_DIR, env=env,
+                    stdout=subprocess.DEVNULL, stderr=stderr,
+                )
+            try:
+                wait_for(port, process, log)
+                for concurrency in args.concurrency:
+                    throughput, p50, p99, errors = asyncio.run(load(port, concurrency, args.seconds, seed_data))
+                    print(f'{kind:<8} {concurrency:>7} {throughput:>8.0f} {p50:>6.1f}ms {p99:>6.1f}ms {errors:>7}')
+            finally:
+                process.terminate()
+                process.wait()
+    finally:
+        directory.cleanup()
+
+
+if __name__ == '__main__':
+    main()
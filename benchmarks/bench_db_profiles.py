@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+"""
+Benchmark concurrent reads and writes against each database profile.
+
+Runs --threads worker threads for --seconds against a throwaway test
+database. Each operation is a catalog read (latest 20 applications) or, with
+probability --write-ratio, an application create through the ORM, which
+includes validation, the insert and the search-index row. The benchmark
+reports throughput, latency and "database is locked" failures for each
+profile:
+
+* sqlite-stock: stock SQLite (rollback journal, deferred transactions);
+* sqlite-wal: the tuned profile from api/db.py;
+* postgresql: persistent connections (with --postgres; uses the DB_* env);
+* postgresql-pool: Django's native pool (with --postgres, needs psycopg 3).
+
+Profiles are read from the environment when settings load, so each one
+runs in its own subprocess.
+
+Usage:
+    python benchmarks/bench_db_profiles.py [--threads 8] [--seconds 5] [--postgres]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PROFILES = {
+    'sqlite-stock': {'DB_PROFILE': 'sqlite', 'SQLITE_TUNED': 'False'},
+    'sqlite-wal': {'DB_PROFILE': 'sqlite', 'SQLITE_TUNED': 'True'},
+    'postgresql': {'DB_PROFILE': 'postgresql', 'DB_POOL': 'False'},
+    'postgresql-pool': {'DB_PROFILE': 'postgresql', 'DB_POOL': 'True'},
+}
+
+
+def run_worker(args):
+    """Run the workload in this process and print the results as JSON."""
+    import django
+
+    # Add the api directory to the path
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError, connection, connections
+    from django.test.utils import setup_test_environment
+
+    from applications.models import Application
+
+    User = get_user_model()
+    setup_test_environment()
+    directory = tempfile.TemporaryDirectory()
+    if connection.vendor == 'sqlite':
+        # Threads need a shared file, not the default in-memory test database.
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory.name, 'bench.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    try:
+        creator = User.objects.create_user(email='bench@example.com', password='x', role='CREATOR')
+        for index in range(200):
+            Application.objects.create(name=f'Seed {index}', description='Seed', owner='bench', creator=creator)
+        connections.close_all()
+
+        latencies = {'read': [], 'write': []}
+        errors = {'locked': 0, 'other': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + args.seconds
+
+        def work(number):
+            rng = random.Random(number)
+            local = {'read': [], 'write': []}
+            local_errors = {'locked': 0, 'other': 0}
+            sequence = 0
+            try:
+                while time.perf_counter() < deadline:
+                    kind = 'write' if rng.random() < args.write_ratio else 'read'
+                    started = time.perf_counter()
+                    try:
+                        if kind == 'write':
+                            sequence += 1
+                            Application.objects.create(
+                                name=f'Bench {number}-{sequence}', description='Bench',
+                                owner='bench', creator_id=creator.pk,
+                            )
+                        else:
+                            list(Application.objects.order_by('-pk')[:20])
+                    except OperationalError as e:
+                        local_errors['locked' if 'locked' in str(e) else 'other'] += 1
+                        continue
+                    local[kind].append((time.perf_counter() - started) * 1000)
+            finally:
+                connections.close_all()
+            with lock:
+                for key in latencies:
+                    latencies[key] += local[key]
+                for key in errors:
+                    errors[key] += local_errors[key]
+
+        threads = [threading.Thread(target=work, args=(number,)) for number in range(args.threads)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        def percentile(values, fraction):
+            values = sorted(values)
+            return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+        print(json.dumps({
+            'ops_per_sec': (len(latencies['read']) + len(latencies['write'])) / elapsed,
+            'writes_per_sec': len(latencies['write']) / elapsed,
+            'read_p95_ms': percentile(latencies['read'], 0.95),
+            'write_p95_ms': percentile(latencies['write'], 0.95),
+            'locked': errors['locked'],
+            'other_errors': errors['other'],
+        }))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        directory.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent worker threads.')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duration per profile.')
+    parser.add_argument('--write-ratio', type=float, default=0.2, help='Share of operations that write.')
+    parser.add_argument('--postgres', action='store_true', help='Also run the PostgreSQL profiles.')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    names = [name for name in PROFILES if args.postgres or name.startswith('sqlite')]
+    print(f"{'profile':<16} {'ops/s':>8} {'writes/s':>9} {'read p95':>9} {'write p95':>10} {'locked':>7} {'errors':>7}")
+    for name in names:
+        command = [
+            sys.executable, __file__, '--worker',
+            '--threads', str(args.threads), '--seconds', str(args.seconds),
+            '--write-ratio', str(args.write_ratio),
+        ]
+        completed = subprocess.run(
+            command, env={**os.environ, **PROFILES[name]}, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            print(f'{name:<16} failed: {completed.stderr.strip().splitlines()[-1]}')
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(
+            f"{name:<16} {result['ops_per_sec']:>8.0f} {result['writes_per_sec']:>9.0f} "
+            f"{result['read_p95_ms']:>7.1f}ms {result['write_p95_ms']:>8.1f}ms "
+            f"{result['locked']:>7} {result['other_errors']:>7}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Benchmark logins per second per core for each password hasher profile.
+
+A login is dominated by verifying the stored hash, so this measures
+``check_password`` on a single thread (one core) for the preferred hasher of
+every entry in PASSWORD_HASHER_PROFILES.
+
+Usage:
+    python benchmarks/bench_password_hashers.py [--seconds 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import django
+
+# Add the api directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.test.utils import override_settings
+
+PASSWORD = 'BenchmarkPass123!'
+
+
+def bench_profile(name, hashers, seconds):
+    """Return (verifications per second, mean latency in ms) for a profile."""
+    with override_settings(PASSWORD_HASHERS=hashers, PASSWORD_HASHING_OFFLOAD=False):
+        encoded = make_password(PASSWORD)
+        # Warm up the hasher (library import, first allocation).
+        check_password(PASSWORD, encoded)
+
+        count = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            check_password(PASSWORD, encoded)
+            count += 1
+        elapsed = time.perf_counter() - started
+
+    return count / elapsed, elapsed / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=3.0, help='Time spent per profile.')
+    args = parser.parse_args()
+
+    print(f"{'profile':<10} {'logins/sec/core':>16} {'ms/login':>10}")
+    for name, hashers in settings.PASSWORD_HASHER_PROFILES.items():
+        rate, latency = bench_profile(name, hashers, args.seconds)
+        print(f'{name:<10} {rate:>16.1f} {latency:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
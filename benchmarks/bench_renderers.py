@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+Benchmark JSON encode and decode throughput: DRF's stdlib JSON against orjson.
+
+Builds realistic response payloads: the campaign listing envelope as
+CampaignListSerializer emits it, and the same rows as raw model values with
+Decimal budgets, dates, datetimes and lazy translation strings, which go
+through the encoder's default() hook. Both are rendered with DRF's
+JSONRenderer and with api.renderers.ORJSONRenderer. A campaign create body is
+parsed with JSONParser and ORJSONParser. Each run checks that both sides
+produce the same value, then reports operations per second, MB/s and the
+speedup.
+
+Usage:
+    python benchmarks/bench_renderers.py [--campaigns 20 100 500] [--seconds 2]
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import django
+
+# Add the api directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+django.setup()
+
+from django.contrib.auth import get_user_model
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+from campaigns.models import Campaign
+from campaigns.serializers import CampaignListSerializer
+
+User = get_user_model()
+
+
+def campaigns(count):
+    """Return unsaved campaigns shaped like production rows."""
+    brand = User(email='brand@example.com', role='BRAND')
+    created = datetime(2025, 3, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+    return [
+        Campaign(
+            id=number, title=f'Spring launch {number}: unboxing and first impressions',
+            description='Show the product in daily use. ' * 8,
+            content_type=Campaign.ContentType.choices[number % len(Campaign.ContentType.choices)][0],
+            category=Campaign.Category.choices[number % len(Campaign.Category.choices)][0],
+            deliverables='1 reel, 3 stories', budget=Decimal('1250.00') + number,
+            deadline=date(2025, 6, 1) + timedelta(days=number % 60), status=Campaign.Status.LIVE,
+            brand=brand, created_at=created + timedelta(minutes=number), updated_at=created,
+        )
+        for number in range(count)
+    ]
+
+
+def payloads(count):
+    """Return ``{name: response data}`` for ``count`` campaigns."""
+    rows = campaigns(count)
+    listing = {'status': 'success', 'data': CampaignListSerializer(rows, many=True).data, 'errors': None}
+    raw = {
+        'status': 'success',
+        'data': [
+            {
+                'id': campaign.id, 'title': campaign.title, 'category': campaign.category,
+                'category_display': Campaign.Category(campaign.category).label,
+                'budget': campaign.budget, 'deadline': campaign.deadline,
+                'created_at': campaign.created_at, 'updated_at': campaign.updated_at,
+            }
+            for campaign in rows
+        ],
+        'errors': None,
+    }
+    return {'listing': listing, 'raw values': raw}
+
+
+def rate(function, seconds):
+    """Return calls per second of ``function`` over about ``seconds``."""
+    function()
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for _ in range(10):
+            function()
+        count += 10
+    return count / (time.perf_counter() - started)
+
+
+def report(label, size, baseline, candidate):
+    print(
+        f'{label:<24} {size / 1024:>8.1f} {baseline:>10.0f} {candidate:>10.0f}'
+        f' {candidate * size / 1e6:>8.1f} {candidate / baseline:>7.1f}x'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--campaigns', type=int, nargs='+', default=[20, 100, 500], help='Campaigns per payload.')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Duration per measurement.')
+    args = parser.parse_args()
+
+    stdlib, fast = JSONRenderer(), ORJSONRenderer()
+    print(f"{'payload':<24} {'KiB':>8} {'stdlib/s':>10} {'orjson/s':>10} {'MB/s':>8} {'speedup':>8}")
+    for count in args.campaigns:
+        for name, data in payloads(count).items():
+            expected = stdlib.render(data)
+            if json.loads(fast.render(data)) != json.loads(expected):
+                raise SystemExit(f'{name}: orjson output differs from DRF')
+            report(
+                f'encode {name} x{count}', len(expected),
+                rate(lambda: stdlib.render(data), args.seconds), rate(lambda: fast.render(data), args.seconds),
+            )
+
+    body = json.dumps({
+        'title': 'Spring launch', 'description': 'Show the product in daily use. ' * 20,
+        'content_type': 'INSTAGRAM_REEL', 'category': 'BEAUTY', 'deliverables': '1 reel, 3 stories',
+        'budget': '1250.00', 'deadline': '2025-06-01', 'status': 'LIVE',
+    }).encode()
+    if ORJSONParser().parse(io.BytesIO(body)) != JSONParser().parse(io.BytesIO(body)):
+        raise SystemExit('orjson parse differs from DRF')
+    report(
+        'decode campaign body', len(body),
+        rate(lambda: JSONParser().parse(io.BytesIO(body)), args.seconds),
+        rate(lambda: ORJSONParser().parse(io.BytesIO(body)), args.seconds),
+    )
+
+
+if __name__ == '__main__':
+    main()
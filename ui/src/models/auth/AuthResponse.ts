@@ -1,13 +1,15 @@
 import type { User } from './User';
 
+export interface AuthTokens {
+  access: string;
+  refresh: string;
+}
+
 export interface AuthResponse {
   status: string;
   data: {
     user: User;
-    tokens: {
-      access: string;
-      refresh: string;
-    };
+    tokens: AuthTokens;
   };
   errors: any[];
 }
@@ -1,5 +1,5 @@
 import apiClient from './api';
-import type { RegisterData, LoginData, User, AuthResponse, ApiResponse } from '../models/auth';
+import type { RegisterData, LoginData, User, AuthResponse, AuthTokens, ApiResponse } from '../models/auth';
 
 const authService = {
   /**
@@ -57,15 +57,17 @@ const authService = {
   /**
    * Select user role (Brand or Influencer)
    */
-  async selectRole(role: 'BRAND' | 'INFLUENCER'): Promise<ApiResponse<{ user: User; message: string }>> {
-    const response = await apiClient.post<ApiResponse<{ user: User; message: string }>>(
+  async selectRole(role: 'BRAND' | 'INFLUENCER'): Promise<ApiResponse<{ user: User; tokens: AuthTokens; message: string }>> {
+    const response = await apiClient.post<ApiResponse<{ user: User; tokens: AuthTokens; message: string }>>(
       '/api/v1/auth/role/',
       { role }
     );
     
     if (response.data.status === 'success') {
-      // Update stored user data
+      // Update stored user data; the role change revokes the previous tokens
       localStorage.setItem('user', JSON.stringify(response.data.data.user));
+      localStorage.setItem('accessToken', response.data.data.tokens.access);
+      localStorage.setItem('refreshToken', response.data.data.tokens.refresh);
     }
     
     return response.data;
@@ -124,8 +126,8 @@ const authService = {
     old_password: string,
     new_password: string,
     new_password_confirm: string
-  ): Promise<ApiResponse<{ message: string }>> {
-    const response = await apiClient.post<ApiResponse<{ message: string }>>(
+  ): Promise<ApiResponse<{ tokens: AuthTokens; message: string }>> {
+    const response = await apiClient.post<ApiResponse<{ tokens: AuthTokens; message: string }>>(
       '/api/v1/auth/password/change/',
       {
         old_password,
@@ -133,6 +135,13 @@ const authService = {
         new_password_confirm,
       }
     );
+    
+    if (response.data.status === 'success') {
+      // The password change revokes the previous tokens
+      localStorage.setItem('accessToken', response.data.data.tokens.access);
+      localStorage.setItem('refreshToken', response.data.data.tokens.refresh);
+    }
+    
     return response.data;
   },
 